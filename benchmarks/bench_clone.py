@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+战斗状态复制基准测试 - 比较 clone()、snapshot()/restore() 与 copy.deepcopy
+Battle State Copy Benchmark - clone() vs snapshot()/restore() vs copy.deepcopy
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.battle_manager import BattleManager
+
+
+def build_position(seed, actions):
+    """从指定种子开局并随机执行若干操作，得到一个对局中途的局面"""
+    battle_manager = BattleManager(log_sink=None, seed=seed)
+    battle_manager.start_battle()
+    action_rng = random.Random(seed)
+    for _ in range(actions):
+        if battle_manager.battle_ended:
+            break
+        hand_size = len(battle_manager.card_system.hand)
+        if hand_size and action_rng.random() < 0.7:
+            success, _ = battle_manager.play_card(action_rng.randrange(hand_size))
+            if success:
+                continue
+        battle_manager.start_settlement_phase()
+    return battle_manager
+
+
+def measure(label, func, count):
+    """运行 count 次并输出每秒次数"""
+    start_time = time.perf_counter()
+    for _ in range(count):
+        func()
+    elapsed = time.perf_counter() - start_time
+    print(f"{label:<28} {count / elapsed:>12,.0f} 次/秒   {elapsed * 1e6 / count:>8.2f} us/次")
+
+
+def main():
+    """基准测试主函数"""
+    parser = argparse.ArgumentParser(description="战斗状态复制基准测试")
+    parser.add_argument('-n', '--count', type=int, default=50000, help="每项测试的重复次数")
+    parser.add_argument('--seed', type=int, default=1, help="局面种子")
+    parser.add_argument('--actions', type=int, default=12, help="生成局面时执行的操作数")
+    args = parser.parse_args()
+
+    battle_manager = build_position(args.seed, args.actions)
+    shared_rng = random.Random(0)
+    snapshot = battle_manager.snapshot()
+
+    print(f"局面: 回合 {battle_manager.turn_count}，日志 {battle_manager.battle_context.get_log_version()} 条，"
+          f"快照 {len(snapshot)} 字节")
+    measure("clone()", battle_manager.clone, args.count)
+    measure("clone(rng=共享随机流)", lambda: battle_manager.clone(shared_rng), args.count)
+    measure("snapshot()", battle_manager.snapshot, args.count)
+    measure("restore()", lambda: battle_manager.restore(snapshot), args.count)
+    measure("copy.deepcopy", lambda: copy.deepcopy(battle_manager), max(1, args.count // 50))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+牌堆操作基准测试 - 比较牌库顶在末尾的 CardSystem 与旧的“牌库顶在下标0”实现
+Pile Operation Benchmark - CardSystem (Top at the End) vs the Old Top-at-Index-0 Piles
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.card_system import CardSystem, shuffle_pile
+from data.cards import CARD_REGISTRY, create_starting_deck
+
+
+CURSE = CARD_REGISTRY.get('curse')
+CURSE_NUMBER = CARD_REGISTRY.number_of('curse')
+
+
+# ============ 牌堆原语 ============
+# 旧实现: 牌库顶在下标0，抽牌 pop(0)、插入 insert(0)，洗牌先复制弃牌堆
+# 新实现: 牌库顶在末尾，抽牌 pop()、插入 append()，弃牌堆原地洗牌
+
+def old_draw(deck, hand, count):
+    """旧实现：从下标0抽牌（每次移动整个牌库）"""
+    for _ in range(count):
+        hand.append(deck.pop(0))
+
+
+def new_draw(deck, hand, count):
+    """新实现：从末尾抽牌"""
+    for _ in range(count):
+        hand.append(deck.pop())
+
+
+def old_insert(deck, count):
+    """旧实现：插入下标0（每次移动整个牌库）"""
+    for _ in range(count):
+        deck.insert(0, CURSE_NUMBER)
+
+
+def new_insert(deck, count):
+    """新实现：追加到末尾"""
+    for _ in range(count):
+        deck.append(CURSE_NUMBER)
+
+
+def old_reshuffle(played_cards, rng):
+    """旧实现：复制弃牌堆后洗牌，再清空弃牌堆"""
+    shuffled = played_cards.copy()
+    rng.shuffle(shuffled)
+    played_cards.clear()
+    return shuffled
+
+
+def new_reshuffle(played_cards, rng):
+    """新实现：弃牌堆原地洗牌"""
+    return shuffle_pile(played_cards, rng)
+
+
+def best_of(repeat, func):
+    """运行 repeat 次，返回最快一次的耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        elapsed = func()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def timed(func, *args):
+    """运行一次并返回耗时（秒）"""
+    start_time = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start_time
+
+
+def measure_primitives(size, ops, repeat, seed):
+    """牌库为 size 张时，抽牌/插入 ops 次、重新洗牌一次的每张牌耗时（纳秒）"""
+    pile = bytearray(random.Random(seed).randrange(len(CARD_REGISTRY)) for _ in range(size))
+    ops = min(ops, size)
+    results = {}
+    results['抽牌'] = tuple(
+        best_of(repeat, lambda: timed(func, pile.copy(), bytearray(), ops)) * 1e9 / ops
+        for func in (old_draw, new_draw))
+    results['插入牌库顶'] = tuple(
+        best_of(repeat, lambda: timed(func, pile.copy(), ops)) * 1e9 / ops
+        for func in (old_insert, new_insert))
+    results['重新洗牌'] = tuple(
+        best_of(repeat, lambda: timed(func, pile.copy(), random.Random(seed))) * 1e9 / size
+        for func in (old_reshuffle, new_reshuffle))
+    return results
+
+
+# ============ CardSystem ============
+
+def build_card_system(size, seed):
+    """创建牌库为 size 张的卡牌系统（起始牌库重复若干次），手牌上限不限制抽牌"""
+    starting_deck = create_starting_deck()
+    cards = (starting_deck * (size // len(starting_deck) + 1))[:size]
+    card_system = CardSystem(cards, rng=random.Random(seed))
+    card_system.max_hand_size = size * 2
+    return card_system
+
+
+def measure_card_system(size, ops, repeat, seed):
+    """CardSystem 的抽牌、插入诅咒卡、重新洗牌的每张牌耗时（纳秒）"""
+    ops = min(ops, size)
+
+    def draw():
+        card_system = build_card_system(size, seed)
+        return timed(card_system.draw_cards, ops)
+
+    def insert():
+        card_system = build_card_system(size, seed)
+        start_time = time.perf_counter()
+        for _ in range(ops):
+            card_system.add_negative_card(CURSE)
+        return time.perf_counter() - start_time
+
+    def reshuffle():
+        card_system = build_card_system(size, seed)
+        card_system.played_cards, card_system.deck = card_system.deck, bytearray()
+        card_system.played_hash, card_system.deck_hash = card_system.deck_hash, 0
+        return timed(card_system._reshuffle_played_cards)
+
+    return {
+        '抽牌': best_of(repeat, draw) * 1e9 / ops,
+        '插入牌库顶': best_of(repeat, insert) * 1e9 / ops,
+        '重新洗牌': best_of(repeat, reshuffle) * 1e9 / size,
+    }
+
+
+def check_same_order(seed):
+    """确认新旧洗牌在同一种子下得到相同的抽牌顺序（同种子战斗结果不变）"""
+    pile = bytearray(random.Random(seed).randrange(len(CARD_REGISTRY)) for _ in range(500))
+    old_deck = old_reshuffle(pile.copy(), random.Random(seed))
+    new_deck = new_reshuffle(pile.copy(), random.Random(seed))
+    return old_deck == new_deck[::-1]
+
+
+def main():
+    """基准测试主函数"""
+    parser = argparse.ArgumentParser(description="牌堆操作基准测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 200, 2000, 20000, 200000],
+                        help="测试的牌库张数")
+    parser.add_argument('--ops', type=int, default=2000, help="每项测试的抽牌/插入次数")
+    parser.add_argument('--repeat', type=int, default=5, help="每项测试重复次数（取最快一次）")
+    parser.add_argument('--seed', type=int, default=1, help="洗牌种子")
+    args = parser.parse_args()
+
+    print(f"同种子抽牌顺序一致: {check_same_order(args.seed)}")
+    print()
+    print("牌堆原语（ns/张）")
+    print(f"{'张数':>8}  {'操作':<8} {'旧实现':>10} {'新实现':>10} {'加速':>8}")
+    for size in args.sizes:
+        for label, (old_ns, new_ns) in measure_primitives(size, args.ops, args.repeat, args.seed).items():
+            print(f"{size:>8}  {label:<8} {old_ns:>10,.1f} {new_ns:>10,.1f} {old_ns / new_ns:>7.1f}x")
+
+    print()
+    print("CardSystem（含牌堆哈希更新，ns/张）")
+    print(f"{'张数':>8}  {'抽牌':>10} {'插入牌库顶':>10} {'重新洗牌':>10}")
+    for size in args.sizes:
+        result = measure_card_system(size, args.ops, args.repeat, args.seed)
+        print(f"{size:>8}  {result['抽牌']:>10,.1f} {result['插入牌库顶']:>10,.1f} {result['重新洗牌']:>10,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动时间基准测试 - 在全新子进程中测量无界面导入与界面启动到第一帧的耗时（-X importtime 报告）
+Startup Time Benchmark - Headless Import and GUI Launch-to-First-Frame in Fresh Processes (-X importtime Report)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ============ 测试场景 ============
+# 每个场景在新的解释器中执行，输出一行JSON：{'ms': 耗时, 'pygame': 是否导入了pygame, 'numpy': ...}
+
+HEADLESS_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import simulate
+elapsed = time.perf_counter() - start
+print(json.dumps({'ms': elapsed * 1000, 'pygame': 'pygame' in sys.modules, 'numpy': 'numpy' in sys.modules}))
+"""
+
+GUI_CODE = """
+import json, sys, time
+start = time.perf_counter()
+from core.game import Game
+imported = time.perf_counter()
+game = Game(journal_path=None)
+game._render_frame()
+elapsed = time.perf_counter() - start
+print(json.dumps({'ms': elapsed * 1000, 'import_ms': (imported - start) * 1000,
+                  'pygame': 'pygame' in sys.modules, 'numpy': 'numpy' in sys.modules}))
+"""
+
+# 场景: (名称, 代码, 默认目标毫秒, 是否需要显示)
+SCENARIOS = (
+    ('headless', HEADLESS_CODE, 100.0, False),
+    ('gui', GUI_CODE, 500.0, True),
+)
+
+
+def child_environment(needs_display):
+    """子进程环境：没有显示设备时界面场景使用SDL的dummy驱动"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    env['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    if needs_display and sys.platform.startswith('linux') and not env.get('DISPLAY'):
+        env.setdefault('SDL_VIDEODRIVER', 'dummy')
+        env.setdefault('SDL_AUDIODRIVER', 'dummy')
+    return env
+
+
+def run_child(code, needs_display):
+    """在新解释器中运行一次场景，返回 (结果字典, importtime 记录列表)"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, env=child_environment(needs_display),
+        capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result, parse_importtime(completed.stderr)
+
+
+def parse_importtime(output):
+    """解析 -X importtime 输出，返回 [(模块名, 自身微秒, 累计微秒)]"""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        records.append((name.strip(), int(self_us), int(cumulative_us)))
+    return records
+
+
+def print_slowest(records, count):
+    """输出自身耗时最长的模块"""
+    slowest = sorted(records, key=lambda record: record[1], reverse=True)[:count]
+    for name, self_us, cumulative_us in slowest:
+        print(f"      {name:<40} 自身 {self_us / 1000:>7.2f} ms   累计 {cumulative_us / 1000:>7.2f} ms")
+
+
+def main():
+    """基准测试主函数"""
+    parser = argparse.ArgumentParser(description="启动时间基准测试")
+    parser.add_argument('-n', '--runs', type=int, default=5, help="每个场景运行次数（取中位数）")
+    parser.add_argument('--top', type=int, default=8, help="列出自身耗时最长的模块数")
+    parser.add_argument('--headless-target', type=float, default=None, help="无界面导入目标（毫秒）")
+    parser.add_argument('--gui-target', type=float, default=None, help="界面启动到第一帧目标（毫秒）")
+    parser.add_argument('--skip-gui', action='store_true', help="不测试界面启动（没有安装pygame时）")
+    parser.add_argument('--check', action='store_true', help="未达到目标时以非零状态退出")
+    args = parser.parse_args()
+
+    targets = {'headless': args.headless_target, 'gui': args.gui_target}
+    failed = []
+
+    for name, code, default_target, needs_display in SCENARIOS:
+        if name == 'gui' and args.skip_gui:
+            continue
+        target = targets[name] if targets[name] is not None else default_target
+        runs = [run_child(code, needs_display) for _ in range(args.runs)]
+        times = [result['ms'] for result, _ in runs]
+        median = statistics.median(times)
+        result, records = runs[times.index(sorted(times)[len(times) // 2])]
+
+        passed = median <= target
+        if name == 'headless' and (result['pygame'] or result['numpy']):
+            passed = False
+        if not passed:
+            failed.append(name)
+
+        print(f"[{name}] 中位数 {median:.1f} ms（最快 {min(times):.1f} ms），目标 {target:.0f} ms："
+              f"{'通过' if passed else '未达到'}")
+        if 'import_ms' in result:
+            print(f"    其中导入 {result['import_ms']:.1f} ms，创建窗口和界面并绘制第一帧 "
+                  f"{result['ms'] - result['import_ms']:.1f} ms")
+        print(f"    导入了 pygame: {result['pygame']}，numpy: {result['numpy']}")
+        print(f"    自身耗时最长的 {args.top} 个模块:")
+        print_slowest(records, args.top)
+
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,25 @@
+import os
+
 # 游戏基础配置
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
 FPS = 60
 BACKGROUND_COLOR = (20, 20, 40)
 
+# 空闲等待模式：阻塞等待输入事件，只在输入或状态变化后渲染，
+# 超时（毫秒）后唤醒一次用于调试输出和后续动画
+IDLE_MODE = True
+IDLE_WAIT_TIMEOUT = 1000
+
+# 二进制战斗日志文件路径（后台线程追加写入，用于审计），为None时不记录
+JOURNAL_PATH = None
+
+# 回放保存目录（游戏中按F5保存当前战斗的回放）
+REPLAY_DIR = "replays"
+
+# 预先光栅化的中文字形图集（由 tools/build_glyph_atlas.py 生成），不存在时直接使用字体渲染
+GLYPH_ATLAS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "assets", "glyph_atlas.bin")
+
 # 游戏标题
 GAME_TITLE = "Card Battle Game" 
\ No newline at end of file
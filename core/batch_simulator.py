@@ -0,0 +1,490 @@
+"""
+NumPy批量战斗模拟器 - 以结构数组同时推进N场战斗
+NumPy Batch Battle Simulator - Advance N Battles at Once as Struct-of-Arrays
+
+每场战斗的状态拆成若干个长度为N的数组（玩家HP/MP/ATK/护甲、敌人HP、罗盘位置、
+特殊状态），牌库/手牌/弃牌堆用整数卡牌编号矩阵表示（编号见 data.cards.CARD_INDEX，
+空位为 EMPTY）。每一步所有未结束的战斗同时执行一个行动：按贪心策略
+（与 core.simulator.GreedyStrategy 一致）出一张牌，或进入结算阶段。
+
+规则与 BattleManager 保持一致，可用 compare_with_reference 与参考引擎做统计等价检验。
+"""
+
+import math
+import time
+
+import numpy as np
+
+from config.constants import (
+    MAX_HAND_SIZE, INITIAL_HAND_SIZE, COMPASS_POSITIONS,
+    INITIAL_PLAYER_HP, INITIAL_PLAYER_MP, INITIAL_PLAYER_ATK,
+    INITIAL_ENEMY_HP, INITIAL_ENEMY_ATK
+)
+from core import effects
+from core.compass_system import COMPASS_LAYOUT, CompassPosition
+from core.simulator import BattleSimulator, GreedyStrategy, SimulationStatistics
+from data.cards import CARD_LIBRARY, CARD_REGISTRY, create_starting_numbers
+from data.events import NEGATIVE_EVENTS, LUCKY_EVENTS
+
+
+EMPTY = -1
+
+# 与 BattleManager 一致的固定数值
+MP_RECOVERY_PER_TURN = 3
+ENEMY_ATK = INITIAL_ENEMY_ATK
+
+# ============ 效果程序表 ============
+# 卡牌和罗盘事件的操作码程序（core.effects）按行排成矩阵：[编号, 指令序号] -> 操作码/数值，
+# 较短的程序用 NOP 补齐
+
+def _build_program_tables(programs):
+    """把程序列表转换为 (操作码矩阵, 数值矩阵)"""
+    if any(program is None for program in programs):
+        raise ValueError("批量模拟器只能执行操作码程序描述的效果，不能执行手写的效果函数")
+    length = max([len(program) for program in programs] + [1])
+    opcodes = np.full((len(programs), length), effects.NOP, dtype=np.int8)
+    amounts = np.zeros((len(programs), length), dtype=np.int32)
+    for row, program in enumerate(programs):
+        for column, (opcode, amount, _, _) in enumerate(program):
+            opcodes[row, column] = opcode
+            amounts[row, column] = amount
+    return opcodes, amounts
+
+
+CARD_MP_COST = np.array([card.mp_cost for card in CARD_LIBRARY], dtype=np.int32)
+CARD_COMPASS_POINTS = np.array([card.compass_points for card in CARD_LIBRARY], dtype=np.int32)
+CARD_OPCODES, CARD_AMOUNTS = _build_program_tables([card.program for card in CARD_LIBRARY])
+NEGATIVE_CARD_IDS = np.array(CARD_REGISTRY.find_numbers(card_type='negative'), dtype=np.int16)
+
+
+def _build_greedy_priority_table():
+    """贪心策略的出牌优先级查找表：[是否需要治疗, 当前MP, 卡牌编号+1] -> 优先级（不可出为0）
+
+    编号+1 使 EMPTY 槽位落在第0列；MP不会超过上限，因此表大小固定。
+    """
+    table = np.zeros((2, INITIAL_PLAYER_MP + 1, len(CARD_LIBRARY) + 1), dtype=np.int8)
+    for card_number, card in enumerate(CARD_LIBRARY):
+        priority = GreedyStrategy.CARD_PRIORITY.get(card.id, 0)
+        for mp in range(card.mp_cost, INITIAL_PLAYER_MP + 1):
+            table[1, mp, card_number + 1] = priority
+            if card.type != 'heal':
+                table[0, mp, card_number + 1] = priority
+    return table
+
+
+GREEDY_PRIORITY_TABLE = _build_greedy_priority_table()
+
+COMPASS_LAYOUT_ARRAY = np.array(COMPASS_LAYOUT, dtype=np.int8)
+
+NEGATIVE_EVENT_OPCODES, NEGATIVE_EVENT_AMOUNTS = _build_program_tables(
+    [event.program for event in NEGATIVE_EVENTS])
+LUCKY_EVENT_OPCODES, LUCKY_EVENT_AMOUNTS = _build_program_tables(
+    [event.program for event in LUCKY_EVENTS])
+
+
+class BatchBattleSimulator:
+    """N场战斗的结构数组模拟器，所有战斗按步同时推进"""
+
+    def __init__(self, battle_count, seed=None, max_turns=200, pile_capacity=64):
+        """初始化批量模拟器
+
+        Args:
+            battle_count: 同时进行的战斗场数N
+            seed: NumPy随机种子
+            max_turns: 单场战斗最大回合数，超过后按未结束处理
+            pile_capacity: 牌堆矩阵的初始列数，插入诅咒牌过多时自动扩容
+        """
+        self.battle_count = battle_count
+        self.max_turns = max_turns
+        self.pile_capacity = pile_capacity
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self):
+        """重置所有战斗到开局状态（对应 BattleManager.__init__ + start_battle）"""
+        n = self.battle_count
+
+        # 实体状态
+        self.player_hp = np.full(n, INITIAL_PLAYER_HP, dtype=np.int32)
+        self.player_max_hp = INITIAL_PLAYER_HP
+        self.player_mp = np.full(n, INITIAL_PLAYER_MP, dtype=np.int32)
+        self.player_max_mp = INITIAL_PLAYER_MP
+        self.player_atk = np.full(n, INITIAL_PLAYER_ATK, dtype=np.int32)
+        self.player_armor = np.zeros(n, dtype=np.int32)
+        self.enemy_hp = np.full(n, INITIAL_ENEMY_HP, dtype=np.int32)
+        self.enemy_max_hp = INITIAL_ENEMY_HP
+
+        # 罗盘与特殊状态
+        self.compass_position = np.zeros(n, dtype=np.int32)
+        self.skip_next_turn = np.zeros(n, dtype=bool)
+        self.double_next_attack = np.zeros(n, dtype=bool)
+
+        # 战斗状态
+        self.turn_count = np.ones(n, dtype=np.int32)
+        self.battle_ended = np.zeros(n, dtype=bool)
+        self.victory = np.zeros(n, dtype=bool)
+
+        # 牌堆：牌库顶部位于 deck[i, deck_size[i] - 1]
+        starting_deck = np.array(create_starting_numbers(), dtype=np.int16)
+        capacity = max(self.pile_capacity, len(starting_deck))
+        self.deck = np.full((n, capacity), EMPTY, dtype=np.int16)
+        self.deck[:, :len(starting_deck)] = self.rng.permuted(np.tile(starting_deck, (n, 1)), axis=1)
+        self.deck_size = np.full(n, len(starting_deck), dtype=np.int32)
+        self.hand = np.full((n, MAX_HAND_SIZE), EMPTY, dtype=np.int16)
+        self.hand_size = np.zeros(n, dtype=np.int32)
+        self.played = np.full((n, capacity), EMPTY, dtype=np.int16)
+        self.played_size = np.zeros(n, dtype=np.int32)
+
+        self.steps = 0
+        self.battle_steps = 0
+        self._draw_cards(np.arange(n), INITIAL_HAND_SIZE)
+
+    # ============ 主循环 ============
+
+    def get_active_rows(self):
+        """获取尚未结束的战斗下标"""
+        return np.flatnonzero(~self.battle_ended & (self.turn_count <= self.max_turns))
+
+    def step(self):
+        """所有未结束的战斗同时执行一个行动，返回本步推进的战斗数"""
+        rows = self.get_active_rows()
+        if rows.size == 0:
+            return 0
+
+        slots = self._choose_actions(rows)
+        play = slots >= 0
+        self._play_cards(rows[play], slots[play])
+        self._settle(rows[~play])
+
+        self.steps += 1
+        self.battle_steps += rows.size
+        return rows.size
+
+    def run(self):
+        """运行到所有战斗结束，返回汇总报告"""
+        start_time = time.perf_counter()
+        while self.step():
+            pass
+        elapsed = time.perf_counter() - start_time
+
+        report = self.get_statistics().get_report()
+        total_turns = int(self.turn_count.sum())
+        report['strategy'] = GreedyStrategy.name
+        report['steps'] = self.steps
+        report['elapsed_seconds'] = elapsed
+        report['battles_per_second'] = self.battle_count / elapsed if elapsed > 0 else 0
+        report['battle_steps'] = self.battle_steps
+        report['battle_steps_per_second'] = self.battle_steps / elapsed if elapsed > 0 else 0
+        report['battle_turns_per_second'] = total_turns / elapsed if elapsed > 0 else 0
+        return report
+
+    def get_statistics(self):
+        """汇总为 SimulationStatistics（字段与 get_battle_statistics 一致）"""
+        statistics = SimulationStatistics()
+        statistics.battles = self.battle_count
+
+        victories = int(np.count_nonzero(self.battle_ended & self.victory))
+        defeats = int(np.count_nonzero(self.battle_ended & ~self.victory))
+        statistics.outcomes = {
+            'victory': victories,
+            'defeat': defeats,
+            'ongoing': self.battle_count - victories - defeats
+        }
+
+        turns, counts = np.unique(self.turn_count, return_counts=True)
+        statistics.turn_distribution = {int(t): int(c) for t, c in zip(turns, counts)}
+
+        # 与 CardSystem.get_played_count 一致：统计的是当前弃牌堆数量
+        statistics.total_cards_played = int(self.played_size.sum())
+
+        for hp_stats, hp, max_hp in ((statistics.player_hp, self.player_hp, self.player_max_hp),
+                                     (statistics.enemy_hp, self.enemy_hp, self.enemy_max_hp)):
+            percentage = hp / max_hp * 100
+            if percentage.size > 0:
+                hp_stats['total'] = float(percentage.sum())
+                hp_stats['min'] = float(percentage.min())
+                hp_stats['max'] = float(percentage.max())
+
+        return statistics
+
+    # ============ 策略 ============
+
+    def _choose_actions(self, rows):
+        """贪心策略：返回每场战斗要打出的手牌槽位，-1 表示进入结算"""
+        need_heal = (self.player_hp[rows] < self.player_max_hp * 0.6).astype(np.intp)
+        priority = GREEDY_PRIORITY_TABLE[need_heal[:, None], self.player_mp[rows][:, None], self.hand[rows] + 1]
+
+        # 与 argmax 一致：优先级相同时取最靠前的手牌
+        slots = np.argmax(priority, axis=1)
+        best = np.take_along_axis(priority, slots[:, None], axis=1)[:, 0]
+        playable = (best > 0) & ~self.skip_next_turn[rows]
+        return np.where(playable, slots, -1)
+
+    # ============ 出牌 ============
+
+    def _play_cards(self, rows, slots):
+        """对应 CardSystem.play_card + BattleManager._check_battle_end"""
+        if rows.size == 0:
+            return
+
+        cards = self.hand[rows, slots].astype(np.int32)
+        self.player_mp[rows] -= CARD_MP_COST[cards]
+        self._remove_from_hand(rows, slots)
+
+        self._execute_programs(rows, CARD_OPCODES[cards], CARD_AMOUNTS[cards])
+
+        # 推进罗盘并触发事件（推进0步时触发当前位置的事件）
+        self.compass_position[rows] = (self.compass_position[rows] + CARD_COMPASS_POINTS[cards]) % COMPASS_POSITIONS
+        event_types = COMPASS_LAYOUT_ARRAY[self.compass_position[rows]]
+        self._trigger_events(rows[event_types == CompassPosition.NEGATIVE],
+                             NEGATIVE_EVENT_OPCODES, NEGATIVE_EVENT_AMOUNTS)
+        self._trigger_events(rows[event_types == CompassPosition.LUCKY],
+                             LUCKY_EVENT_OPCODES, LUCKY_EVENT_AMOUNTS)
+
+        self._push_cards('played', rows, cards)
+        self._check_battle_end(rows)
+
+    def _trigger_events(self, rows, opcodes_table, amounts_table):
+        """为每场战斗随机抽取一个事件并批量执行"""
+        if rows.size == 0:
+            return
+
+        choice = self.rng.integers(0, len(opcodes_table), size=rows.size)
+        self._execute_programs(rows, opcodes_table[choice], amounts_table[choice])
+
+    # ============ 效果程序批量执行 ============
+
+    def _execute_programs(self, rows, opcodes, amounts):
+        """批量执行效果程序（对应 core.effects 的解释器）
+
+        Args:
+            rows: 战斗下标
+            opcodes: 每场战斗的程序操作码，形状 [len(rows), 指令数]
+            amounts: 对应的指令数值
+        """
+        for column in range(opcodes.shape[1]):
+            self._execute_instruction(rows, opcodes[:, column], amounts[:, column])
+
+    def _execute_instruction(self, rows, opcodes, amounts):
+        """每场战斗执行一条指令：按操作码分组，每组一次数组运算"""
+        if rows.size == 0:
+            return
+
+        target = rows[opcodes == effects.ADD_CURSE]
+        if target.size > 0:
+            curses = NEGATIVE_CARD_IDS[self.rng.integers(0, len(NEGATIVE_CARD_IDS), size=target.size)]
+            self._push_cards('deck', target, curses)
+
+        mask = opcodes == effects.LOSE_HP
+        self._player_take_damage(rows[mask], amounts[mask])
+
+        self.skip_next_turn[rows[opcodes == effects.SKIP_TURN]] = True
+
+        mask = opcodes == effects.LOSE_MP
+        target = rows[mask]
+        self.player_mp[target] -= np.minimum(self.player_mp[target], np.maximum(amounts[mask], 0))
+
+        mask = opcodes == effects.WEAKEN_ATK
+        target = rows[mask]
+        self.player_atk[target] = np.maximum(0, self.player_atk[target] - amounts[mask])
+
+        target = rows[opcodes == effects.DISCARD_RANDOM]
+        target = target[self.hand_size[target] > 0]
+        if target.size > 0:
+            slots = (self.rng.random(target.size) * self.hand_size[target]).astype(np.int32)
+            discarded = self.hand[target, slots]
+            self._remove_from_hand(target, slots)
+            self._push_cards('played', target, discarded)
+
+        mask = opcodes == effects.HEAL
+        self._player_heal(rows[mask], amounts[mask])
+
+        mask = opcodes == effects.RESTORE_MP
+        target = rows[mask]
+        self.player_mp[target] = np.minimum(self.player_max_mp, self.player_mp[target] + amounts[mask])
+
+        self.double_next_attack[rows[opcodes == effects.DOUBLE_ATTACK]] = True
+
+        mask = opcodes == effects.ARMOR
+        self.player_armor[rows[mask]] += amounts[mask]
+
+        mask = opcodes == effects.DRAW
+        if np.any(mask):
+            for count in np.unique(amounts[mask]):
+                self._draw_cards(rows[mask & (amounts == count)], int(count))
+
+        mask = opcodes == effects.ADD_ATK
+        self.player_atk[rows[mask]] += amounts[mask]
+
+        mask = opcodes == effects.DAMAGE
+        self._enemy_take_damage(rows[mask], amounts[mask])
+
+        target = rows[opcodes == effects.HALVE_ATK]
+        atk = self.player_atk[target]
+        self.player_atk[target] = np.where(atk > 1, np.maximum(1, atk // 2), atk)
+
+    # ============ 结算 ============
+
+    def _settle(self, rows):
+        """对应 start_settlement_phase，包含跳过回合时的连续结算"""
+        while rows.size > 0:
+            # 玩家攻击结算
+            total = self.player_atk[rows]
+            double = self.double_next_attack[rows]
+            total = np.where(double, total * 2, total)
+            self.double_next_attack[rows] = False
+            self._enemy_take_damage(rows, np.where(total > 1, total - 1, 0))
+            self._check_battle_end(rows)
+            rows = rows[~self.battle_ended[rows]]
+
+            # 敌人攻击
+            self._player_take_damage(rows, np.full(rows.size, ENEMY_ATK, dtype=np.int32))
+            self._check_battle_end(rows)
+            rows = rows[~self.battle_ended[rows]]
+
+            # 下一回合
+            self.turn_count[rows] += 1
+            self.player_atk[rows] = INITIAL_PLAYER_ATK
+            self.player_armor[rows] = 0
+            self.player_mp[rows] = np.minimum(self.player_max_mp, self.player_mp[rows] + MP_RECOVERY_PER_TURN)
+
+            skipped = self.skip_next_turn[rows]
+            self.skip_next_turn[rows[skipped]] = False
+            self._draw_cards(rows[~skipped], MAX_HAND_SIZE)
+            rows = rows[skipped]
+
+    def _check_battle_end(self, rows):
+        """先判定玩家死亡，再判定敌人死亡"""
+        defeated = rows[self.player_hp[rows] <= 0]
+        self.battle_ended[defeated] = True
+        self.victory[defeated] = False
+
+        won = rows[(self.player_hp[rows] > 0) & (self.enemy_hp[rows] <= 0)]
+        self.battle_ended[won] = True
+        self.victory[won] = True
+
+    # ============ 实体操作（与 Player/Enemy 方法对应）============
+
+    def _player_take_damage(self, rows, damage):
+        """对应 Player.take_damage：护甲减免且会被消耗"""
+        if rows.size == 0:
+            return
+        armor = self.player_armor[rows]
+        reduced = np.maximum(0, damage - armor)
+        self.player_armor[rows] = np.maximum(0, armor - damage)
+        hp = self.player_hp[rows]
+        self.player_hp[rows] = hp - np.minimum(reduced, hp)
+
+    def _player_heal(self, rows, amount):
+        """对应 Player.heal"""
+        self.player_hp[rows] = np.minimum(self.player_max_hp, self.player_hp[rows] + amount)
+
+    def _enemy_take_damage(self, rows, damage):
+        """对应 Enemy.take_damage"""
+        hp = self.enemy_hp[rows]
+        self.enemy_hp[rows] = hp - np.minimum(np.maximum(damage, 0), hp)
+
+    # ============ 牌堆操作 ============
+
+    def _draw_cards(self, rows, count):
+        """对应 CardSystem.draw_cards：手牌满或无牌可抽时停止，牌库空时重洗弃牌堆"""
+        for _ in range(count):
+            rows = rows[self.hand_size[rows] < MAX_HAND_SIZE]
+            if rows.size == 0:
+                return
+
+            empty = rows[(self.deck_size[rows] == 0) & (self.played_size[rows] > 0)]
+            if empty.size > 0:
+                self._reshuffle_played_cards(empty)
+
+            rows = rows[self.deck_size[rows] > 0]
+            top = self.deck_size[rows] - 1
+            cards = self.deck[rows, top]
+            self.deck[rows, top] = EMPTY
+            self.deck_size[rows] = top
+            self.hand[rows, self.hand_size[rows]] = cards
+            self.hand_size[rows] += 1
+
+    def _reshuffle_played_cards(self, rows):
+        """弃牌堆随机排列后成为新牌库（调用时这些战斗的牌库为空）"""
+        played = self.played[rows]
+        keys = self.rng.random(played.shape)
+        keys[played == EMPTY] = 2.0
+        order = np.argsort(keys, axis=1)
+        self.deck[rows] = np.take_along_axis(played, order, axis=1)
+        self.deck_size[rows] = self.played_size[rows]
+        self.played[rows] = EMPTY
+        self.played_size[rows] = 0
+
+    def _remove_from_hand(self, rows, slots):
+        """移除指定槽位的手牌，后面的手牌依次左移"""
+        if rows.size == 0:
+            return
+        positions = np.arange(MAX_HAND_SIZE)[None, :]
+        source = np.minimum(positions + (positions >= slots[:, None]), MAX_HAND_SIZE - 1)
+        shifted = np.take_along_axis(self.hand[rows], source, axis=1)
+        shifted[:, -1] = EMPTY
+        self.hand[rows] = shifted
+        self.hand_size[rows] -= 1
+
+    def _push_cards(self, pile_name, rows, cards):
+        """将卡牌放到牌堆（'deck' 或 'played'）末尾，牌库的末尾即顶部"""
+        if rows.size == 0:
+            return
+        sizes = getattr(self, pile_name + '_size')
+        if int(sizes[rows].max()) >= self.deck.shape[1]:
+            self._grow_piles()
+        pile = getattr(self, pile_name)
+        pile[rows, sizes[rows]] = cards
+        sizes[rows] += 1
+
+    def _grow_piles(self):
+        """牌堆矩阵容量翻倍"""
+        padding = ((0, 0), (0, self.deck.shape[1]))
+        self.deck = np.pad(self.deck, padding, constant_values=EMPTY)
+        self.played = np.pad(self.played, padding, constant_values=EMPTY)
+
+
+def _z_score(mean_a, var_a, n_a, mean_b, var_b, n_b):
+    """两样本均值差的z值"""
+    standard_error = math.sqrt(var_a / n_a + var_b / n_b) if n_a > 0 and n_b > 0 else 0
+    if standard_error == 0:
+        return 0.0
+    return (mean_a - mean_b) / standard_error
+
+
+def _turn_moments(report):
+    """由回合分布计算均值和方差"""
+    battles = report['battles']
+    mean = report['average_turns']
+    variance = sum(count * (turns - mean) ** 2 for turns, count in report['turn_distribution'].items())
+    return mean, variance / battles if battles > 0 else 0
+
+
+def compare_with_reference(batch_count=100000, reference_count=5000, seed=0,
+                           max_turns=200, z_threshold=3.0):
+    """用相同的贪心策略分别运行批量引擎和参考引擎，检验胜率和平均回合数的统计等价性"""
+    import random
+
+    batch_report = BatchBattleSimulator(batch_count, seed=seed, max_turns=max_turns).run()
+    reference_report = BattleSimulator(
+        GreedyStrategy(), max_turns=max_turns, rng=random.Random(seed)
+    ).run(reference_count)
+
+    p_batch = batch_report['win_rate']
+    p_reference = reference_report['win_rate']
+    win_rate_z = _z_score(p_batch, p_batch * (1 - p_batch), batch_count,
+                          p_reference, p_reference * (1 - p_reference), reference_count)
+
+    turns_batch, var_batch = _turn_moments(batch_report)
+    turns_reference, var_reference = _turn_moments(reference_report)
+    turns_z = _z_score(turns_batch, var_batch, batch_count,
+                       turns_reference, var_reference, reference_count)
+
+    return {
+        'batch': batch_report,
+        'reference': reference_report,
+        'win_rate_z': win_rate_z,
+        'average_turns_z': turns_z,
+        'equivalent': abs(win_rate_z) < z_threshold and abs(turns_z) < z_threshold
+    }
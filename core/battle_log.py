@@ -0,0 +1,148 @@
+"""
+战斗日志 - 定长环形缓冲区中的结构化日志记录，按需格式化
+Battle Log - Structured Records in a Fixed-Capacity Ring Buffer, Formatted on Demand
+"""
+
+from collections import deque
+
+
+# 默认保留的日志条数（界面最多显示最近十几条，超出部分自动丢弃）
+DEFAULT_LOG_CAPACITY = 256
+
+
+# ============ 日志模板 ============
+# 日志记录只保存 (事件代码, 参数元组)，文字在读取时才按模板格式化
+
+LOG_TEMPLATES = {
+    # 通用文字（无法结构化的消息）
+    'text': "{0}",
+    'game_event': "{0}: {1}{2}",
+
+    # 战斗流程
+    'battle_start': "=== 战斗开始 ===",
+    'battle_seed': "战斗种子: {0}",
+    'enemy_appears': "面对敌人: {0} (HP:{1}/ATK:{2})",
+    'initial_draw': "抽取了 {0} 张初始手牌",
+    'turn_start': "回合 {0} 开始 - 出牌阶段",
+    'card_played': "使用了 {0}",
+    'compass_advance': "罗盘推进 {0} 格到位置 {1}（类型 {2}）",
+    'settlement_start': "--- 进入结算阶段 ---",
+    'double_attack_triggered': "攻击翻倍效果触发！伤害从 {0} 提升至 {1}",
+    'player_attack': "玩家攻击造成 {0} 点伤害给 {1}",
+    'player_attack_too_weak': "玩家攻击力不足，未造成伤害",
+    'enemy_attack': "{0} 攻击造成 {1} 点伤害",
+    'mp_restored': "恢复了 {0} 点MP",
+    'turn_skipped': "跳过此回合的出牌阶段",
+    'cards_drawn': "抽取了 {0} 张卡牌",
+    'defeat': "=== 战败 ===",
+    'defeat_detail': "你被击败了...",
+    'victory': "=== 胜利 ===",
+    'victory_detail': "成功击败了 {0}！",
+
+    # 卡牌效果
+    'fireball_damage': "Fireball直接造成 {0} 点伤害给 {1}",
+    'strike_atk': "Strike增加 {0} 点攻击力（当前攻击力: {1}）",
+    'heavy_blow_atk': "Heavy Blow增加 {0} 点攻击力（当前攻击力: {1}）",
+    'block_armor': "Block获得 {0} 点护甲",
+    'iron_will_armor': "Iron Will获得 {0} 点护甲",
+    'heal_hp': "Heal恢复 {0} 点HP",
+    'greater_heal_hp': "Greater Heal恢复 {0} 点HP",
+    'curse_skip': "Curse：下一回合跳过出牌阶段！",
+    'drain_hp': "Drain：失去 {0} 点HP",
+    'weakness_atk': "Weakness：攻击力减半至 {0}",
+    'weakness_min': "Weakness：攻击力已是最低值",
+
+    # 罗盘事件
+    'compass_event': "罗盘事件: {0}!",
+    'compass_event_effect': "效果: {0}",
+    'compass_normal': "罗盘静静地转动...",
+    'compass_unknown': "罗盘发出了奇怪的声音...",
+    'curse_added': "一张 {0} 被添加到你的牌库中",
+    'event_lose_hp': "你失去了 {0} 点HP",
+    'event_skip_turn': "你将跳过下一个出牌阶段",
+    'event_lose_mp': "你失去了 {0} 点MP",
+    'event_weaken': "你的攻击力降低了 {0} 点",
+    'event_discard': "你弃置了 {0}",
+    'event_discard_empty': "手牌为空，无法弃置",
+    'event_heal': "你恢复了 {0} 点HP",
+    'event_mp_bonus': "你获得了 {0} 点MP",
+    'event_double_attack': "你的下次攻击伤害将翻倍！",
+    'event_armor': "你获得了 {0} 点护甲",
+    'event_draw': "你抽取了 {0} 张卡牌",
+    'event_strengthen': "你的攻击力永久增加了 {0} 点",
+}
+
+
+def format_log_record(code, args):
+    """将一条日志记录格式化为文字"""
+    return LOG_TEMPLATES[code].format(*args)
+
+
+def console_sink(code, args):
+    """日志输出端：把每条日志打印到控制台"""
+    print(f"[战斗] {format_log_record(code, args)}")
+
+
+def multi_sink(*sinks):
+    """把多个日志输出端合并为一个（忽略None）"""
+    sinks = [sink for sink in sinks if sink is not None]
+    if not sinks:
+        return None
+    if len(sinks) == 1:
+        return sinks[0]
+
+    def sink(code, args):
+        for target in sinks:
+            target(code, args)
+    return sink
+
+
+class BattleLog:
+    """定长环形缓冲区战斗日志
+
+    每条记录是 (事件代码, 参数元组)，写入时不做任何字符串格式化；
+    缓冲区满后最旧的记录被自动丢弃。total 记录写入过的总条数，可作为日志版本号。
+    """
+
+    def __init__(self, capacity=DEFAULT_LOG_CAPACITY, sink=None):
+        """初始化战斗日志
+
+        Args:
+            capacity: 环形缓冲区容量
+            sink: 日志输出端，签名为 sink(code, args)，每写入一条记录调用一次；
+                  为None时不输出（无界面模拟）
+        """
+        self.records = deque(maxlen=capacity)
+        self.sink = sink
+        self.total = 0
+
+    def add(self, code, args=()):
+        """写入一条日志记录（参数应为不可变值，格式化会延迟到读取时）"""
+        self.records.append((code, args))
+        self.total += 1
+        if self.sink is not None:
+            self.sink(code, args)
+
+    def trace(self, code, args=()):
+        """只发送到输出端、不进入缓冲区的记录（界面不显示，仅供归档审计）"""
+        if self.sink is not None:
+            self.sink(code, args)
+
+    def get_recent(self, count):
+        """获取最近 count 条日志的文字"""
+        records = self.records
+        start = max(0, len(records) - count)
+        return [LOG_TEMPLATES[code].format(*args)
+                for code, args in (records[i] for i in range(start, len(records)))]
+
+    def get_all(self):
+        """获取缓冲区中全部日志的文字"""
+        return [format_log_record(code, args) for code, args in self.records]
+
+    def clear(self):
+        """清空日志（总条数继续累加，保证版本号单调递增）"""
+        self.records.clear()
+
+    def __len__(self):
+        """缓冲区中当前保留的记录数"""
+        return len(self.records)
@@ -3,56 +3,148 @@
 Battle Manager - Turn-based Combat Control and Context Management
 """
 
+import copy
+import random
+import struct
+
+from core.battle_log import BattleLog, DEFAULT_LOG_CAPACITY, console_sink
 from core.entities import Player, Enemy
 from core.card_system import CardSystem
 from core.compass_system import CompassSystem
+from core.state_version import VersionedState
+from core.zobrist import (
+    ZobristHashed, field_key, SKIP_NEXT_TURN, DOUBLE_NEXT_ATTACK,
+    TURN_COUNT, PHASE, BATTLE_ENDED, VICTORY
+)
 from data.events import trigger_compass_event
-from utils.helpers import validate_game_state
+from utils.helpers import validate_game_state, make_battle_rng, new_battle_seed
+
+
+# ============ 状态快照格式 ============
+# 头部: 回合数、阶段、战斗结束、胜利、玩家7项属性、敌人3项属性、罗盘位置、
+#       两个上下文标记、三个牌堆长度、敌人名称长度
+# 随后: 牌库、手牌、弃牌堆的卡牌编号（CARD_LIBRARY 下标，每张1字节），最后是敌人名称（UTF-8）
 
+SNAPSHOT_HEADER = struct.Struct('<IB??7i3iB??HHHB')
+PHASES = ("CARD_PHASE", "SETTLEMENT_PHASE")
+PHASE_INDEX = {phase: index for index, phase in enumerate(PHASES)}
 
-class BattleContext:
+
+class BattleContext(VersionedState, ZobristHashed):
     """战斗上下文，传递给各种效果函数"""
     
-    def __init__(self, player, enemy, card_system, compass, battle_manager):
-        """初始化战斗上下文"""
+    ZOBRIST_FIELDS = ((SKIP_NEXT_TURN, '_skip_next_turn'), (DOUBLE_NEXT_ATTACK, '_double_next_attack'))
+    
+    def __init__(self, player, enemy, card_system, compass, battle_manager,
+                 log_sink=None, log_capacity=DEFAULT_LOG_CAPACITY):
+        """初始化战斗上下文
+        
+        Args:
+            log_sink: 日志输出端 sink(code, args)，为None时日志只保存在环形缓冲区中
+            log_capacity: 日志环形缓冲区容量
+        """
         self.player = player
         self.enemy = enemy
         self.card_system = card_system
         self.compass = compass
         self.battle_manager = battle_manager
         
-        # 特殊状态标记
-        self.skip_next_turn = False
-        self.double_next_attack = False
+        # 随机数生成器与卡牌系统共用，保证同一场战斗只有一个随机流
+        self.rng = card_system.rng
+        
+        # 特殊状态标记（通过属性设置，修改时标记状态变化）
+        self._skip_next_turn = False
+        self._double_next_attack = False
+        self.compute_zobrist()
+        
+        # 战斗日志（结构化记录，读取时才格式化）
+        self.battle_log = BattleLog(log_capacity, log_sink)
+        
+    @property
+    def skip_next_turn(self):
+        """是否跳过下一个出牌阶段"""
+        return self._skip_next_turn
+        
+    @skip_next_turn.setter
+    def skip_next_turn(self, value):
+        self.rehash(SKIP_NEXT_TURN, self._skip_next_turn, value)
+        self._skip_next_turn = value
+        self.touch()
+        
+    @property
+    def double_next_attack(self):
+        """下次攻击是否翻倍"""
+        return self._double_next_attack
+        
+    @double_next_attack.setter
+    def double_next_attack(self, value):
+        self.rehash(DOUBLE_NEXT_ATTACK, self._double_next_attack, value)
+        self._double_next_attack = value
+        self.touch()
         
-        # 战斗日志
-        self.battle_log = []
+    def get_log_version(self):
+        """获取日志版本（写入过的总条数单调递增，即为版本）"""
+        return self.battle_log.total
         
-    def log(self, message):
-        """添加战斗日志"""
-        self.battle_log.append(message)
-        print(f"[战斗] {message}")
+    def log(self, code, *args):
+        """添加战斗日志
+        
+        Args:
+            code: battle_log.LOG_TEMPLATES 中的事件代码
+            args: 模板参数（不可变值）
+        """
+        self.battle_log.add(code, args)
+        
+    def trace(self, code, *args):
+        """记录只发送到日志输出端的审计事件（不显示在战斗日志中）"""
+        self.battle_log.trace(code, args)
+        
+    def log_text(self, message):
+        """添加无模板的文字日志"""
+        self.battle_log.add('text', (message,))
         
     def handle_compass_event(self, event_type):
         """处理罗盘事件"""
         trigger_compass_event(event_type, self)
         
     def get_recent_logs(self, count=8):
-        """获取最近的日志"""
-        return self.battle_log[-count:] if len(self.battle_log) > count else self.battle_log
+        """获取最近的日志文字（每次返回新列表）"""
+        return self.battle_log.get_recent(count)
 
 
 class BattleManager:
     """战斗管理器 - 控制整个战斗流程"""
     
-    def __init__(self):
-        """初始化战斗管理器"""
+    def __init__(self, log_sink=console_sink, rng=None, seed=None, log_capacity=DEFAULT_LOG_CAPACITY):
+        """初始化战斗管理器
+        
+        Args:
+            log_sink: 战斗日志输出端 sink(code, args)，默认打印到控制台；
+                      无界面模拟时传None，日志只写入环形缓冲区
+            rng: 本场战斗私有的 random.Random 或 numpy.random.Generator
+            seed: 未提供rng时用于创建私有随机数生成器的种子，
+                  相同种子和相同操作序列可以逐位复现整场战斗；
+                  两者都未提供时自动生成一个种子并记录在 self.seed 中
+            log_capacity: 战斗日志环形缓冲区容量
+        """
+        self.log_sink = log_sink
+        self.log_capacity = log_capacity
+        
+        # 自己创建的随机流总是有种子，重新开始时可以换新种子重新播种
+        self.owns_rng = rng is None
+        if self.owns_rng and seed is None:
+            seed = new_battle_seed()
+        self.seed = seed
+        
+        # 本场战斗私有的随机数生成器，卡牌系统和罗盘事件共用
+        self.rng = make_battle_rng(rng, seed)
+        
         # 创建游戏实体
         self.player = Player()
         self.enemy = Enemy("Forest Goblin", 80, 12)
         
         # 创建游戏系统
-        self.card_system = CardSystem()
+        self.card_system = CardSystem(rng=self.rng)
         self.compass = CompassSystem()
         
         # 战斗状态
@@ -64,22 +156,27 @@ class BattleManager:
         # 创建战斗上下文
         self.battle_context = BattleContext(
             self.player, self.enemy, self.card_system, 
-            self.compass, self
+            self.compass, self, self.log_sink, self.log_capacity
         )
         
         # 每回合MP恢复量
         self.mp_recovery_per_turn = 3
         
+        # get_game_state 的分段缓存：段名 -> (版本键, 数据)
+        self._state_cache = {}
+        
     def start_battle(self):
         """开始战斗"""
-        self.battle_context.log("=== 战斗开始 ===")
-        self.battle_context.log(f"面对敌人: {self.enemy.name} (HP:{self.enemy.hp}/ATK:{self.enemy.atk})")
+        self.battle_context.log('battle_start')
+        # 种子只写入日志输出端（归档日志据此找回并复现每场战斗），不显示在战斗日志中
+        self.battle_context.trace('battle_seed', self.seed)
+        self.battle_context.log('enemy_appears', self.enemy.name, self.enemy.hp, self.enemy.atk)
         
         # 补充初始手牌
         cards_drawn = self.card_system.fill_hand()
-        self.battle_context.log(f"抽取了 {cards_drawn} 张初始手牌")
+        self.battle_context.log('initial_draw', cards_drawn)
         
-        self.battle_context.log(f"回合 {self.turn_count} 开始 - 出牌阶段")
+        self.battle_context.log('turn_start', self.turn_count)
         
     def play_card(self, card_index):
         """玩家出牌"""
@@ -92,7 +189,6 @@ class BattleManager:
         success, message = self.card_system.play_card(card_index, self.battle_context)
         
         if success:
-            self.battle_context.log(message)
             # 检查战斗是否结束（主要针对直接伤害卡牌）
             self._check_battle_end()
             
@@ -104,7 +200,7 @@ class BattleManager:
             return False, "无法进入结算阶段"
             
         self.phase = "SETTLEMENT_PHASE"
-        self.battle_context.log("--- 进入结算阶段 ---")
+        self.battle_context.log('settlement_start')
         
         # 玩家攻击结算
         self._player_attack_settlement()
@@ -132,15 +228,15 @@ class BattleManager:
         # 检查是否有攻击翻倍效果
         if self.battle_context.double_next_attack:
             total_damage *= 2
-            self.battle_context.log(f"攻击翻倍效果触发！伤害从 {self.player.atk} 提升至 {total_damage}")
+            self.battle_context.log('double_attack_triggered', self.player.atk, total_damage)
             self.battle_context.double_next_attack = False
         
         # 对敌人造成伤害
         if total_damage > 1:  # 基础攻击力1不造成伤害
             actual_damage = self.enemy.take_damage(total_damage - 1)  # 减去基础1点攻击
-            self.battle_context.log(f"玩家攻击造成 {actual_damage} 点伤害给 {self.enemy.name}")
+            self.battle_context.log('player_attack', actual_damage, self.enemy.name)
         else:
-            self.battle_context.log("玩家攻击力不足，未造成伤害")
+            self.battle_context.log('player_attack_too_weak')
         
     def _enemy_turn(self):
         """敌人回合"""
@@ -151,7 +247,7 @@ class BattleManager:
         damage = self.enemy.get_attack_damage()
         actual_damage = self.player.take_damage(damage)
         
-        self.battle_context.log(f"{self.enemy.name} 攻击造成 {actual_damage} 点伤害")
+        self.battle_context.log('enemy_attack', self.enemy.name, actual_damage)
         
         # 检查战斗结束
         self._check_battle_end()
@@ -170,11 +266,11 @@ class BattleManager:
         # 恢复MP
         mp_restored = self.player.restore_mp(self.mp_recovery_per_turn)
         if mp_restored > 0:
-            self.battle_context.log(f"恢复了 {mp_restored} 点MP")
+            self.battle_context.log('mp_restored', mp_restored)
         
         # 处理特殊状态
         if self.battle_context.skip_next_turn:
-            self.battle_context.log("跳过此回合的出牌阶段")
+            self.battle_context.log('turn_skipped')
             self.battle_context.skip_next_turn = False
             # 直接进入结算阶段
             self.start_settlement_phase()
@@ -183,43 +279,240 @@ class BattleManager:
         # 补充手牌
         cards_drawn = self.card_system.fill_hand()
         if cards_drawn > 0:
-            self.battle_context.log(f"抽取了 {cards_drawn} 张卡牌")
+            self.battle_context.log('cards_drawn', cards_drawn)
         
-        self.battle_context.log(f"回合 {self.turn_count} 开始 - 出牌阶段")
+        self.battle_context.log('turn_start', self.turn_count)
         
     def _check_battle_end(self):
         """检查战斗结束条件"""
         if not self.player.is_alive():
             self.battle_ended = True
             self.victory = False
-            self.battle_context.log("=== 战败 ===")
-            self.battle_context.log("你被击败了...")
+            self.battle_context.log('defeat')
+            self.battle_context.log('defeat_detail')
             return True
             
         elif not self.enemy.is_alive():
             self.battle_ended = True
             self.victory = True
-            self.battle_context.log("=== 胜利 ===")
-            self.battle_context.log(f"成功击败了 {self.enemy.name}！")
+            self.battle_context.log('victory')
+            self.battle_context.log('victory_detail', self.enemy.name)
             return True
             
         return False
         
+    def snapshot(self):
+        """把完整战斗状态打包为一个字节串
+        
+        包含玩家、敌人、三个牌堆、罗盘位置、上下文标记和回合/阶段；
+        随机数生成器和战斗日志不在快照中。牌堆本身就是卡牌编号数组，直接拷贝。
+        """
+        player = self.player
+        enemy = self.enemy
+        card_system = self.card_system
+        context = self.battle_context
+        
+        enemy_name = enemy.name.encode('utf-8')
+        header = SNAPSHOT_HEADER.pack(
+            self.turn_count, PHASE_INDEX[self.phase], self.battle_ended, self.victory,
+            player.max_hp, player.hp, player.max_mp, player.mp,
+            player.base_atk, player.atk, player.armor,
+            enemy.max_hp, enemy.hp, enemy.atk,
+            self.compass.current_position,
+            context._skip_next_turn, context._double_next_attack,
+            len(card_system.deck), len(card_system.hand), len(card_system.played_cards),
+            len(enemy_name)
+        )
+        return b''.join((
+            header,
+            card_system.deck,
+            card_system.hand,
+            card_system.played_cards,
+            enemy_name
+        ))
+        
+    def restore(self, data):
+        """从 snapshot() 生成的字节串恢复战斗状态
+        
+        就地修改现有的实体和系统对象（保持对象引用不变），并标记它们的状态已变化。
+        """
+        (turn_count, phase, battle_ended, victory,
+         player_max_hp, player_hp, player_max_mp, player_mp,
+         player_base_atk, player_atk, player_armor,
+         enemy_max_hp, enemy_hp, enemy_atk,
+         compass_position, skip_next_turn, double_next_attack,
+         deck_count, hand_count, played_count, name_length) = SNAPSHOT_HEADER.unpack_from(data)
+        
+        offset = SNAPSHOT_HEADER.size
+        hand_start = offset + deck_count
+        played_start = hand_start + hand_count
+        name_start = played_start + played_count
+        if len(data) != name_start + name_length:
+            raise ValueError("快照数据长度不匹配")
+        
+        self.turn_count = turn_count
+        self.phase = PHASES[phase]
+        self.battle_ended = battle_ended
+        self.victory = victory
+        
+        player = self.player
+        player.max_hp = player_max_hp
+        player.hp = player_hp
+        player.max_mp = player_max_mp
+        player.mp = player_mp
+        player.base_atk = player_base_atk
+        player.atk = player_atk
+        player.armor = player_armor
+        player.compute_zobrist()
+        player.touch()
+        
+        enemy = self.enemy
+        enemy.max_hp = enemy_max_hp
+        enemy.hp = enemy_hp
+        enemy.atk = enemy_atk
+        enemy.name = data[name_start:].decode('utf-8')
+        enemy.compute_zobrist()
+        enemy.touch()
+        
+        card_system = self.card_system
+        card_system.deck[:] = data[offset:hand_start]
+        card_system.hand[:] = data[hand_start:played_start]
+        card_system.played_cards[:] = data[played_start:name_start]
+        card_system.compute_zobrist()
+        card_system.touch()
+        
+        self.compass.current_position = compass_position
+        self.compass.compute_zobrist()
+        self.compass.touch()
+        
+        context = self.battle_context
+        context._skip_next_turn = skip_next_turn
+        context._double_next_attack = double_next_attack
+        context.compute_zobrist()
+        context.touch()
+        
+    def clone(self, rng=None):
+        """复制一个可独立推进的战斗，用于AI前瞻搜索
+        
+        只复制实体和系统的标量属性以及三个牌堆的卡牌编号数组（卡牌模板不可变，
+        无需复制）。副本不带日志历史，也不输出日志。
+        
+        Args:
+            rng: 副本使用的随机数生成器；为None时复制当前随机流的状态，
+                 副本与原战斗执行相同操作会得到相同结果
+        """
+        cls = self.__class__
+        clone = cls.__new__(cls)
+        clone.__dict__.update(self.__dict__)
+        clone._state_cache = {}
+        clone.log_sink = None
+        
+        if rng is None:
+            if isinstance(self.rng, random.Random):
+                rng = random.Random()
+                rng.setstate(self.rng.getstate())
+            else:
+                rng = copy.deepcopy(self.rng)
+        else:
+            # 外部传入的随机流不归副本所有，重新开始时不能重新播种
+            clone.owns_rng = False
+        clone.rng = rng
+        
+        player = self.player.__class__.__new__(self.player.__class__)
+        player.__dict__.update(self.player.__dict__)
+        clone.player = player
+        
+        enemy = self.enemy.__class__.__new__(self.enemy.__class__)
+        enemy.__dict__.update(self.enemy.__dict__)
+        clone.enemy = enemy
+        
+        source_cards = self.card_system
+        card_system = source_cards.__class__.__new__(source_cards.__class__)
+        card_system.__dict__.update(source_cards.__dict__)
+        card_system.deck = source_cards.deck.copy()
+        card_system.hand = source_cards.hand.copy()
+        card_system.played_cards = source_cards.played_cards.copy()
+        card_system.rng = rng
+        clone.card_system = card_system
+        
+        compass = self.compass.__class__.__new__(self.compass.__class__)
+        compass.__dict__.update(self.compass.__dict__)
+        clone.compass = compass
+        
+        source_context = self.battle_context
+        context = source_context.__class__.__new__(source_context.__class__)
+        context.__dict__.update(source_context.__dict__)
+        context.player = player
+        context.enemy = enemy
+        context.card_system = card_system
+        context.compass = compass
+        context.battle_manager = clone
+        context.rng = rng
+        context.battle_log = BattleLog(self.log_capacity)
+        clone.battle_context = context
+        
+        return clone
+        
+    def get_state_hash(self):
+        """64位局面哈希，用作搜索缓存和重复局面检测的键
+        
+        各实体和系统在每次修改时以O(1)更新自己的增量哈希，这里只把它们与回合、阶段
+        和胜负标记的键异或起来，不会重新计算整个状态。牌堆按多重集计入（不含牌库顺序），
+        相同的可见局面得到相同的哈希，与进程和运行无关。
+        """
+        return (self.player.zobrist ^ self.enemy.zobrist ^ self.card_system.zobrist
+                ^ self.compass.zobrist ^ self.battle_context.zobrist
+                ^ field_key(TURN_COUNT, self.turn_count)
+                ^ field_key(PHASE, PHASE_INDEX[self.phase])
+                ^ field_key(BATTLE_ENDED, self.battle_ended)
+                ^ field_key(VICTORY, self.victory))
+        
+    def get_state_version(self):
+        """获取整体状态版本键，任意实体、系统或上下文变化后都会改变"""
+        return (
+            self.turn_count, self.phase, self.battle_ended, self.victory,
+            self.player, self.player.state_version,
+            self.enemy, self.enemy.state_version,
+            self.card_system.state_version,
+            self.compass.state_version,
+            self.battle_context, self.battle_context.state_version,
+            self.battle_context.get_log_version()
+        )
+        
+    def _get_cached_section(self, section, key, builder):
+        """按版本键缓存状态的某一部分，版本未变时直接返回缓存"""
+        cached = self._state_cache.get(section)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = builder()
+        self._state_cache[section] = (key, value)
+        return value
+        
     def get_game_state(self):
-        """获取完整的游戏状态"""
-        # 验证游戏状态
-        state_valid, errors = validate_game_state(self.player, self.enemy)
+        """获取完整的游戏状态
+        
+        状态按部分缓存：只有版本号发生变化的部分才会重新构建，整体未变化时
+        直接返回上一次的字典对象。调用方应将返回值视为只读。
+        """
+        version = self.get_state_version()
+        cached = self._state_cache.get('game_state')
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        player_key = (self.player, self.player.state_version)
+        enemy_key = (self.enemy, self.enemy.state_version)
+        cards_key = (self.card_system.state_version,)
+        compass_key = (self.compass.state_version,)
+        context_key = (self.battle_context, self.battle_context.state_version)
+        log_key = (self.battle_context, self.battle_context.get_log_version())
         
-        # 检查手牌可用性
-        hand_info = self.card_system.get_hand_info()
-        for card_info in hand_info:
-            card = self.card_system.hand[card_info['index']]
-            # 只有在出牌阶段且未被跳过时才能出牌
-            card_info['playable'] = (card.can_play(self.player) and 
-                                   self.phase == "CARD_PHASE" and 
-                                   not self.battle_context.skip_next_turn)
+        # 验证游戏状态
+        state_valid, errors = self._get_cached_section(
+            'validation', player_key + enemy_key,
+            lambda: validate_game_state(self.player, self.enemy)
+        )
         
-        return {
+        game_state = {
             # 基础战斗信息
             'turn_count': self.turn_count,
             'phase': self.phase,
@@ -227,33 +520,66 @@ class BattleManager:
             'victory': self.victory,
             
             # 实体状态
-            'player': self.player.get_status_info(),
-            'enemy': self.enemy.get_status_info(),
+            'player': self._get_cached_section('player', player_key, self.player.get_status_info),
+            'enemy': self._get_cached_section('enemy', enemy_key, self.enemy.get_status_info),
             
-            # 卡牌系统
-            'hand': hand_info,
+            # 卡牌系统（手牌可用性还取决于玩家MP、阶段和跳过状态，罗盘预览取决于罗盘位置）
+            'hand': self._get_cached_section(
+                'hand', cards_key + player_key + context_key + compass_key + (self.phase,),
+                self._build_hand_info
+            ),
             'deck_count': self.card_system.get_deck_count(),
             'played_count': self.card_system.get_played_count(),
             
             # 罗盘系统
             'compass_position': self.compass.get_current_position(),
-            'compass_visual': self.compass.get_visual_representation(),
-            'compass_stats': self.compass.get_statistics(),
+            'compass_visual': self._get_cached_section(
+                'compass_visual', compass_key, self.compass.get_visual_representation
+            ),
+            'compass_stats': self._get_cached_section(
+                'compass_stats', compass_key, self.compass.get_statistics
+            ),
             
             # 特殊状态
             'skip_next_turn': self.battle_context.skip_next_turn,
             'double_next_attack': self.battle_context.double_next_attack,
             
             # 战斗日志
-            'battle_log': self.battle_context.get_recent_logs(),
+            'battle_log': self._get_cached_section(
+                'battle_log', log_key, self.battle_context.get_recent_logs
+            ),
             
             # 系统状态
             'state_valid': state_valid,
             'errors': errors if not state_valid else []
         }
         
-    def reset_battle(self):
-        """重置战斗（用于重新开始）"""
+        self._state_cache['game_state'] = (version, game_state)
+        return game_state
+        
+    def _build_hand_info(self):
+        """构建手牌信息并计算可用性和打出后触发的罗盘事件类型"""
+        hand_info = self.card_system.get_hand_info()
+        for card_info in hand_info:
+            card = self.card_system.get_hand_card(card_info['index'])
+            # 只有在出牌阶段且未被跳过时才能出牌
+            card_info['playable'] = (card.can_play(self.player) and 
+                                   self.phase == "CARD_PHASE" and 
+                                   not self.battle_context.skip_next_turn)
+            card_info['compass_outcome'] = self.compass.preview(card.compass_points)[1]
+        return hand_info
+        
+    def reset_battle(self, seed=None):
+        """重置战斗（用于重新开始）
+        
+        Args:
+            seed: 新战斗的种子，为None时自动生成；随机流由外部注入时保持原随机流不变。
+                  重新播种后的战斗与 BattleManager(seed=seed) 新开的战斗完全一致
+        """
+        if self.owns_rng:
+            self.seed = seed if seed is not None else new_battle_seed()
+            self.rng.seed(self.seed)
+        
         # 重置实体
         self.player = Player()
         self.enemy = Enemy("Forest Goblin", 80, 12)
@@ -273,7 +599,7 @@ class BattleManager:
         # 重新创建战斗上下文
         self.battle_context = BattleContext(
             self.player, self.enemy, self.card_system, 
-            self.compass, self
+            self.compass, self, self.log_sink, self.log_capacity
         )
         
         # 开始新战斗
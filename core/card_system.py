@@ -3,24 +3,72 @@
 Card System Management - Deck, Hand, and Card Playing Logic
 """
 
-import random
-from data.cards import create_starting_deck
-from utils.helpers import shuffle_list
+from core.state_version import VersionedState
+from core.zobrist import MASK64, pile_sum, combine_piles
+from data.cards import CARD_LIBRARY, CARD_REGISTRY, create_starting_numbers
+from utils.helpers import make_battle_rng
 
 
-class CardSystem:
-    """卡牌管理系统，处理牌库、手牌、出牌逻辑"""
+def card_numbers(cards):
+    """把卡牌模板列表转换为卡牌编号数组"""
+    number_of = CARD_REGISTRY.number_of
+    return bytearray(number_of(card.id) for card in cards)
+
+
+def pile_hash(pile):
+    """卡牌编号数组的多重集哈希"""
+    return pile_sum(CARD_LIBRARY[number].hash_key for number in pile)
+
+
+def shuffle_pile(pile, rng):
+    """原地洗牌（Fisher–Yates）并翻转，使牌库顶位于数组末尾
     
-    def __init__(self, initial_deck=None):
-        """初始化卡牌系统"""
-        if initial_deck is None:
-            initial_deck = create_starting_deck()
+    随机数消耗与抽牌顺序都与“复制后洗牌、从下标0抽牌”完全一致，
+    同一种子的战斗结果不变。
+    """
+    rng.shuffle(pile)
+    pile.reverse()
+    return pile
+
+
+class CardSystem(VersionedState):
+    """卡牌管理系统，处理牌库、手牌、出牌逻辑（原地修改牌堆后调用 touch 标记变化）
+    
+    三个牌堆都是卡牌编号（CARD_LIBRARY 下标）的 bytearray，每张牌只占1字节；
+    卡牌本身是共享的不可变模板，需要时用 CARD_LIBRARY[编号] 取得。
+    牌库顶在数组末尾，抽牌（pop）和插入牌库顶（append）都是O(1)；
+    重新洗牌时原地打乱弃牌堆后与空牌库交换，不复制牌堆。
+    deck_hash/hand_hash/played_hash 是三个牌堆的多重集哈希（卡牌键之和），
+    卡牌在牌堆之间移动时以O(1)更新，zobrist 由三者混合得到。
+    """
+    
+    def __init__(self, initial_deck=None, rng=None):
+        """初始化卡牌系统
         
-        self.deck = shuffle_list(initial_deck)  # 牌库
-        self.hand = []                          # 手牌
-        self.played_cards = []                  # 已使用卡牌堆
+        Args:
+            initial_deck: 初始卡组（卡牌模板列表），为空时使用起始牌库
+            rng: 该场战斗私有的随机数生成器，为空时自动创建
+        """
+        self.rng = make_battle_rng(rng)
+        if initial_deck is None:
+            numbers = bytearray(create_starting_numbers())
+        else:
+            numbers = card_numbers(initial_deck)
+        self.deck = shuffle_pile(numbers, self.rng)  # 牌库（牌库顶在末尾）
+        self.hand = bytearray()                 # 手牌
+        self.played_cards = bytearray()         # 已使用卡牌堆
         self.max_hand_size = 5                  # 最大手牌数量
         
+        # 牌堆哈希
+        self.deck_hash = pile_hash(self.deck)
+        self.hand_hash = 0
+        self.played_hash = 0
+        
+    @property
+    def zobrist(self):
+        """卡牌系统的增量哈希（牌库、手牌、弃牌堆的内容，不含牌库顺序）"""
+        return combine_piles(self.deck_hash, self.hand_hash, self.played_hash)
+        
     def draw_cards(self, count):
         """抽牌到手牌"""
         cards_drawn = 0
@@ -32,21 +80,44 @@ class CardSystem:
                 
             # 从牌库抽牌
             if len(self.deck) > 0:
-                card = self.deck.pop(0)
-                self.hand.append(card)
+                number = self.deck.pop()
+                self.hand.append(number)
+                self._hash_draw(number)
                 cards_drawn += 1
             elif len(self.played_cards) > 0:
                 # 牌库空了，重新洗牌
                 self._reshuffle_played_cards()
                 if len(self.deck) > 0:
-                    card = self.deck.pop(0)
-                    self.hand.append(card)
+                    number = self.deck.pop()
+                    self.hand.append(number)
+                    self._hash_draw(number)
                     cards_drawn += 1
             else:
                 # 牌库和弃牌堆都空了，无法抓牌
                 break
         
+        if cards_drawn > 0:
+            self.touch()
         return cards_drawn
+        
+    def compute_zobrist(self):
+        """按当前三个牌堆重新计算牌堆哈希（只在整体恢复状态时使用）"""
+        self.deck_hash = pile_hash(self.deck)
+        self.hand_hash = pile_hash(self.hand)
+        self.played_hash = pile_hash(self.played_cards)
+        return self.zobrist
+        
+    def _hash_draw(self, number):
+        """卡牌从牌库移到手牌后更新牌堆哈希"""
+        key = CARD_LIBRARY[number].hash_key
+        self.deck_hash = (self.deck_hash - key) & MASK64
+        self.hand_hash = (self.hand_hash + key) & MASK64
+        
+    def _hash_discard(self, number):
+        """卡牌从手牌移到弃牌堆后更新牌堆哈希"""
+        key = CARD_LIBRARY[number].hash_key
+        self.hand_hash = (self.hand_hash - key) & MASK64
+        self.played_hash = (self.played_hash + key) & MASK64
                     
     def fill_hand(self):
         """补充手牌到满"""
@@ -60,7 +131,7 @@ class CardSystem:
         if not (0 <= card_index < len(self.hand)):
             return False, "无效的卡牌索引"
         
-        card = self.hand[card_index]
+        card = CARD_LIBRARY[self.hand[card_index]]
         
         # 检查是否可以使用
         if not card.can_play(battle_context.player):
@@ -69,41 +140,77 @@ class CardSystem:
         # 消耗MP
         battle_context.player.consume_mp(card.mp_cost)
         
+        # 先从手牌中移出，避免罗盘事件（如随机弃牌）改动手牌后索引失效
+        played_number = self.hand.pop(card_index)
+        self.touch()
+        
         # 执行卡牌效果
         card.execute_effect(battle_context)
         
         # 推进罗盘
         event_type = battle_context.compass.advance(card.compass_points)
+        battle_context.trace('compass_advance', card.compass_points,
+                             battle_context.compass.current_position, event_type)
         battle_context.handle_compass_event(event_type)
         
         # 移动卡牌到弃牌堆
-        played_card = self.hand.pop(card_index)
-        self.played_cards.append(played_card)
+        self.played_cards.append(played_number)
+        self._hash_discard(played_number)
+        self.touch()
+        battle_context.log('card_played', card.name)
         
         return True, f"使用了 {card.name}"
         
     def add_negative_card(self, negative_card):
-        """添加负面卡牌到牌库顶部"""
-        self.deck.insert(0, negative_card)
+        """添加负面卡牌（模板）到牌库顶部"""
+        self.deck.append(CARD_REGISTRY.number_of(negative_card.id))
+        self.deck_hash = (self.deck_hash + negative_card.hash_key) & MASK64
+        self.touch()
         
+    def shuffle_deck(self, rng=None):
+        """原地打乱牌库顺序（内容和哈希不变）
+
+        用于搜索：从玩家视角看牌库顺序是未知的，副本在搜索前重新打乱，
+        避免智能体按真实的抽牌顺序做决定。
+
+        Args:
+            rng: 使用的随机数生成器，为空时使用卡牌系统的随机流
+        """
+        (rng if rng is not None else self.rng).shuffle(self.deck)
+        self.touch()
+
     def remove_card_from_hand(self, card_index):
-        """从手牌中移除卡牌（用于弃牌等效果）"""
+        """从手牌中移除卡牌（用于弃牌等效果），返回被移除的卡牌模板"""
         if 0 <= card_index < len(self.hand):
-            removed_card = self.hand.pop(card_index)
-            self.played_cards.append(removed_card)
-            return removed_card
+            removed_number = self.hand.pop(card_index)
+            self.played_cards.append(removed_number)
+            self._hash_discard(removed_number)
+            self.touch()
+            return CARD_LIBRARY[removed_number]
         return None
         
+    def get_hand_card(self, card_index):
+        """获取手牌中指定位置的卡牌模板"""
+        return CARD_LIBRARY[self.hand[card_index]]
+        
+    def get_hand_cards(self):
+        """获取手牌的卡牌模板列表（按手牌顺序）"""
+        return [CARD_LIBRARY[number] for number in self.hand]
+        
     def get_hand_info(self):
         """获取手牌信息"""
         hand_info = []
-        for i, card in enumerate(self.hand):
-            info = card.get_display_info()
+        for i, number in enumerate(self.hand):
+            info = CARD_LIBRARY[number].get_display_info()
             info['index'] = i
             info['playable'] = False  # 这个需要在有battle_context时才能确定
             hand_info.append(info)
         return hand_info
         
+    def get_deck_order(self):
+        """获取牌库的卡牌编号（按抽牌顺序，牌库顶在前）"""
+        return self.deck[::-1]
+        
     def get_deck_count(self):
         """获取牌库剩余数量"""
         return len(self.deck)
@@ -119,19 +226,26 @@ class CardSystem:
     def _reshuffle_played_cards(self):
         """重新洗牌弃牌堆"""
         if len(self.played_cards) > 0:
-            self.deck = shuffle_list(self.played_cards)
+            # 弃牌堆原地洗牌后成为牌库，原牌库的数组清空后作为新的弃牌堆
+            self.deck, self.played_cards = shuffle_pile(self.played_cards, self.rng), self.deck
             self.played_cards.clear()
+            self.deck_hash = self.played_hash
+            self.played_hash = 0
+            self.touch()
             
     def reset_for_new_battle(self):
-        """为新战斗重置卡牌系统"""
-        # 将所有卡牌重新放入牌库
-        all_cards = self.deck + self.hand + self.played_cards
-        self.deck = shuffle_list(all_cards)
+        """为新战斗重置卡牌系统
+        
+        重新使用初始卡组（上一场战斗中加入的负面卡牌不会带入新战斗），
+        初始手牌由 BattleManager.start_battle 抽取，与新建卡牌系统时的随机调用顺序一致。
+        """
+        self.deck = shuffle_pile(bytearray(create_starting_numbers()), self.rng)
         self.hand.clear()
         self.played_cards.clear()
-        
-        # 抽取初始手牌
-        self.fill_hand()
+        self.deck_hash = pile_hash(self.deck)
+        self.hand_hash = 0
+        self.played_hash = 0
+        self.touch()
         
     def get_statistics(self):
         """获取卡牌系统统计信息"""
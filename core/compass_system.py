@@ -3,6 +3,10 @@
 Compass System - Circular Compass Mechanism Management
 """
 
+from core.state_version import VersionedState
+from core.zobrist import ZobristHashed, COMPASS_POSITION
+
+
 class CompassPosition:
     """罗盘位置类型定义"""
     NORMAL = 0      # 无事发生 (■)
@@ -10,6 +14,14 @@ class CompassPosition:
     LUCKY = 2       # 幸运事件 (★)
 
 
+# 事件类型及其显示符号（按类型值索引）
+EVENT_TYPES = (CompassPosition.NORMAL, CompassPosition.NEGATIVE, CompassPosition.LUCKY)
+EVENT_SYMBOLS = ('■', '□', '★')
+
+# 卡牌罗盘点数的最大值（推进结果表覆盖 0 到该值的步数，更大的步数按取模计算）
+MAX_COMPASS_STEPS = 3
+
+
 # 12位置环形罗盘配置（顺时针）
 # 6个正常位置，5个负面事件位置，1个幸运事件位置
 COMPASS_LAYOUT = [
@@ -28,27 +40,109 @@ COMPASS_LAYOUT = [
 ]
 
 
-class CompassSystem:
-    """环形罗盘机制管理"""
+class CompassTables:
+    """罗盘布局的预计算跳转表（每种布局只构建一次，所有罗盘共享且只读）
+    
+    所有表都按 [事件类型][当前位置] 或 [推进步数][当前位置] 下标，查询为O(1)：
+    steps_to       到下一个该类型位置的步数（1~环长，不含当前位置，整圈回到自身时为环长）
+    next_position  下一个该类型位置
+    upcoming       转一圈内（不含当前位置）依次经过的该类型位置
+    outcomes       推进 k 步后的 (位置, 事件类型)；推进0步时触发当前位置的事件
+    布局中没有的事件类型，steps_to 和 next_position 为None。
+    """
+    
+    def __init__(self, layout, max_steps=MAX_COMPASS_STEPS):
+        """按布局构建跳转表"""
+        size = len(layout)
+        self.layout = tuple(layout)
+        self.size = size
+        self.max_steps = max_steps
+        self.type_counts = tuple(self.layout.count(event_type) for event_type in EVENT_TYPES)
+        
+        steps_to = []
+        next_position = []
+        upcoming = []
+        for event_type in EVENT_TYPES:
+            type_steps = []
+            type_next = []
+            type_upcoming = []
+            for position in range(size):
+                steps = next((step for step in range(1, size + 1)
+                              if layout[(position + step) % size] == event_type), None)
+                type_steps.append(steps)
+                type_next.append(None if steps is None else (position + steps) % size)
+                type_upcoming.append(tuple((position + step) % size for step in range(1, size)
+                                           if layout[(position + step) % size] == event_type))
+            steps_to.append(tuple(type_steps))
+            next_position.append(tuple(type_next))
+            upcoming.append(tuple(type_upcoming))
+        self.steps_to = tuple(steps_to)
+        self.next_position = tuple(next_position)
+        self.upcoming = tuple(upcoming)
+        
+        self.outcomes = tuple(
+            tuple(((position + steps) % size, layout[(position + steps) % size]) for position in range(size))
+            for steps in range(max_steps + 1)
+        )
+
+
+_COMPASS_TABLES = {}
+
+
+def get_compass_tables(layout):
+    """获取布局的跳转表（按布局内容缓存）"""
+    key = tuple(layout)
+    tables = _COMPASS_TABLES.get(key)
+    if tables is None:
+        tables = CompassTables(key)
+        _COMPASS_TABLES[key] = tables
+    return tables
+
+
+class CompassSystem(VersionedState, ZobristHashed):
+    """环形罗盘机制管理（位置变化时同时以O(1)更新增量哈希 zobrist）"""
+    
+    ZOBRIST_FIELDS = ((COMPASS_POSITION, 'current_position'),)
     
     def __init__(self):
         """初始化罗盘系统"""
         self.current_position = 0       # 当前位置(0-11)
-        self.total_positions = 12       # 总位置数
         self.layout = COMPASS_LAYOUT    # 位置事件类型布局
+        self.total_positions = len(self.layout)  # 总位置数
+        self.tables = get_compass_tables(self.layout)  # 预计算跳转表
+        self.compute_zobrist()
         
     def advance(self, steps):
         """推进罗盘指定步数"""
         if steps <= 0:
             return self.check_current_event()
             
+        old_position = self.current_position
         self.current_position = (self.current_position + steps) % self.total_positions
+        self.rehash(COMPASS_POSITION, old_position, self.current_position)
+        self.touch()
         return self.check_current_event()
     
     def check_current_event(self):
         """检查当前位置的事件类型"""
         return self.layout[self.current_position]
     
+    def preview(self, steps):
+        """预览推进指定步数后的 (位置, 事件类型)，不修改罗盘（打出某张牌会发生什么）"""
+        steps = max(0, steps)
+        if steps <= self.tables.max_steps:
+            return self.tables.outcomes[steps][self.current_position]
+        position = (self.current_position + steps) % self.total_positions
+        return position, self.layout[position]
+    
+    def get_steps_to(self, event_type):
+        """获取到下一个指定类型位置的步数（布局中没有该类型时为None）"""
+        return self.tables.steps_to[event_type][self.current_position]
+    
+    def get_next_position(self, event_type):
+        """获取下一个指定类型的位置（布局中没有该类型时为None）"""
+        return self.tables.next_position[event_type][self.current_position]
+    
     def get_current_position(self):
         """获取当前位置"""
         return self.current_position
@@ -61,7 +155,7 @@ class CompassSystem:
     
     def get_visual_representation(self):
         """获取罗盘的可视化表示"""
-        symbols = ['■', '□', '★']
+        symbols = EVENT_SYMBOLS
         visual = []
         
         for i, event_type in enumerate(self.layout):
@@ -75,7 +169,7 @@ class CompassSystem:
     
     def get_compass_display(self):
         """获取罗盘的圆形显示布局"""
-        symbols = ['■', '□', '★']
+        symbols = EVENT_SYMBOLS
         display = {}
         
         # 12个位置的圆形布局
@@ -108,32 +202,26 @@ class CompassSystem:
         return display
     
     def get_steps_to_lucky(self):
-        """获取到幸运事件位置的步数"""
-        lucky_position = 11  # 幸运事件固定在位置11
-        steps = (lucky_position - self.current_position) % self.total_positions
-        return steps if steps > 0 else 12
+        """获取到下一个幸运事件位置的步数（布局中没有幸运位置时为None）"""
+        return self.tables.steps_to[CompassPosition.LUCKY][self.current_position]
     
     def get_next_negative_positions(self):
         """获取接下来的负面事件位置"""
-        negative_positions = []
-        for i in range(1, self.total_positions):
-            pos = (self.current_position + i) % self.total_positions
-            if self.layout[pos] == CompassPosition.NEGATIVE:
-                negative_positions.append(pos)
-        return negative_positions
+        return list(self.tables.upcoming[CompassPosition.NEGATIVE][self.current_position])
     
     def reset_position(self, position=0):
         """重置罗盘位置"""
+        old_position = self.current_position
         if 0 <= position < self.total_positions:
             self.current_position = position
         else:
             self.current_position = 0
+        self.rehash(COMPASS_POSITION, old_position, self.current_position)
+        self.touch()
     
     def get_statistics(self):
         """获取罗盘统计信息"""
-        normal_count = self.layout.count(CompassPosition.NORMAL)
-        negative_count = self.layout.count(CompassPosition.NEGATIVE)
-        lucky_count = self.layout.count(CompassPosition.LUCKY)
+        normal_count, negative_count, lucky_count = self.tables.type_counts
         
         return {
             'total_positions': self.total_positions,
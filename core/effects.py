@@ -0,0 +1,244 @@
+"""
+效果操作码 - 卡牌和罗盘事件效果的声明式描述、解释器和编译器
+Effect Opcodes - Declarative Card and Compass Event Effects with an Interpreter and a Compiler
+
+效果程序是指令元组，每条指令为 (操作码, 数值, 日志, 空结果日志)：
+  - 操作码作用于 BattleContext（增加攻击力、获得护甲、治疗……），返回执行结果
+  - 日志为 (日志代码, 字段...)，字段取 AMOUNT（指令数值）、RESULT（执行结果）、
+    TARGET（敌人名称），执行后按字段顺序组成日志参数
+  - 结果为None（例如手牌为空无法弃牌）时改为输出空结果日志，为None时不输出
+程序只包含整数和字符串，可以直接序列化；core.batch_simulator 用同一份程序批量执行。
+"""
+
+
+# ============ 操作码 ============
+
+NOP = 0
+ADD_ATK = 1          # 增加攻击力，结果为增加后的攻击力
+ARMOR = 2            # 获得护甲，结果为当前护甲
+HEAL = 3             # 恢复HP，结果为实际恢复量
+DAMAGE = 4           # 直接对敌人造成伤害，结果为实际伤害
+LOSE_HP = 5          # 玩家失去HP（受护甲减免），结果为实际失去量
+SKIP_TURN = 6        # 跳过下一个出牌阶段
+HALVE_ATK = 7        # 攻击力减半（最低为1），结果为减半后的攻击力；已是最低值时为None
+LOSE_MP = 8          # 失去MP，结果为实际失去量
+WEAKEN_ATK = 9       # 攻击力降低（最低为0），结果为降低后的攻击力
+RESTORE_MP = 10      # 恢复MP，结果为实际恢复量
+DOUBLE_ATTACK = 11   # 下次攻击伤害翻倍
+DRAW = 12            # 抽牌，结果为实际抽牌数
+ADD_CURSE = 13       # 随机一张负面卡牌放到牌库顶部，结果为卡牌名称
+DISCARD_RANDOM = 14  # 随机弃置一张手牌，结果为卡牌名称；手牌为空时为None
+
+OPCODE_NAMES = (
+    'NOP', 'ADD_ATK', 'ARMOR', 'HEAL', 'DAMAGE', 'LOSE_HP', 'SKIP_TURN', 'HALVE_ATK',
+    'LOSE_MP', 'WEAKEN_ATK', 'RESTORE_MP', 'DOUBLE_ATTACK', 'DRAW', 'ADD_CURSE', 'DISCARD_RANDOM',
+)
+
+# 日志字段
+AMOUNT = 'amount'
+RESULT = 'result'
+TARGET = 'target'
+
+
+def instruction(opcode, amount=0, log=None, empty_log=None):
+    """构造一条指令
+
+    Args:
+        opcode: 操作码
+        amount: 指令数值（必须是整数）
+        log: 执行后输出的日志 (日志代码, 字段...)
+        empty_log: 结果为None时输出的日志 (日志代码,)
+    """
+    if not 0 <= opcode < len(OPCODE_NAMES):
+        raise ValueError(f"未知的操作码: {opcode}")
+    if not isinstance(amount, int):
+        raise ValueError(f"指令数值必须是整数: {amount!r}")
+    for fields in (log, empty_log):
+        if fields is not None:
+            for field in fields[1:]:
+                if field not in (AMOUNT, RESULT, TARGET):
+                    raise ValueError(f"未知的日志字段: {field!r}")
+    return (opcode, amount, log, empty_log)
+
+
+def disassemble(program):
+    """程序的可读文本（每条指令一行）"""
+    lines = []
+    for opcode, amount, log, empty_log in program:
+        line = f"{OPCODE_NAMES[opcode]} {amount}"
+        if log is not None:
+            line += f"  ; {log[0]}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+# ============ 操作实现 ============
+
+def _nop(context, amount):
+    return True
+
+
+def _add_atk(context, amount):
+    return context.player.add_atk(amount)
+
+
+def _armor(context, amount):
+    context.player.add_armor(amount)
+    return context.player.armor
+
+
+def _heal(context, amount):
+    return context.player.heal(amount)
+
+
+def _damage(context, amount):
+    return context.enemy.take_damage(amount)
+
+
+def _lose_hp(context, amount):
+    return context.player.take_damage(amount)
+
+
+def _skip_turn(context, amount):
+    context.skip_next_turn = True
+    return True
+
+
+def _halve_atk(context, amount):
+    player = context.player
+    if player.atk > 1:
+        reduced_atk = max(1, player.atk // 2)
+        player.set_atk(reduced_atk)
+        return reduced_atk
+    return None
+
+
+def _lose_mp(context, amount):
+    return context.player.lose_mp(amount)
+
+
+def _weaken_atk(context, amount):
+    player = context.player
+    player.set_atk(max(0, player.atk - amount))
+    return player.atk
+
+
+def _restore_mp(context, amount):
+    return context.player.restore_mp(amount)
+
+
+def _double_attack(context, amount):
+    context.double_next_attack = True
+    return True
+
+
+def _draw(context, amount):
+    return context.card_system.draw_cards(amount)
+
+
+def _add_curse(context, amount):
+    from data.cards import CARD_REGISTRY
+
+    # 卡牌模板共享，不需要创建副本
+    negative_card = context.rng.choice(CARD_REGISTRY.find(card_type='negative'))
+    context.card_system.add_negative_card(negative_card)
+    return negative_card.name
+
+
+def _discard_random(context, amount):
+    card_system = context.card_system
+    if len(card_system.hand) == 0:
+        return None
+    discarded_card = card_system.remove_card_from_hand(context.rng.randrange(len(card_system.hand)))
+    return discarded_card.name if discarded_card else None
+
+
+# 操作码 -> 实现，下标即操作码
+HANDLERS = (
+    _nop, _add_atk, _armor, _heal, _damage, _lose_hp, _skip_turn, _halve_atk,
+    _lose_mp, _weaken_atk, _restore_mp, _double_attack, _draw, _add_curse, _discard_random,
+)
+
+
+# ============ 解释器 ============
+
+def _log_args(context, fields, amount, result):
+    """按日志字段取出日志参数"""
+    args = []
+    for field in fields:
+        if field == AMOUNT:
+            args.append(amount)
+        elif field == RESULT:
+            args.append(result)
+        else:
+            args.append(context.enemy.name)
+    return args
+
+
+def run_program(program, battle_context):
+    """逐条解释执行程序（参考实现，结果与 compile_program 编译出的函数相同）"""
+    for opcode, amount, log, empty_log in program:
+        result = HANDLERS[opcode](battle_context, amount)
+        if result is None:
+            if empty_log is not None:
+                battle_context.log(empty_log[0], *_log_args(battle_context, empty_log[1:], amount, None))
+        elif log is not None:
+            battle_context.log(log[0], *_log_args(battle_context, log[1:], amount, result))
+
+
+# ============ 编译器 ============
+
+_FIELD_SOURCE = {AMOUNT: '{amount!r}', RESULT: 'result', TARGET: 'context.enemy.name'}
+
+
+def _log_source(log, amount):
+    """一条日志调用的源代码"""
+    args = [repr(log[0])] + [_FIELD_SOURCE[field].format(amount=amount) for field in log[1:]]
+    return f"context.log({', '.join(args)})"
+
+
+def compile_program(program):
+    """把程序编译为一个 effect(battle_context) 函数
+
+    每条指令展开为一次操作调用和一次日志调用（数值和日志代码作为常量写入代码），
+    执行时没有逐条解码的开销。
+    """
+    program = tuple(instruction(*step) for step in program)
+    lines = ["def effect(context):"]
+    namespace = {}
+    for position, (opcode, amount, log, empty_log) in enumerate(program):
+        handler_name = f"op{position}"
+        namespace[handler_name] = HANDLERS[opcode]
+        call = f"{handler_name}(context, {amount!r})"
+        if log is None and empty_log is None:
+            lines.append(f"    {call}")
+            continue
+        lines.append(f"    result = {call}")
+        if empty_log is not None:
+            lines.append("    if result is None:")
+            lines.append(f"        {_log_source(empty_log, amount)}")
+            if log is not None:
+                lines.append("    else:")
+                lines.append(f"        {_log_source(log, amount)}")
+        else:
+            lines.append("    if result is not None:")
+            lines.append(f"        {_log_source(log, amount)}")
+    if len(lines) == 1:
+        lines.append("    pass")
+
+    exec(compile('\n'.join(lines), '<effect program>', 'exec'), namespace)
+    effect = namespace['effect']
+    effect.program = program
+    return effect
+
+
+def make_effect(effect):
+    """把效果描述转换为 (可调用的效果函数, 程序)
+
+    效果可以是操作码程序（编译后执行），也可以是手写的效果函数（程序为None，
+    这样的效果不能被批量模拟器执行）。
+    """
+    if effect is None or callable(effect):
+        return effect, None
+    compiled = compile_program(effect)
+    return compiled, compiled.program
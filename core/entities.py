@@ -4,9 +4,19 @@ Game Entities - Player and Enemy Classes
 """
 
 from config.constants import *
+from core.state_version import VersionedState
+from core.zobrist import (
+    ZobristHashed, PLAYER_MAX_HP, PLAYER_HP, PLAYER_MAX_MP, PLAYER_MP,
+    PLAYER_BASE_ATK, PLAYER_ATK, PLAYER_ARMOR, ENEMY_MAX_HP, ENEMY_HP, ENEMY_ATK
+)
 
-class Player:
-    """玩家角色类"""
+class Player(VersionedState, ZobristHashed):
+    """玩家角色类（修改属性的方法同时以O(1)更新增量哈希 zobrist）"""
+    
+    ZOBRIST_FIELDS = (
+        (PLAYER_MAX_HP, 'max_hp'), (PLAYER_HP, 'hp'), (PLAYER_MAX_MP, 'max_mp'), (PLAYER_MP, 'mp'),
+        (PLAYER_BASE_ATK, 'base_atk'), (PLAYER_ATK, 'atk'), (PLAYER_ARMOR, 'armor'),
+    )
     
     def __init__(self):
         """初始化玩家属性"""
@@ -17,6 +27,7 @@ class Player:
         self.base_atk = INITIAL_PLAYER_ATK  # 基础攻击力
         self.atk = INITIAL_PLAYER_ATK       # 当前攻击力
         self.armor = 0                      # 护甲值，每回合重置
+        self.compute_zobrist()
         
     def take_damage(self, damage):
         """受到伤害，护甲减免"""
@@ -24,12 +35,16 @@ class Player:
             return 0
             
         # 护甲减免
+        old_armor = self.armor
         reduced_damage = max(0, damage - self.armor)
         self.armor = max(0, self.armor - damage)  # 护甲也会被消耗
+        self.rehash(PLAYER_ARMOR, old_armor, self.armor)
         
         # 扣除HP
         actual_damage = min(reduced_damage, self.hp)
         self.hp -= actual_damage
+        self.rehash(PLAYER_HP, self.hp + actual_damage, self.hp)
+        self.touch()
         
         return actual_damage
         
@@ -40,6 +55,8 @@ class Player:
             
         actual_heal = min(amount, self.max_hp - self.hp)
         self.hp += actual_heal
+        self.rehash(PLAYER_HP, self.hp - actual_heal, self.hp)
+        self.touch()
         
         return actual_heal
         
@@ -50,6 +67,8 @@ class Player:
             
         actual_restore = min(amount, self.max_mp - self.mp)
         self.mp += actual_restore
+        self.rehash(PLAYER_MP, self.mp - actual_restore, self.mp)
+        self.touch()
         
         return actual_restore
         
@@ -60,18 +79,48 @@ class Player:
             
         if self.mp >= amount:
             self.mp -= amount
+            self.rehash(PLAYER_MP, self.mp + amount, self.mp)
+            self.touch()
             return True
         return False
         
+    def lose_mp(self, amount):
+        """失去MP（最多失去全部MP），返回实际失去的数量"""
+        actual_loss = min(self.mp, max(0, amount))
+        self.mp -= actual_loss
+        self.rehash(PLAYER_MP, self.mp + actual_loss, self.mp)
+        self.touch()
+        
+        return actual_loss
+        
     def add_armor(self, amount):
         """增加护甲"""
         if amount > 0:
             self.armor += amount
+            self.rehash(PLAYER_ARMOR, self.armor - amount, self.armor)
+            self.touch()
+            
+    def add_atk(self, amount):
+        """增加当前攻击力，返回增加后的攻击力"""
+        self.atk += amount
+        self.rehash(PLAYER_ATK, self.atk - amount, self.atk)
+        self.touch()
+        
+        return self.atk
+        
+    def set_atk(self, value):
+        """直接设置当前攻击力（用于减半、降低等效果）"""
+        self.rehash(PLAYER_ATK, self.atk, value)
+        self.atk = value
+        self.touch()
             
     def reset_for_new_turn(self):
         """回合开始时重置属性"""
+        self.rehash(PLAYER_ATK, self.atk, self.base_atk)
+        self.rehash(PLAYER_ARMOR, self.armor, 0)
         self.atk = self.base_atk  # 攻击力重置为基础值1
         self.armor = 0            # 护甲重置为0
+        self.touch()
         
     def is_alive(self):
         """检查是否存活"""
@@ -93,8 +142,10 @@ class Player:
         }
 
 
-class Enemy:
-    """敌人角色类"""
+class Enemy(VersionedState, ZobristHashed):
+    """敌人角色类（修改属性的方法同时以O(1)更新增量哈希 zobrist）"""
+    
+    ZOBRIST_FIELDS = ((ENEMY_MAX_HP, 'max_hp'), (ENEMY_HP, 'hp'), (ENEMY_ATK, 'atk'))
     
     def __init__(self, name="Forest Goblin", hp=None, atk=None):
         """初始化敌人属性"""
@@ -102,6 +153,7 @@ class Enemy:
         self.max_hp = hp if hp is not None else INITIAL_ENEMY_HP
         self.hp = self.max_hp
         self.atk = atk if atk is not None else INITIAL_ENEMY_ATK
+        self.compute_zobrist()
         
     def take_damage(self, damage):
         """受到伤害"""
@@ -110,6 +162,8 @@ class Enemy:
             
         actual_damage = min(damage, self.hp)
         self.hp -= actual_damage
+        self.rehash(ENEMY_HP, self.hp + actual_damage, self.hp)
+        self.touch()
         
         return actual_damage
         
@@ -120,6 +174,8 @@ class Enemy:
             
         actual_heal = min(amount, self.max_hp - self.hp)
         self.hp += actual_heal
+        self.rehash(ENEMY_HP, self.hp - actual_heal, self.hp)
+        self.touch()
         
         return actual_heal
         
@@ -0,0 +1,422 @@
+"""
+期望最大化求解器 - 带置换表的有限回合内精确最优胜率计算，用于给玩家和AI的出牌打分
+Expectimax Solver - Exact Optimal Win Probability Within a Turn Horizon, with a Transposition Table
+"""
+
+import math
+import struct
+from collections import OrderedDict
+
+from core.card_system import CardSystem
+from core.mcts import get_legal_actions, apply_action
+from data.cards import CARD_LIBRARY
+
+
+# ============ 置换表键格式 ============
+# 头部: 剩余回合数、玩家7项属性、敌人HP、罗盘位置、两个上下文标记、手牌数、牌库顶已知卡牌数
+# 随后: 手牌序号（排序后，手牌顺序不影响局面价值）、牌库顶已知卡牌序号（按顺序）、
+#       牌库未知部分和弃牌堆中每种卡牌的张数（两者的顺序都不影响局面价值）
+
+STATE_KEY_HEADER = struct.Struct('<H7hhB??BB')
+
+# 每个置换表条目除键之外的估计内存占用（字节）：OrderedDict 节点、浮点数值和键对象头
+TABLE_ENTRY_OVERHEAD = 160
+
+
+class _Branch(Exception):
+    """枚举随机流的选择序列用完：记录下一个随机决定的分支权重"""
+
+    def __init__(self, weights):
+        super().__init__()
+        self.weights = weights
+
+
+class ScriptedRandom:
+    """按给定选择序列作出随机决定的随机流，用于枚举机会节点的全部结果
+
+    每个随机决定取序列中的下一个选项，并把该选项的概率累乘到 probability；
+    序列用完时抛出 _Branch，由求解器为每个选项扩展一条更长的序列重新执行。
+    """
+
+    def __init__(self, script=()):
+        """初始化随机流
+
+        Args:
+            script: 每个随机决定所选的选项序号
+        """
+        self.script = script
+        self.position = 0
+        self.probability = 1.0
+
+    def _pick(self, weights):
+        """按序列作出一个带权重的随机决定，返回选项序号"""
+        if self.position >= len(self.script):
+            raise _Branch(weights)
+        index = self.script[self.position]
+        self.position += 1
+        self.probability *= weights[index] / sum(weights)
+        return index
+
+    def choice(self, items):
+        """等概率选择一个元素"""
+        return items[self._pick((1,) * len(items))]
+
+    def randrange(self, stop):
+        """等概率选择 [0, stop) 区间的整数"""
+        return self._pick((1,) * stop)
+
+    def pick_weighted(self, weights):
+        """按权重选择一个选项序号"""
+        return self._pick(weights)
+
+    def shuffle(self, items):
+        """求解器中的牌库是多重集，不应发生洗牌"""
+        raise RuntimeError("求解器局面中不应调用洗牌")
+
+    def random(self):
+        """求解器只枚举离散的随机决定"""
+        raise RuntimeError("求解器局面中不支持连续随机数")
+
+
+class MultisetDeck:
+    """玩家视角的牌库：牌库顶已知的卡牌（诅咒卡被放在牌库顶）+ 顺序未知的卡牌多重集
+
+    与 CardSystem 的牌堆一样保存卡牌编号，已知部分的牌库顶在 top 末尾。
+    抽牌时从未知部分按各卡牌的剩余张数加权随机选择，与对真实洗牌后的牌库抽牌分布相同，
+    但机会节点只有“不同卡牌种类数”个分支，而不是全部排列。
+    """
+
+    __slots__ = ('top', 'counts', 'size', 'rng')
+
+    def __init__(self, cards=(), rng=None):
+        """初始化牌库
+
+        Args:
+            cards: 顺序未知的卡牌编号
+            rng: 抽牌使用的随机流（求解器中为 ScriptedRandom）
+        """
+        self.top = bytearray()
+        self.counts = [0] * len(CARD_LIBRARY)
+        self.size = 0
+        self.rng = rng
+        for number in cards:
+            self.counts[number] += 1
+            self.size += 1
+
+    def __len__(self):
+        return len(self.top) + self.size
+
+    def __iter__(self):
+        """先列出牌库顶已知的卡牌，再按卡牌库顺序列出未知部分"""
+        yield from self.top
+        for number, count in enumerate(self.counts):
+            for _ in range(count):
+                yield number
+
+    def pop(self, index=-1):
+        """抽出牌库顶的一张牌（只支持从顶部抽牌）"""
+        if index != -1:
+            raise IndexError("多重集牌库只支持从顶部抽牌")
+        if self.top:
+            return self.top.pop()
+        if self.size == 0:
+            raise IndexError("牌库为空")
+        kinds = [index for index, count in enumerate(self.counts) if count > 0]
+        kind = kinds[self.rng.pick_weighted([self.counts[index] for index in kinds])]
+        self.counts[kind] -= 1
+        self.size -= 1
+        return kind
+
+    def draw_unknown(self, count):
+        """从未知部分一次抽出 count 张牌（count 不超过未知部分张数）
+
+        抽出的手牌只作为多重集影响局面，因此把“抽到哪些牌”作为一个随机决定：
+        每种组合的权重是各卡牌张数的组合数之积（多元超几何分布），
+        分支数是组合数而不是逐张抽牌的全部排列。
+        """
+        kinds = [index for index, count in enumerate(self.counts) if count > 0]
+        combinations = []
+        weights = []
+
+        def expand(position, remaining, taken, weight):
+            if remaining == 0:
+                combinations.append(taken)
+                weights.append(weight)
+                return
+            if position == len(kinds):
+                return
+            available = self.counts[kinds[position]]
+            for amount in range(min(available, remaining) + 1):
+                expand(position + 1, remaining - amount, taken + (amount,),
+                       weight * math.comb(available, amount))
+
+        expand(0, count, (), 1)
+        taken = combinations[self.rng.pick_weighted(weights)]
+
+        cards = bytearray()
+        for kind, amount in zip(kinds, taken):
+            self.counts[kind] -= amount
+            cards.extend([kind] * amount)
+        self.size -= count
+        return cards
+
+    def append(self, card):
+        """把一张已知卡牌放到牌库顶部"""
+        self.top.append(card)
+
+    def copy(self):
+        """复制牌库"""
+        deck = MultisetDeck.__new__(MultisetDeck)
+        deck.top = self.top.copy()
+        deck.counts = self.counts.copy()
+        deck.size = self.size
+        deck.rng = self.rng
+        return deck
+
+
+class SolverCardSystem(CardSystem):
+    """求解器使用的卡牌系统：牌库是 MultisetDeck，重新洗牌只把弃牌堆并入多重集"""
+
+    def draw_cards(self, count):
+        """抽牌到手牌（与 CardSystem.draw_cards 的抽牌分布相同，未知部分按组合一次抽出）"""
+        count = min(count, self.max_hand_size - len(self.hand))
+        cards_drawn = 0
+        while count > 0:
+            deck = self.deck
+            if deck.top:
+                cards = (deck.pop(),)
+            elif deck.size > 0:
+                cards = deck.draw_unknown(min(count, deck.size))
+            elif len(self.played_cards) > 0:
+                self._reshuffle_played_cards()
+                continue
+            else:
+                break
+            self.hand.extend(cards)
+            for number in cards:
+                self._hash_draw(number)
+            count -= len(cards)
+            cards_drawn += len(cards)
+
+        if cards_drawn > 0:
+            self.touch()
+        return cards_drawn
+
+    def _reshuffle_played_cards(self):
+        """重新洗牌弃牌堆（洗牌后的顺序对玩家未知，直接作为多重集）"""
+        if len(self.played_cards) > 0:
+            self.deck = MultisetDeck(self.played_cards, self.rng)
+            self.played_cards.clear()
+            self.deck_hash = self.played_hash
+            self.played_hash = 0
+            self.touch()
+
+
+class ExpectimaxSolver:
+    """期望最大化精确求解器
+
+    决策节点取所有合法行动中价值最高者，机会节点（罗盘事件、随机弃牌、抽牌）按概率
+    对全部结果求期望。局面按玩家可见信息建模：牌库顺序未知，只知道各卡牌的剩余张数。
+    默认（evaluate 为None）求的是在当前回合及之后 horizon 个回合内击败敌人的精确最优
+    概率：胜利计1，失败和超出范围仍未分胜负都计0。因此只有离终局不超过 horizon 个回合
+    的局面才能区分各行动，离终局更远时全部为0。
+    搜索量随 horizon 指数增长：每次结算后的抽牌有上百种组合，horizon=0 通常在1秒内
+    求解，horizon=1 需要数分钟。
+
+    需要在离终局很远的局面给行动打分时，可以传入 evaluate（例如 mcts.evaluate_battle）
+    为战斗结束和超出范围的叶子打分。这时结果是有限深度的启发式评估值，不再是胜率。
+
+    置换表以局面的规范编码（手牌、牌库和弃牌堆按多重集编码）为键，按估计内存占用
+    限制大小，超出预算时淘汰最久未使用的条目；被淘汰的局面需要时会重新计算，结果不变。
+    """
+
+    def __init__(self, horizon=0, memory_budget=64 * 1024 * 1024, evaluate=None):
+        """初始化求解器
+
+        Args:
+            horizon: 当前回合之后还允许进行的回合数
+            memory_budget: 置换表的内存预算（字节，按估计值计算）
+            evaluate: 叶子局面（战斗结束或超出范围）的评估函数，返回0~1；
+                      为None时只计胜负，结果是范围内的精确胜率
+        """
+        self.horizon = horizon
+        self.evaluate = evaluate
+        self.turn_limit = 0
+        self.memory_budget = memory_budget
+        self.table = OrderedDict()
+        self.memory_used = 0
+
+        # 统计
+        self.nodes = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def clear(self):
+        """清空置换表和统计"""
+        self.table.clear()
+        self.memory_used = 0
+        self.nodes = 0
+        self.hits = 0
+        self.evictions = 0
+
+    # ============ 对外接口 ============
+
+    def solve(self, battle_manager):
+        """计算当前局面的最优胜率（传入 evaluate 时为最优评估值；不会修改传入的战斗）"""
+        return self._value(self._to_solver_state(battle_manager))
+
+    def analyze(self, battle_manager):
+        """计算当前局面每个合法行动之后按最优策略继续的胜率，返回 {行动: 胜率}"""
+        state = self._to_solver_state(battle_manager)
+        return {action: self._action_value(state, action)
+                for action in get_legal_actions(state)}
+
+    def best_action(self, battle_manager):
+        """返回胜率最高的行动及其胜率"""
+        analysis = self.analyze(battle_manager)
+        if not analysis:
+            return None, self.solve(battle_manager)
+        action = max(analysis, key=analysis.get)
+        return action, analysis[action]
+
+    def score_action(self, battle_manager, action):
+        """给一次出牌打分，返回 (该行动的胜率, 最优胜率)，两者之差即为这次决策损失的胜率"""
+        analysis = self.analyze(battle_manager)
+        if not analysis:
+            value = self.solve(battle_manager)
+            return value, value
+        return analysis.get(action, 0.0), max(analysis.values())
+
+    # ============ 搜索 ============
+
+    def _value(self, state):
+        """决策节点：最优行动的胜率"""
+        if state.battle_ended or state.turn_count > self.turn_limit:
+            return self._leaf_value(state)
+
+        key = self._state_key(state)
+        table = self.table
+        value = table.get(key)
+        if value is not None:
+            table.move_to_end(key)
+            self.hits += 1
+            return value
+
+        self.nodes += 1
+        value = 0.0
+        for action in get_legal_actions(state):
+            value = max(value, self._action_value(state, action))
+            if value >= 1.0:
+                break
+
+        self._store(key, value)
+        return value
+
+    def _leaf_value(self, state):
+        """战斗结束或超出求解范围的局面的价值"""
+        if self.evaluate is not None:
+            return self.evaluate(state)
+        return 1.0 if state.battle_ended and state.victory else 0.0
+
+    def _action_value(self, state, action):
+        """机会节点：执行行动后对全部随机结果求期望"""
+        expected = 0.0
+        for outcome, probability in self._enumerate_outcomes(state, action):
+            expected += probability * self._value(outcome)
+        return expected
+
+    def _enumerate_outcomes(self, state, action):
+        """枚举行动的全部随机结果，返回 [(结果局面, 概率)]，相同局面合并概率
+
+        对每个选择序列在副本上重新执行行动：执行中遇到序列之外的随机决定时，
+        为该决定的每个选项扩展一条更长的序列。
+        """
+        outcomes = {}
+        scripts = [()]
+        while scripts:
+            script = scripts.pop()
+            rng = ScriptedRandom(script)
+            outcome = self._clone(state, rng)
+            try:
+                apply_action(outcome, action)
+            except _Branch as branch:
+                if outcome.turn_count <= self.turn_limit:
+                    scripts.extend(script + (index,) for index in range(len(branch.weights)))
+                    continue
+                # 已进入求解范围之外的回合（结算后新回合的抽牌），之后的随机结果都不影响价值
+
+            if outcome.battle_ended or outcome.turn_count > self.turn_limit:
+                # 叶子局面按价值合并
+                key = self._leaf_value(outcome)
+            else:
+                key = self._state_key(outcome)
+            entry = outcomes.get(key)
+            if entry is None:
+                outcomes[key] = [outcome, rng.probability]
+            else:
+                entry[1] += rng.probability
+        return list(outcomes.values())
+
+    def _store(self, key, value):
+        """写入置换表，超出内存预算时淘汰最久未使用的条目"""
+        self.table[key] = value
+        self.memory_used += len(key) + TABLE_ENTRY_OVERHEAD
+        while self.memory_used > self.memory_budget and self.table:
+            old_key, _ = self.table.popitem(last=False)
+            self.memory_used -= len(old_key) + TABLE_ENTRY_OVERHEAD
+            self.evictions += 1
+
+    # ============ 局面表示 ============
+
+    def _to_solver_state(self, battle_manager):
+        """复制战斗并把牌库换成玩家视角的多重集，同时确定求解范围的最后一个回合"""
+        self.turn_limit = battle_manager.turn_count + self.horizon
+        state = battle_manager.clone()
+        source_cards = state.card_system
+        card_system = SolverCardSystem.__new__(SolverCardSystem)
+        card_system.__dict__.update(source_cards.__dict__)
+        deck = source_cards.deck
+        card_system.deck = deck.copy() if isinstance(deck, MultisetDeck) else MultisetDeck(deck)
+        state.card_system = card_system
+        state.battle_context.card_system = card_system
+        return state
+
+    @staticmethod
+    def _clone(state, rng):
+        """以给定随机流复制求解器局面"""
+        clone = state.clone(rng)
+        clone.card_system.deck.rng = rng
+        return clone
+
+    def _state_key(self, state):
+        """局面的规范编码（置换表键，以剩余回合数代替回合数，不同根局面之间可以复用）
+
+        不使用 BattleManager.get_state_hash()：置换表中的值必须精确，64位哈希的碰撞会
+        悄悄返回别的局面的胜率；哈希包含绝对回合数，不同根局面之间无法复用；而且哈希
+        把牌库作为一个多重集，不区分牌库顶已知的卡牌（诅咒卡）和顺序未知的部分。
+        """
+        player = state.player
+        card_system = state.card_system
+        context = state.battle_context
+        deck = card_system.deck
+
+        hand = sorted(card_system.hand)
+        played = [0] * len(CARD_LIBRARY)
+        for number in card_system.played_cards:
+            played[number] += 1
+
+        header = STATE_KEY_HEADER.pack(
+            self.turn_limit - state.turn_count,
+            player.max_hp, player.hp, player.max_mp, player.mp,
+            player.base_atk, player.atk, player.armor,
+            state.enemy.hp, state.compass.current_position,
+            context._skip_next_turn, context._double_next_attack,
+            len(hand), len(deck.top)
+        )
+        return b''.join((
+            header,
+            bytes(hand),
+            bytes(deck.top),
+            bytes(deck.counts),
+            bytes(played)
+        ))
@@ -3,20 +3,35 @@
 Game Controller - Main Game Loop Integrating All Systems
 """
 
+import os
 import pygame
 import sys
-from config.settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BACKGROUND_COLOR
+import time
+from config.settings import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BACKGROUND_COLOR, IDLE_MODE, IDLE_WAIT_TIMEOUT, JOURNAL_PATH,
+    REPLAY_DIR
+)
+from core.battle_log import console_sink, multi_sink
 from core.battle_manager import BattleManager
-from ui.game_ui import GameUI
+from core.journal import BattleJournal
+from core.replay import BattleRecorder, save_replays
+from ui.game_ui import GameUI, init_display
 
 
 class Game:
     """游戏主控制器"""
     
-    def __init__(self):
-        """初始化游戏"""
-        # 初始化pygame
-        pygame.init()
+    def __init__(self, idle_mode=IDLE_MODE, idle_timeout=IDLE_WAIT_TIMEOUT, journal_path=JOURNAL_PATH):
+        """初始化游戏
+        
+        Args:
+            idle_mode: 为True时主循环阻塞等待事件，空闲时几乎不占用CPU；
+                       为False时按固定FPS轮询并每帧渲染
+            idle_timeout: 空闲模式下无事件时的最长等待时间（毫秒）
+            journal_path: 二进制战斗日志文件路径，为None时不记录
+        """
+        # 只初始化用到的pygame模块（显示），字体在第一次绘制文字时加载
+        init_display()
         
         # 创建游戏窗口
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -25,16 +40,26 @@ class Game:
         # 游戏时钟
         self.clock = pygame.time.Clock()
         
+        # 战斗日志归档（后台线程写入，不阻塞游戏循环）
+        self.journal = BattleJournal(journal_path) if journal_path else None
+        
         # 创建游戏系统
-        self.battle_manager = BattleManager()
+        self.battle_manager = BattleManager(log_sink=multi_sink(console_sink, self.journal))
+        
+        # 玩家操作都经过录制器，随时可以保存为回放
+        self.recorder = BattleRecorder(self.battle_manager)
         self.ui = GameUI(self.screen, self.battle_manager)
         
         # 游戏状态
         self.running = True
+        self.idle_mode = idle_mode
+        self.idle_timeout = idle_timeout
+        self.last_state_version = None
         
         # 统计信息
         self.frame_count = 0
         self.total_time = 0
+        self.render_time = 0.0      # 累计渲染耗时（秒），用于衡量每帧渲染开销
         
     def run(self):
         """运行游戏主循环"""
@@ -44,24 +69,67 @@ class Game:
         self.battle_manager.start_battle()
         
         # 主游戏循环
+        if self.idle_mode:
+            self._run_idle_loop()
+        else:
+            while self.running:
+                dt = self.clock.tick(FPS)
+                self.total_time += dt
+                self.frame_count += 1
+                
+                self._handle_events()
+                self._update()
+                self._render()
+        
+        # 游戏结束
+        self._cleanup()
+        
+    def _run_idle_loop(self):
+        """空闲等待主循环：阻塞等待事件，只在输入或状态变化后渲染"""
+        self.clock.tick()
+        self._render_frame()
+        
         while self.running:
-            dt = self.clock.tick(FPS)
-            self.total_time += dt
-            self.frame_count += 1
+            # 有事件时立即返回，输入到画面的延迟不受帧率限制
+            event = pygame.event.wait(self.idle_timeout)
+            self.total_time += self.clock.tick()
+            
+            if event.type == pygame.NOEVENT:
+                # 等待超时：没有输入，只做定时的调试输出
+                events = []
+                self._render_debug_info(self.battle_manager.get_game_state())
+            else:
+                events = [event] + pygame.event.get()
             
-            self._handle_events()
+            self._handle_events(events)
             self._update()
-            self._render()
+            
+            if events or self.battle_manager.get_state_version() != self.last_state_version:
+                self._render_frame()
+                
+    def _render_frame(self):
+        """空闲模式下渲染一帧并记录渲染时的状态版本"""
+        self.frame_count += 1
+        self._render()
+        self.last_state_version = self.battle_manager.get_state_version()
+    
+    def _handle_events(self, events=None):
+        """处理游戏事件
         
-        # 游戏结束
-        self._cleanup()
+        Args:
+            events: 待处理的事件列表，为None时从事件队列中取出全部事件
+        """
+        if events is None:
+            events = pygame.event.get()
         
-    def _handle_events(self):
-        """处理游戏事件"""
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
                 
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # 窗口内容被系统覆盖后需要整屏重绘
+                self.ui.invalidate()
+                
             elif event.type == pygame.KEYDOWN:
                 self._handle_keyboard_input(event.key)
                 
@@ -81,7 +149,12 @@ class Game:
         
         # R键重新开始
         if key == pygame.K_r:
-            self.battle_manager.reset_battle()
+            self.recorder.reset_battle()
+            return
+        
+        # F5键保存当前战斗的回放
+        if key == pygame.K_F5:
+            self.save_replay()
             return
         
         # 空格键快速出击
@@ -90,7 +163,7 @@ class Game:
             if (game_state['phase'] == 'CARD_PHASE' and 
                 not game_state['battle_ended'] and 
                 not game_state.get('skip_next_turn', False)):
-                success, message = self.battle_manager.start_settlement_phase()
+                success, message = self.recorder.start_settlement_phase()
                 if not success:
                     print(f"无法出击: {message}")
             return
@@ -104,7 +177,7 @@ class Game:
                 not game_state['battle_ended'] and 
                 card_index < len(game_state['hand'])):
                 
-                success, message = self.battle_manager.play_card(card_index)
+                success, message = self.recorder.play_card(card_index)
                 if not success:
                     print(f"出牌失败: {message}")
     
@@ -119,17 +192,26 @@ class Game:
         action_type, action_data = action
         
         if action_type == 'play_card':
-            success, message = self.battle_manager.play_card(action_data)
+            success, message = self.recorder.play_card(action_data)
             if not success:
                 print(f"出牌失败: {message}")
                 
         elif action_type == 'attack':
-            success, message = self.battle_manager.start_settlement_phase()
+            success, message = self.recorder.start_settlement_phase()
             if not success:
                 print(f"无法出击: {message}")
                 
         elif action_type == 'restart':
-            self.battle_manager.reset_battle()
+            self.recorder.reset_battle()
+    
+    def save_replay(self, path=None):
+        """保存当前战斗的回放（种子 + 操作流），返回文件路径"""
+        if path is None:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            path = os.path.join(REPLAY_DIR, f"replay_{time.strftime('%Y%m%d_%H%M%S')}_{self.recorder.seed}.cbr")
+        save_replays(path, [self.recorder.get_replay()])
+        print(f"回放已保存: {path}")
+        return path
     
     def _update(self):
         """更新游戏状态"""
@@ -139,18 +221,30 @@ class Game:
     
     def _render(self):
         """渲染游戏画面"""
+        render_start = time.perf_counter()
+        
         # 获取游戏状态
         game_state = self.battle_manager.get_game_state()
         
-        # 渲染界面
-        self.ui.render(self.screen, game_state)
+        # 渲染界面（只重绘发生变化的区域）
+        dirty_rects = self.ui.render(self.screen, game_state)
         
         # 渲染调试信息（可选）
         if self.frame_count % 60 == 0:  # 每秒更新一次
             self._render_debug_info(game_state)
         
-        # 更新显示
-        pygame.display.flip()
+        # 只把脏矩形更新到窗口
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        
+        self.render_time += time.perf_counter() - render_start
+    
+    def get_render_statistics(self):
+        """获取渲染性能统计（平均每帧渲染耗时和文字缓存命中情况）"""
+        return {
+            'avg_render_ms': self.render_time * 1000 / self.frame_count if self.frame_count > 0 else 0,
+            'text_cache': self.ui.text_cache.get_statistics()
+        }
     
     def _render_debug_info(self, game_state):
         """渲染调试信息（控制台输出）"""
@@ -190,12 +284,21 @@ class Game:
             print(f"平均FPS: {avg_fps:.1f}")
             print(f"总帧数: {self.frame_count}")
             
+            render_stats = self.get_render_statistics()
+            text_cache_stats = render_stats['text_cache']
+            print(f"平均渲染耗时: {render_stats['avg_render_ms']:.3f}ms/帧")
+            print(f"文字缓存命中率: {text_cache_stats['hit_rate'] * 100:.1f}% "
+                  f"({text_cache_stats['hits']}/{text_cache_stats['hits'] + text_cache_stats['misses']})")
+            
             # 战斗统计
             battle_stats = self.battle_manager.get_battle_statistics()
             print("=== 战斗统计 ===")
             for key, value in battle_stats.items():
                 print(f"{key}: {value}")
         
+        if self.journal is not None:
+            self.journal.close()
+        
         pygame.quit()
         print("再见！")
     
@@ -206,5 +309,6 @@ class Game:
             'frame_count': self.frame_count,
             'total_time': self.total_time,
             'avg_fps': 1000 / (self.total_time / self.frame_count) if self.total_time > 0 else 0,
+            'render_statistics': self.get_render_statistics(),
             'battle_state': self.battle_manager.get_game_state()
         } 
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+战斗日志归档 - 后台线程批量写入的二进制追加日志
+Battle Journal - Append-Only Binary Journal Written in Batches by a Background Thread
+"""
+
+import queue
+import struct
+import threading
+import time
+
+from core.battle_log import LOG_TEMPLATES, format_log_record
+
+
+# ============ 二进制格式 ============
+# 文件头: MAGIC + 代码表（uint16 条数，每条 uint8 长度 + UTF-8 代码名）
+# 记录:   uint16 代码序号 + float64 时间戳 + uint8 参数个数 + 参数
+# 参数:   1字节类型标记 + 数据（'i' int64，'u' uint64（超出int64的非负整数，例如战斗种子），
+#         'f' float64，'s' uint16长度 + UTF-8，'n' None；更大的整数按字符串保存，
+#         超过65535字节的字符串在字符边界处截断）
+
+JOURNAL_MAGIC = b'CBJ1'
+
+RECORD_HEADER = struct.Struct('<HdB')
+COUNT_FIELD = struct.Struct('<H')
+INT_FIELD = struct.Struct('<q')
+UINT_FIELD = struct.Struct('<Q')
+FLOAT_FIELD = struct.Struct('<d')
+
+# 写入线程关闭标记
+_STOP = object()
+
+
+def _encode_header(codes):
+    """编码文件头（代码表随文件保存，模板增删后旧文件仍可读取）"""
+    parts = [JOURNAL_MAGIC, COUNT_FIELD.pack(len(codes))]
+    for code in codes:
+        encoded = code.encode('utf-8')
+        parts.append(bytes((len(encoded),)))
+        parts.append(encoded)
+    return b''.join(parts)
+
+
+def _encode_arg(value, parts):
+    """编码单个参数"""
+    if value is None:
+        parts.append(b'n')
+    elif isinstance(value, int) and -(1 << 63) <= value < (1 << 63):
+        parts.append(b'i')
+        parts.append(INT_FIELD.pack(value))
+    elif isinstance(value, int) and 0 <= value < (1 << 64):
+        parts.append(b'u')
+        parts.append(UINT_FIELD.pack(value))
+    elif isinstance(value, float):
+        parts.append(b'f')
+        parts.append(FLOAT_FIELD.pack(value))
+    else:
+        encoded = str(value).encode('utf-8')
+        if len(encoded) > 0xFFFF:
+            # 截断位置可能落在多字节字符中间，丢弃不完整的字符，保证读取时能够解码
+            encoded = encoded[:0xFFFF].decode('utf-8', 'ignore').encode('utf-8')
+        parts.append(b's')
+        parts.append(COUNT_FIELD.pack(len(encoded)))
+        parts.append(encoded)
+
+
+class BattleJournal:
+    """后台线程写入的二进制战斗日志
+
+    实例本身就是一个日志输出端 journal(code, args)，可直接作为 BattleManager 的 log_sink。
+    调用方只做一次无锁入队，编码、写文件和刷新都在后台线程中批量完成。
+    写入线程出错时停止写入并保存异常，之后的写入和 close 抛出 RuntimeError（原异常作为原因），
+    不会在线程已停止后继续把记录堆积在队列中。
+    """
+
+    def __init__(self, path, flush_interval=0.5, batch_size=1024):
+        """打开（追加）日志文件并启动写入线程
+
+        Args:
+            path: 日志文件路径，文件已存在时在末尾追加一个新的段
+            flush_interval: 两次刷新到磁盘之间的最长间隔（秒）
+            batch_size: 每批最多编码写入的记录数
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.codes = {code: index for index, code in enumerate(LOG_TEMPLATES)}
+        self.records_written = 0
+        self.closed = False
+        self.error = None
+
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, 'ab')
+        self._file.write(_encode_header(list(self.codes)))
+        self._thread = threading.Thread(target=self._writer_loop, name="battle-journal", daemon=True)
+        self._thread.start()
+
+    def __call__(self, code, args=()):
+        """写入一条记录（日志输出端接口，不会阻塞在磁盘上）"""
+        if self.error is not None:
+            self._raise_error()
+        self._queue.put((code, args, time.time()))
+
+    def write(self, code, *args):
+        """写入一条记录"""
+        self(code, args)
+
+    def close(self):
+        """写完队列中剩余的记录，刷新并关闭文件（写入线程出错时抛出其异常）"""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+        if self.error is not None:
+            self._raise_error()
+
+    def _raise_error(self):
+        """抛出写入线程保存的异常"""
+        raise RuntimeError(f"战斗日志写入失败，已停止写入: {self.path}") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _writer_loop(self):
+        """后台写入线程：批量取出记录、编码写入，并按时间间隔刷新"""
+        last_flush = time.monotonic()
+        running = True
+
+        while running:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            batch = []
+            while item is not None:
+                if item is _STOP:
+                    running = False
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+
+            try:
+                if batch:
+                    self._file.write(self._encode_batch(batch))
+                    self.records_written += len(batch)
+
+                now = time.monotonic()
+                if not running or now - last_flush >= self.flush_interval:
+                    self._file.flush()
+                    last_flush = now
+            except Exception as error:
+                # 保存异常并退出线程，由调用方线程的下一次写入或 close 抛出
+                self.error = error
+                return
+
+    def _encode_batch(self, batch):
+        """编码一批记录"""
+        parts = []
+        codes = self.codes
+        for code, args, timestamp in batch:
+            parts.append(RECORD_HEADER.pack(codes[code], timestamp, len(args)))
+            for value in args:
+                _encode_arg(value, parts)
+        return b''.join(parts)
+
+
+def read_journal(path):
+    """读取日志文件，逐条返回 (时间戳, 事件代码, 参数元组)"""
+    with open(path, 'rb') as journal_file:
+        data = journal_file.read()
+
+    offset = 0
+    codes = []
+    while offset < len(data):
+        # 每次打开文件追加时都会写入新的文件头
+        if data[offset:offset + len(JOURNAL_MAGIC)] == JOURNAL_MAGIC:
+            offset += len(JOURNAL_MAGIC)
+            (code_count,) = COUNT_FIELD.unpack_from(data, offset)
+            offset += COUNT_FIELD.size
+            codes = []
+            for _ in range(code_count):
+                length = data[offset]
+                codes.append(data[offset + 1:offset + 1 + length].decode('utf-8'))
+                offset += 1 + length
+            continue
+
+        code_index, timestamp, arg_count = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        args = []
+        for _ in range(arg_count):
+            tag = data[offset:offset + 1]
+            offset += 1
+            if tag == b'i':
+                args.append(INT_FIELD.unpack_from(data, offset)[0])
+                offset += INT_FIELD.size
+            elif tag == b'u':
+                args.append(UINT_FIELD.unpack_from(data, offset)[0])
+                offset += UINT_FIELD.size
+            elif tag == b'f':
+                args.append(FLOAT_FIELD.unpack_from(data, offset)[0])
+                offset += FLOAT_FIELD.size
+            elif tag == b's':
+                (length,) = COUNT_FIELD.unpack_from(data, offset)
+                offset += COUNT_FIELD.size
+                args.append(data[offset:offset + length].decode('utf-8'))
+                offset += length
+            elif tag == b'n':
+                args.append(None)
+            else:
+                raise ValueError(f"日志文件损坏: 偏移 {offset - 1} 处未知参数类型 {tag!r}")
+        yield timestamp, codes[code_index], tuple(args)
+
+
+def format_journal(path):
+    """读取日志文件并格式化为文字行（审计时使用）"""
+    for timestamp, code, args in read_journal(path):
+        text = format_log_record(code, args) if code in LOG_TEMPLATES else f"{code} {args}"
+        yield f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))} {text}"
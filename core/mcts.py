@@ -0,0 +1,316 @@
+"""
+蒙特卡洛树搜索 - 带机会节点和时间预算的出牌智能体，支持多进程根并行
+Monte Carlo Tree Search - Time-Budgeted Agent with Chance Nodes and Root-Parallel Workers
+"""
+
+import math
+import random
+import time
+
+from core.battle_manager import BattleManager
+from core.simulator import BattleStrategy, GreedyStrategy, ACTION_PLAY_CARD, ACTION_ATTACK
+from data.cards import CARD_LIBRARY
+
+
+# 进入结算阶段的行动
+SETTLEMENT_ACTION = (ACTION_ATTACK, None)
+
+
+def get_legal_actions(battle_manager):
+    """获取当前局面的合法行动
+
+    相同卡牌无论在手牌中的哪个位置，打出后的结果分布都相同，只保留第一张。
+    """
+    if battle_manager.battle_ended or battle_manager.phase != "CARD_PHASE":
+        return []
+    actions = []
+    if not battle_manager.battle_context.skip_next_turn:
+        mp = battle_manager.player.mp
+        seen = set()
+        for i, number in enumerate(battle_manager.card_system.hand):
+            if CARD_LIBRARY[number].mp_cost <= mp and number not in seen:
+                seen.add(number)
+                actions.append((ACTION_PLAY_CARD, i))
+    actions.append(SETTLEMENT_ACTION)
+    return actions
+
+
+def apply_action(battle_manager, action):
+    """在战斗上执行一个行动（出牌失败时改为进入结算，保证局面向前推进）"""
+    action_type, action_data = action
+    if action_type == ACTION_PLAY_CARD:
+        success, _ = battle_manager.play_card(action_data)
+        if success:
+            return
+    battle_manager.start_settlement_phase()
+
+
+def outcome_key(battle_manager):
+    """机会节点子节点的键：64位局面哈希 + 手牌顺序
+
+    局面哈希按多重集计入手牌，不区分手牌顺序；而决策节点的行动是手牌下标，
+    手牌顺序不同的局面不能共用一个决策节点，否则同一个下标会指向不同的卡牌。
+    """
+    return battle_manager.get_state_hash(), bytes(battle_manager.card_system.hand)
+
+
+def evaluate_battle(battle_manager):
+    """局面评估值（0~1）
+
+    胜利总是高于0.5，并按剩余HP加分；失败或未结束时按双方HP比例给出低于0.5的分数。
+    """
+    player_ratio = battle_manager.player.hp / battle_manager.player.max_hp
+    enemy_ratio = battle_manager.enemy.hp / battle_manager.enemy.max_hp
+    if battle_manager.battle_ended:
+        if battle_manager.victory:
+            return 0.5 + 0.5 * player_ratio
+        return 0.25 * (1 - enemy_ratio)
+    return 0.25 * (1 - enemy_ratio) + 0.25 * player_ratio
+
+
+class DecisionNode:
+    """决策节点：玩家在某个确定局面下选择行动"""
+
+    __slots__ = ('visits', 'edges', 'untried')
+
+    def __init__(self, actions):
+        """初始化决策节点"""
+        self.visits = 0
+        self.edges = {}
+        self.untried = list(actions)
+
+
+class ChanceNode:
+    """机会节点：行动之后的随机结果（罗盘事件、抽牌），按 outcome_key 区分子节点
+
+    搜索前副本的牌库被重新打乱，同一行动在不同迭代中抽到不同的牌，分支覆盖抽牌的随机性。
+    """
+
+    __slots__ = ('visits', 'value_sum', 'outcomes')
+
+    def __init__(self):
+        """初始化机会节点"""
+        self.visits = 0
+        self.value_sum = 0.0
+        self.outcomes = {}
+
+
+class MCTSSearch:
+    """单线程蒙特卡洛树搜索"""
+
+    def __init__(self, exploration=1.0, rollout_turns=10, rng=None, rollout_strategy=None):
+        """初始化搜索
+
+        Args:
+            exploration: UCT探索系数
+            rollout_turns: 模拟阶段最多向前推进的回合数，之后用局面评估值代替终局结果
+            rng: 搜索使用的随机数生成器（用于采样机会节点的结果）
+            rollout_strategy: 模拟阶段的出牌策略，默认为贪心策略
+        """
+        self.exploration = exploration
+        self.rollout_turns = rollout_turns
+        self.rng = rng if rng is not None else random.Random()
+        self.rollout_strategy = rollout_strategy if rollout_strategy is not None else GreedyStrategy()
+
+    def search(self, battle_manager, time_budget=None, max_iterations=None):
+        """从当前局面搜索，返回根节点各行动的 {行动: (访问次数, 价值总和)}
+
+        Args:
+            battle_manager: 当前战斗（不会被修改）
+            time_budget: 墙钟时间预算（秒）
+            max_iterations: 最大迭代次数；两者都为空时只迭代一次
+        """
+        root = DecisionNode(get_legal_actions(battle_manager))
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        iterations = 0
+
+        while True:
+            self._run_iteration(root, battle_manager)
+            iterations += 1
+            if max_iterations is not None and iterations >= max_iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if deadline is None and max_iterations is None:
+                break
+
+        return {action: (edge.visits, edge.value_sum) for action, edge in root.edges.items()}
+
+    def _run_iteration(self, root, battle_manager):
+        """一次迭代：选择、扩展、模拟、回传"""
+        # 共享搜索随机流，每次迭代对机会节点采样出不同的结果；
+        # 真实的牌库顺序对玩家不可见，每次迭代重新打乱副本的牌库，抽牌也作为随机结果采样
+        state = battle_manager.clone(self.rng)
+        state.card_system.shuffle_deck()
+        node = root
+        visited_nodes = [root]
+        visited_edges = []
+
+        while not state.battle_ended:
+            action = self._select_action(node)
+            if action is None:
+                break
+            edge = node.edges.get(action)
+            if edge is None:
+                edge = ChanceNode()
+                node.edges[action] = edge
+            visited_edges.append(edge)
+
+            apply_action(state, action)
+
+            child, expanded = self._child(edge, state)
+            if expanded:
+                # 扩展：新出现的随机结果成为新的决策节点，之后转入模拟
+                visited_nodes.append(child)
+                break
+            node = child
+            visited_nodes.append(node)
+
+        value = self._rollout(state)
+
+        for visited_node in visited_nodes:
+            visited_node.visits += 1
+        for edge in visited_edges:
+            edge.visits += 1
+            edge.value_sum += value
+
+    @staticmethod
+    def _child(edge, state):
+        """取得机会节点下与结果局面对应的决策节点，返回 (节点, 是否新建)"""
+        key = outcome_key(state)
+        child = edge.outcomes.get(key)
+        if child is not None:
+            return child, False
+        child = DecisionNode(get_legal_actions(state))
+        edge.outcomes[key] = child
+        return child, True
+
+    def _select_action(self, node):
+        """UCT选择：先尝试未访问过的行动，再按上置信界选择"""
+        if node.untried:
+            return node.untried.pop()
+        if not node.edges:
+            return None
+
+        log_visits = math.log(node.visits + 1)
+        exploration = self.exploration
+        best_action = None
+        best_score = -1.0
+        for action, edge in node.edges.items():
+            score = (edge.value_sum / edge.visits
+                     + exploration * math.sqrt(log_visits / edge.visits))
+            if score > best_score:
+                best_action = action
+                best_score = score
+        return best_action
+
+    def _rollout(self, state):
+        """模拟：用默认策略推进若干回合并评估局面"""
+        turn_limit = state.turn_count + self.rollout_turns
+        strategy = self.rollout_strategy
+        while not state.battle_ended and state.turn_count < turn_limit:
+            apply_action(state, strategy.choose_action(state))
+        return evaluate_battle(state)
+
+
+def _search_worker(task):
+    """工作进程入口：从快照恢复局面并独立搜索（根并行）"""
+    snapshot, seed, time_budget, max_iterations, exploration, rollout_turns = task
+    battle_manager = BattleManager(log_sink=None, seed=seed)
+    battle_manager.restore(snapshot)
+    # 快照中是真实的牌库顺序，用本进程的种子打乱
+    battle_manager.card_system.shuffle_deck()
+    search = MCTSSearch(exploration, rollout_turns, rng=random.Random(seed))
+    return search.search(battle_manager, time_budget, max_iterations)
+
+
+class MCTSAgent:
+    """蒙特卡洛树搜索智能体
+
+    每次决策在时间预算内搜索；workers 大于1时使用根并行：每个工作进程从同一局面
+    独立建树，最后合并根节点各行动的访问次数，选择访问最多的行动。
+    """
+
+    def __init__(self, time_budget=0.05, workers=1, max_iterations=None,
+                 exploration=1.0, rollout_turns=10, rng=None):
+        """初始化智能体
+
+        Args:
+            time_budget: 每次决策的墙钟时间预算（秒），为None时只受 max_iterations 限制
+            workers: 根并行的进程数
+            max_iterations: 每个搜索树的最大迭代次数（指定后搜索结果与机器速度无关）
+            exploration: UCT探索系数
+            rollout_turns: 模拟阶段最多推进的回合数
+            rng: 搜索随机数生成器，也用于派生工作进程的种子
+        """
+        self.time_budget = time_budget
+        self.workers = max(1, workers)
+        self.max_iterations = max_iterations
+        self.exploration = exploration
+        self.rollout_turns = rollout_turns
+        self.rng = rng if rng is not None else random.Random()
+        self._pool = None
+
+    def analyze(self, battle_manager):
+        """搜索当前局面，返回 {行动: (访问次数, 平均价值)}（可作为出牌建议）"""
+        if self.workers == 1:
+            search = MCTSSearch(self.exploration, self.rollout_turns, rng=self.rng)
+            results = [search.search(battle_manager, self.time_budget, self.max_iterations)]
+        else:
+            if self._pool is None:
+                import multiprocessing
+
+                self._pool = multiprocessing.Pool(self.workers)
+            snapshot = battle_manager.snapshot()
+            tasks = [(snapshot, self.rng.getrandbits(64), self.time_budget, self.max_iterations,
+                      self.exploration, self.rollout_turns) for _ in range(self.workers)]
+            results = self._pool.map(_search_worker, tasks)
+
+        merged = {}
+        for result in results:
+            for action, (visits, value_sum) in result.items():
+                total_visits, total_value = merged.get(action, (0, 0.0))
+                merged[action] = (total_visits + visits, total_value + value_sum)
+        return {action: (visits, value_sum / visits if visits > 0 else 0.0)
+                for action, (visits, value_sum) in merged.items()}
+
+    def choose_action(self, battle_manager):
+        """选择访问次数最多的行动"""
+        actions = get_legal_actions(battle_manager)
+        if len(actions) <= 1:
+            return actions[0] if actions else SETTLEMENT_ACTION
+
+        analysis = self.analyze(battle_manager)
+        return max(actions, key=lambda action: analysis.get(action, (0, 0.0)))
+
+    def close(self):
+        """关闭工作进程池"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
+class MCTSStrategy(BattleStrategy):
+    """蒙特卡洛树搜索策略（供 BattleSimulator 使用）"""
+
+    name = "mcts"
+
+    def __init__(self, time_budget=0.02, workers=1, max_iterations=None, rng=None):
+        """初始化策略
+
+        Args:
+            time_budget: 每次决策的时间预算（秒）
+            workers: 根并行进程数（在多进程模拟的工作进程中应保持为1）
+            max_iterations: 每次决策的最大迭代次数
+            rng: 搜索随机数生成器
+        """
+        self.agent = MCTSAgent(time_budget, workers, max_iterations, rng=rng)
+
+    def choose_action(self, battle_manager):
+        """用树搜索选择行动"""
+        return self.agent.choose_action(battle_manager)
+
+    def close(self):
+        """关闭智能体的工作进程池（再次选择行动时会重新创建）"""
+        self.agent.close()
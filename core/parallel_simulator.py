@@ -0,0 +1,107 @@
+"""
+多进程蒙特卡洛战斗模拟 - 将大量战斗分摊到进程池
+Multiprocess Monte Carlo Battle Farm - Spread Battles Over a Process Pool
+"""
+
+import hashlib
+import os
+import random
+import time
+
+from core.journal import BattleJournal
+from core.simulator import BattleSimulator, SimulationStatistics, STRATEGIES
+
+
+def derive_seeds(master_seed, count):
+    """由主种子派生出 count 个互不相同的子种子"""
+    seed_source = random.Random(master_seed)
+    return [seed_source.getrandbits(64) for _ in range(count)]
+
+
+def battle_seed(master_seed, battle_index):
+    """第 battle_index 场战斗的种子，只由主种子和场次序号决定（与批次划分无关）"""
+    digest = hashlib.blake2b(f"{master_seed}:{battle_index}".encode('ascii'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def split_battles(battle_count, chunk_count):
+    """将战斗场数尽量平均地切分为若干批次"""
+    base, extra = divmod(battle_count, chunk_count)
+    return [base + (1 if i < extra else 0) for i in range(chunk_count)]
+
+
+def _run_chunk(task):
+    """工作进程入口：运行场次序号 [start, start + battle_count) 的一批战斗"""
+    strategy_name, start, battle_count, master_seed, max_turns, journal_path = task
+
+    # 每个批次写自己的日志文件，工作进程之间不共享文件句柄
+    journal = BattleJournal(journal_path) if journal_path else None
+    try:
+        # 每场战斗的种子由主种子和场次序号得到，再拥有自己的私有随机流
+        statistics = SimulationStatistics()
+        with STRATEGIES[strategy_name]() as strategy:
+            simulator = BattleSimulator(strategy, max_turns=max_turns, log_sink=journal)
+            for battle_index in range(start, start + battle_count):
+                statistics.add(simulator.run_battle(battle_seed(master_seed, battle_index)))
+        return statistics
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+def run_parallel_simulation(battle_count, strategy_name='greedy', workers=None,
+                            master_seed=None, max_turns=200, chunks_per_worker=4,
+                            journal_path=None):
+    """在进程池中运行 battle_count 场战斗并合并统计结果
+
+    每场战斗的种子只由主种子和场次序号决定（见 battle_seed），同一主种子下
+    每场战斗的结果与工作进程数、批次划分和进程调度顺序都无关。
+    合并后的计数完全相同，HP百分比的均值只有浮点求和顺序带来的舍入差异。
+
+    Args:
+        battle_count: 总战斗场数
+        strategy_name: 策略名称（见 core.simulator.STRATEGIES）
+        workers: 工作进程数，默认使用全部CPU核心
+        master_seed: 主随机种子，为空时随机生成
+        max_turns: 单场战斗最大回合数
+        chunks_per_worker: 每个进程分到的批次数，用于平衡负载
+        journal_path: 二进制战斗日志路径前缀，第 i 个批次写入 "<前缀>.<i>"，为空时不记录
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, workers)
+    if master_seed is None:
+        master_seed = random.SystemRandom().getrandbits(64)
+
+    chunk_count = max(1, min(battle_count, workers * chunks_per_worker))
+    tasks = []
+    start = 0
+    for index, size in enumerate(split_battles(battle_count, chunk_count)):
+        if size > 0:
+            tasks.append((strategy_name, start, size, master_seed, max_turns,
+                          f"{journal_path}.{index}" if journal_path else None))
+        start += size
+
+    statistics = SimulationStatistics()
+    start_time = time.perf_counter()
+
+    if workers == 1:
+        for task in tasks:
+            statistics.merge(_run_chunk(task))
+    else:
+        # 只在需要进程池时导入，单进程模拟和 import 本模块都不加载 multiprocessing
+        import multiprocessing
+
+        with multiprocessing.Pool(workers) as pool:
+            for chunk_statistics in pool.imap(_run_chunk, tasks):
+                statistics.merge(chunk_statistics)
+
+    elapsed = time.perf_counter() - start_time
+
+    report = statistics.get_report()
+    report['strategy'] = strategy_name
+    report['workers'] = workers
+    report['master_seed'] = master_seed
+    report['elapsed_seconds'] = elapsed
+    report['battles_per_second'] = battle_count / elapsed if elapsed > 0 else 0
+    return report
@@ -0,0 +1,208 @@
+"""
+战斗回放 - 只记录种子和玩家操作流的紧凑回放，以及无界面全速重放
+Battle Replay - Compact Seed + Input-Stream Recording and Full-Speed Headless Replay
+"""
+
+import hashlib
+import struct
+
+from core.battle_manager import BattleManager
+from data.cards import CARD_LIBRARY
+
+
+# ============ 回放格式 ============
+# 头部: MAGIC(4) + 格式版本(uint8) + 种子(uint64) + 终局状态哈希(8字节) + 操作数(uint32)
+# 操作: 每个操作1字节，0-254 为出牌的手牌索引，255 为进入结算阶段
+
+REPLAY_MAGIC = b'CBR1'
+REPLAY_VERSION = 1
+REPLAY_HEADER = struct.Struct('<4sBQ8sI')
+
+ACTION_SETTLEMENT = 0xFF
+
+
+def compute_state_hash(battle_manager):
+    """计算战斗状态哈希（8字节），用于校验回放终局是否与录制时一致"""
+    player = battle_manager.player
+    enemy = battle_manager.enemy
+    card_system = battle_manager.card_system
+    context = battle_manager.battle_context
+    state = (
+        battle_manager.turn_count, battle_manager.phase,
+        battle_manager.battle_ended, battle_manager.victory,
+        player.hp, player.max_hp, player.mp, player.max_mp,
+        player.base_atk, player.atk, player.armor,
+        enemy.hp, enemy.max_hp, enemy.atk,
+        battle_manager.compass.current_position,
+        context.skip_next_turn, context.double_next_attack, context.get_log_version(),
+        tuple(CARD_LIBRARY[number].id for number in card_system.get_deck_order()),
+        tuple(CARD_LIBRARY[number].id for number in card_system.hand),
+        tuple(CARD_LIBRARY[number].id for number in card_system.played_cards),
+    )
+    return hashlib.blake2b(repr(state).encode('utf-8'), digest_size=8).digest()
+
+
+class Replay:
+    """一场战斗的回放：种子 + 操作字节流 + 终局状态哈希"""
+
+    def __init__(self, seed, actions=b'', final_hash=b'\x00' * 8):
+        """初始化回放
+
+        Args:
+            seed: 战斗种子（BattleManager.seed）
+            actions: 操作字节流，每个操作1字节
+            final_hash: 录制结束时的状态哈希
+        """
+        self.seed = seed
+        self.actions = bytes(actions)
+        self.final_hash = final_hash
+
+    def to_bytes(self):
+        """序列化为字节串"""
+        header = REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed,
+                                    self.final_hash, len(self.actions))
+        return header + self.actions
+
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """从字节串中解析一个回放，返回 (回放, 下一个回放的偏移)"""
+        magic, version, seed, final_hash, action_count = REPLAY_HEADER.unpack_from(data, offset)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"无效的回放数据（偏移 {offset}）")
+        start = offset + REPLAY_HEADER.size
+        end = start + action_count
+        return cls(seed, data[start:end], final_hash), end
+
+    def __len__(self):
+        """操作数"""
+        return len(self.actions)
+
+
+def save_replays(path, replays):
+    """把多个回放顺序写入同一个文件"""
+    with open(path, 'wb') as replay_file:
+        for replay in replays:
+            replay_file.write(replay.to_bytes())
+
+
+def load_replays(path):
+    """读取文件中的全部回放"""
+    with open(path, 'rb') as replay_file:
+        data = replay_file.read()
+    replays = []
+    offset = 0
+    while offset < len(data):
+        replay, offset = Replay.from_bytes(data, offset)
+        replays.append(replay)
+    return replays
+
+
+class BattleRecorder:
+    """战斗录制器：代替直接调用 BattleManager 的出牌/结算方法，只记录成功的操作
+
+    失败的操作不会改变战斗状态，因此不需要记录。
+    """
+
+    def __init__(self, battle_manager):
+        """初始化录制器（战斗应尚未进行任何操作）"""
+        if battle_manager.seed is None:
+            raise ValueError("随机流由外部注入的战斗没有种子，无法录制回放")
+        self.battle_manager = battle_manager
+        self.seed = battle_manager.seed
+        self.actions = bytearray()
+
+    def play_card(self, card_index):
+        """出牌并记录"""
+        success, message = self.battle_manager.play_card(card_index)
+        if success:
+            self.actions.append(card_index)
+        return success, message
+
+    def start_settlement_phase(self):
+        """进入结算阶段并记录"""
+        success, message = self.battle_manager.start_settlement_phase()
+        if success:
+            self.actions.append(ACTION_SETTLEMENT)
+        return success, message
+
+    def reset_battle(self, seed=None):
+        """重新开始战斗并开始录制新的回放"""
+        self.battle_manager.reset_battle(seed)
+        if self.battle_manager.seed is None:
+            raise ValueError("随机流由外部注入的战斗没有种子，无法录制回放")
+        self.seed = self.battle_manager.seed
+        self.actions = bytearray()
+
+    def get_replay(self):
+        """获取当前为止的回放（终局哈希取自当前状态）"""
+        return Replay(self.seed, self.actions, compute_state_hash(self.battle_manager))
+
+
+class BattleReplayer:
+    """回放执行器：用回放中的种子新建战斗，逐个重新执行操作"""
+
+    def __init__(self, replay, log_sink=None):
+        """初始化回放执行器
+
+        Args:
+            replay: 要执行的回放
+            log_sink: 战斗日志输出端，全速重放时为None
+        """
+        self.replay = replay
+        self.battle_manager = BattleManager(log_sink=log_sink, seed=replay.seed)
+        self.battle_manager.start_battle()
+        self.position = 0
+
+    def is_finished(self):
+        """是否已执行完全部操作"""
+        return self.position >= len(self.replay.actions)
+
+    def step(self):
+        """执行下一个操作，返回 (操作类型, 操作数据)；已执行完时返回None"""
+        if self.is_finished():
+            return None
+        action = self.replay.actions[self.position]
+        self.position += 1
+
+        if action == ACTION_SETTLEMENT:
+            success, message = self.battle_manager.start_settlement_phase()
+            result = ('attack', None)
+        else:
+            success, message = self.battle_manager.play_card(action)
+            result = ('play_card', action)
+
+        if not success:
+            raise ValueError(f"回放第 {self.position} 个操作执行失败: {message}")
+        return result
+
+    def run(self):
+        """全速执行剩余全部操作，返回战斗管理器"""
+        battle_manager = self.battle_manager
+        actions = self.replay.actions
+        for position in range(self.position, len(actions)):
+            action = actions[position]
+            if action == ACTION_SETTLEMENT:
+                success, message = battle_manager.start_settlement_phase()
+            else:
+                success, message = battle_manager.play_card(action)
+            if not success:
+                raise ValueError(f"回放第 {position + 1} 个操作执行失败: {message}")
+        self.position = len(actions)
+        return battle_manager
+
+    def verify(self):
+        """执行剩余操作并校验终局状态哈希是否与录制时一致"""
+        self.run()
+        return compute_state_hash(self.battle_manager) == self.replay.final_hash
+
+
+def verify_replays(replays):
+    """全速重放并校验多个回放，返回校验失败（哈希不一致或操作无法执行）的回放序号列表"""
+    failed = []
+    for index, replay in enumerate(replays):
+        try:
+            if not BattleReplayer(replay).verify():
+                failed.append(index)
+        except ValueError:
+            failed.append(index)
+    return failed
@@ -0,0 +1,301 @@
+"""
+无界面战斗模拟器 - 脱离pygame批量运行完整战斗
+Headless Battle Simulator - Run Complete Battles Without pygame
+"""
+
+import random
+import time
+
+from core.battle_log import console_sink, multi_sink
+from core.battle_manager import BattleManager
+from core.replay import BattleRecorder
+
+
+# 策略可以返回的行动（与 GameUI.handle_click 的返回格式保持一致）
+ACTION_PLAY_CARD = 'play_card'
+ACTION_ATTACK = 'attack'
+
+
+class BattleStrategy:
+    """出牌策略基类，模拟器每一步询问策略下一步行动"""
+
+    name = "base"
+
+    def choose_action(self, battle_manager):
+        """选择行动
+
+        Returns:
+            ('play_card', 手牌索引) 或 ('attack', None)
+        """
+        raise NotImplementedError
+
+    def uses_battle_rng(self):
+        """策略的选择是否消耗战斗私有的随机流（这样的策略无法录制回放）"""
+        return False
+
+    def close(self):
+        """释放策略占用的资源（例如搜索的工作进程池），之后仍可继续使用"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_playable_indices(self, battle_manager):
+        """获取当前可以使用的手牌索引"""
+        if battle_manager.battle_context.skip_next_turn:
+            return []
+        player = battle_manager.player
+        return [i for i, card in enumerate(battle_manager.card_system.get_hand_cards())
+                if card.can_play(player)]
+
+
+class RandomStrategy(BattleStrategy):
+    """随机策略：随机出一张可用手牌，或以一定概率直接出击"""
+
+    name = "random"
+
+    def __init__(self, attack_chance=0.2, rng=None):
+        """初始化随机策略
+
+        Args:
+            attack_chance: 有牌可出时直接出击的概率
+            rng: 策略专用的随机数生成器，为空时使用战斗私有的随机流，
+                 这样整场战斗（包括策略的选择）完全由战斗种子决定
+        """
+        self.attack_chance = attack_chance
+        self.rng = rng
+
+    def choose_action(self, battle_manager):
+        """随机选择行动"""
+        rng = self.rng if self.rng is not None else battle_manager.rng
+        playable = self.get_playable_indices(battle_manager)
+        if not playable or rng.random() < self.attack_chance:
+            return (ACTION_ATTACK, None)
+        return (ACTION_PLAY_CARD, rng.choice(playable))
+
+    def uses_battle_rng(self):
+        """未指定专用随机数生成器时使用战斗的随机流"""
+        return self.rng is None
+
+
+class GreedyStrategy(BattleStrategy):
+    """贪心策略：按优先级打出可用卡牌，避开负面卡牌，打完再出击"""
+
+    name = "greedy"
+
+    # 卡牌优先级（数值越大越优先），未列出的卡牌不主动使用
+    CARD_PRIORITY = {
+        'fireball': 7,
+        'heavy_blow': 6,
+        'strike': 5,
+        'iron_will': 4,
+        'block': 3,
+        'greater_heal': 2,
+        'heal': 1,
+    }
+
+    def __init__(self, heal_threshold=0.6):
+        """初始化贪心策略
+
+        Args:
+            heal_threshold: HP比例低于该值时才使用治疗卡牌
+        """
+        self.heal_threshold = heal_threshold
+
+    def choose_action(self, battle_manager):
+        """选择优先级最高的可用卡牌"""
+        player = battle_manager.player
+        hand = battle_manager.card_system.get_hand_cards()
+        need_heal = player.hp < player.max_hp * self.heal_threshold
+
+        best_index = None
+        best_priority = 0
+        for i in self.get_playable_indices(battle_manager):
+            card = hand[i]
+            if card.type == 'heal' and not need_heal:
+                continue
+            priority = self.CARD_PRIORITY.get(card.id, 0)
+            if priority > best_priority:
+                best_index = i
+                best_priority = priority
+
+        if best_index is None:
+            return (ACTION_ATTACK, None)
+        return (ACTION_PLAY_CARD, best_index)
+
+
+def create_mcts_strategy(**kwargs):
+    """创建蒙特卡洛树搜索策略（延迟导入，core.mcts 依赖本模块）"""
+    from core.mcts import MCTSStrategy
+    return MCTSStrategy(**kwargs)
+
+
+STRATEGIES = {
+    RandomStrategy.name: RandomStrategy,
+    GreedyStrategy.name: GreedyStrategy,
+    'mcts': create_mcts_strategy,
+}
+
+
+class SimulationStatistics:
+    """战斗统计汇总，字段与 BattleManager.get_battle_statistics 对应，可跨进程合并"""
+
+    def __init__(self):
+        """初始化统计数据"""
+        self.battles = 0
+        self.outcomes = {'victory': 0, 'defeat': 0, 'ongoing': 0}
+        self.turn_distribution = {}     # 回合数 -> 场数
+        self.total_cards_played = 0
+        self.player_hp = {'total': 0.0, 'min': None, 'max': None}
+        self.enemy_hp = {'total': 0.0, 'min': None, 'max': None}
+
+    def add(self, stats):
+        """记录一场战斗的统计信息"""
+        self.battles += 1
+        outcome = stats['battle_outcome']
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+        turns = stats['turns_elapsed']
+        self.turn_distribution[turns] = self.turn_distribution.get(turns, 0) + 1
+
+        self.total_cards_played += stats['cards_played']
+        self._add_hp(self.player_hp, stats['player_hp_percentage'])
+        self._add_hp(self.enemy_hp, stats['enemy_hp_percentage'])
+
+    def merge(self, other):
+        """合并另一份统计数据（用于汇总多个工作进程的结果）"""
+        self.battles += other.battles
+        for outcome, count in other.outcomes.items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + count
+        for turns, count in other.turn_distribution.items():
+            self.turn_distribution[turns] = self.turn_distribution.get(turns, 0) + count
+
+        self.total_cards_played += other.total_cards_played
+        self._merge_hp(self.player_hp, other.player_hp)
+        self._merge_hp(self.enemy_hp, other.enemy_hp)
+
+    def get_report(self):
+        """获取汇总报告"""
+        battles = self.battles
+        total_turns = sum(turns * count for turns, count in self.turn_distribution.items())
+        return {
+            'battles': battles,
+            'victories': self.outcomes['victory'],
+            'defeats': self.outcomes['defeat'],
+            'unfinished': self.outcomes['ongoing'],
+            'win_rate': self.outcomes['victory'] / battles if battles > 0 else 0,
+            'average_turns': total_turns / battles if battles > 0 else 0,
+            'turn_distribution': dict(sorted(self.turn_distribution.items())),
+            'average_cards_played': self.total_cards_played / battles if battles > 0 else 0,
+            'player_hp_percentage': self._hp_report(self.player_hp, battles),
+            'enemy_hp_percentage': self._hp_report(self.enemy_hp, battles)
+        }
+
+    @staticmethod
+    def _add_hp(hp_stats, value):
+        """累加一个HP百分比样本"""
+        hp_stats['total'] += value
+        if hp_stats['min'] is None or value < hp_stats['min']:
+            hp_stats['min'] = value
+        if hp_stats['max'] is None or value > hp_stats['max']:
+            hp_stats['max'] = value
+
+    @staticmethod
+    def _merge_hp(hp_stats, other):
+        """合并HP百分比统计"""
+        hp_stats['total'] += other['total']
+        for key, pick in (('min', min), ('max', max)):
+            if other[key] is not None:
+                hp_stats[key] = other[key] if hp_stats[key] is None else pick(hp_stats[key], other[key])
+
+    @staticmethod
+    def _hp_report(hp_stats, battles):
+        """生成HP百分比的均值/最小/最大值"""
+        return {
+            'mean': hp_stats['total'] / battles if battles > 0 else 0,
+            'min': hp_stats['min'],
+            'max': hp_stats['max']
+        }
+
+
+class BattleSimulator:
+    """无界面战斗模拟器：不导入pygame、不渲染、不输出日志"""
+
+    def __init__(self, strategy=None, max_turns=200, rng=None, verbose=False, log_sink=None,
+                 record=False):
+        """初始化模拟器
+
+        Args:
+            strategy: 出牌策略对象，默认为贪心策略
+            max_turns: 单场战斗最大回合数，超过后按未结束处理
+            rng: 用于派生每场战斗种子的 random.Random，为空时自动创建
+            verbose: 是否输出战斗日志（复现单场战斗时使用）
+            log_sink: 额外的战斗日志输出端，例如 core.journal.BattleJournal
+            record: 是否录制每场战斗的回放（保存在 self.replays 中）
+        """
+        self.strategy = strategy if strategy is not None else GreedyStrategy()
+        if record and self.strategy.uses_battle_rng():
+            # 回放只记录玩家操作，重放时战斗随机流不会被策略消耗，结果会与录制时不一致
+            raise ValueError("策略使用战斗的随机流，无法录制回放；请为策略指定专用的随机数生成器")
+        self.max_turns = max_turns
+        self.rng = rng if rng is not None else random.Random()
+        self.verbose = verbose
+        self.log_sink = multi_sink(console_sink if verbose else None, log_sink)
+        self.record = record
+        self.replays = []
+
+    def run_battle(self, seed=None):
+        """运行一场完整战斗，返回战斗统计信息
+
+        每场战斗使用自己的私有随机流，统计信息中的 'seed' 可传回本方法逐位复现该场战斗。
+        """
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        battle_manager = BattleManager(log_sink=self.log_sink, seed=seed)
+        battle_manager.start_battle()
+
+        # 录制时所有操作经过录制器
+        actor = BattleRecorder(battle_manager) if self.record else battle_manager
+
+        while not battle_manager.battle_ended and battle_manager.turn_count <= self.max_turns:
+            action_type, action_data = self.strategy.choose_action(battle_manager)
+
+            if action_type == ACTION_PLAY_CARD:
+                success, _ = actor.play_card(action_data)
+                if success:
+                    continue
+
+            # 出击或出牌失败时进入结算，保证战斗一定向前推进
+            actor.start_settlement_phase()
+
+        if self.record:
+            self.replays.append(actor.get_replay())
+
+        stats = battle_manager.get_battle_statistics()
+        stats['seed'] = seed
+        return stats
+
+    def run_statistics(self, battle_count):
+        """连续运行多场战斗，返回 SimulationStatistics"""
+        statistics = SimulationStatistics()
+        for _ in range(battle_count):
+            statistics.add(self.run_battle())
+        return statistics
+
+    def run(self, battle_count):
+        """连续运行多场战斗，返回汇总报告（包含每秒战斗数）"""
+        start_time = time.perf_counter()
+        try:
+            statistics = self.run_statistics(battle_count)
+        finally:
+            # 运行结束后释放策略的资源（搜索策略的进程池），不留到解释器退出
+            self.strategy.close()
+        elapsed = time.perf_counter() - start_time
+
+        report = statistics.get_report()
+        report['strategy'] = self.strategy.name
+        report['elapsed_seconds'] = elapsed
+        report['battles_per_second'] = battle_count / elapsed if elapsed > 0 else 0
+        return report
@@ -0,0 +1,19 @@
+"""
+状态版本追踪 - 为游戏对象提供脏标记版本号
+State Version Tracking - Dirty-Flag Version Counters for Game Objects
+"""
+
+
+class VersionedState:
+    """带版本号的状态对象基类
+
+    所有修改状态的方法在修改后调用 touch()，使 state_version 递增；
+    缓存只需比较版本号即可判断对象是否发生变化。外部代码应通过方法修改状态，
+    而不是直接给属性赋值，否则缓存无法感知变化。
+    """
+
+    state_version = 0
+
+    def touch(self):
+        """标记状态已变化"""
+        self.state_version += 1
@@ -0,0 +1,104 @@
+"""
+增量状态哈希 - Zobrist 风格的64位局面键，随每次状态修改以O(1)更新
+Incremental State Hashing - Zobrist-Style 64-bit Position Keys Updated in O(1) on Every Mutation
+"""
+
+import hashlib
+
+
+MASK64 = (1 << 64) - 1
+
+
+# ============ 字段编号 ============
+# 每个 (字段, 取值) 对应一个固定的64位随机键，字段的哈希贡献是当前取值的键；
+# 修改字段时异或掉旧值的键、异或上新值的键即可更新哈希
+
+(PLAYER_MAX_HP, PLAYER_HP, PLAYER_MAX_MP, PLAYER_MP, PLAYER_BASE_ATK, PLAYER_ATK, PLAYER_ARMOR,
+ ENEMY_MAX_HP, ENEMY_HP, ENEMY_ATK,
+ COMPASS_POSITION,
+ SKIP_NEXT_TURN, DOUBLE_NEXT_ATTACK,
+ TURN_COUNT, PHASE, BATTLE_ENDED, VICTORY) = range(17)
+
+# 牌堆编号（牌堆哈希混合时使用）
+PILE_DECK, PILE_HAND, PILE_PLAYED = range(3)
+_PILE_SALTS = (0x3C6EF372FE94F82B, 0x632BE59BD9B4E019, 0x2545F4914F6CDD1D)
+
+
+def mix64(value):
+    """64位整数混合函数（splitmix64 的输出变换），把相邻整数映射为互不相关的随机键"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def _compute_field_key(field, value):
+    """计算字段取值的随机键"""
+    return mix64((field << 40) ^ (int(value) & 0xFFFFFFFFFF))
+
+
+# 常见取值（0-255）的键预先生成为每个字段一张表，更新哈希时直接按下标取键
+FIELD_TABLE_SIZE = 256
+FIELD_KEY_TABLES = [[_compute_field_key(field, value) for value in range(FIELD_TABLE_SIZE)]
+                    for field in range(VICTORY + 1)]
+
+_CARD_KEYS = {}
+
+
+def field_key(field, value):
+    """字段取值的随机键（与进程无关，可以跨进程、跨运行比较）"""
+    if 0 <= value < FIELD_TABLE_SIZE:
+        return FIELD_KEY_TABLES[field][value]
+    return _compute_field_key(field, value)
+
+
+def card_key(card_id):
+    """卡牌的随机键（按卡牌id计算，同id的卡牌副本键相同）"""
+    key = _CARD_KEYS.get(card_id)
+    if key is None:
+        digest = hashlib.blake2b(card_id.encode('utf-8'), digest_size=8).digest()
+        key = int.from_bytes(digest, 'little')
+        _CARD_KEYS[card_id] = key
+    return key
+
+
+def pile_sum(keys):
+    """牌堆的多重集哈希：各卡牌键之和（模2^64），加入/移出一张牌只需加/减一个键"""
+    return sum(keys) & MASK64
+
+
+def combine_piles(deck_sum, hand_sum, played_sum):
+    """把三个牌堆的多重集哈希按牌堆编号混合为卡牌系统的哈希"""
+    return (mix64((deck_sum + _PILE_SALTS[PILE_DECK]) & MASK64)
+            ^ mix64((hand_sum + _PILE_SALTS[PILE_HAND]) & MASK64)
+            ^ mix64((played_sum + _PILE_SALTS[PILE_PLAYED]) & MASK64))
+
+
+class ZobristHashed:
+    """带增量哈希的状态对象
+
+    zobrist 是各字段当前取值的键的异或；修改字段的方法在修改后调用
+    rehash(字段, 旧值, 新值)，不需要重新计算全部字段。
+    """
+
+    zobrist = 0
+
+    # (字段编号, 属性名) 列表，由子类定义
+    ZOBRIST_FIELDS = ()
+
+    def rehash(self, field, old_value, new_value):
+        """字段从旧值变为新值后更新哈希"""
+        if old_value != new_value:
+            if 0 <= old_value < FIELD_TABLE_SIZE and 0 <= new_value < FIELD_TABLE_SIZE:
+                table = FIELD_KEY_TABLES[field]
+                self.zobrist ^= table[old_value] ^ table[new_value]
+            else:
+                self.zobrist ^= field_key(field, old_value) ^ field_key(field, new_value)
+
+    def compute_zobrist(self):
+        """按当前全部字段重新计算哈希（只在初始化和整体恢复状态时使用）"""
+        value = 0
+        for field, attribute in self.ZOBRIST_FIELDS:
+            value ^= field_key(field, getattr(self, attribute))
+        self.zobrist = value
+        return value
@@ -3,20 +3,51 @@
 Card System Data - Card Classes and Basic Card Library
 """
 
-class Card:
-    """卡牌基础数据结构"""
-    
-    def __init__(self, card_id, name, card_type, mp_cost, compass_points, effect_func, description, is_direct_damage=False):
-        """初始化卡牌"""
-        self.id = card_id
-        self.name = name                    # 卡牌名称
-        self.type = card_type              # 卡牌类型：'attack', 'defense', 'heal', 'buff', 'negative'
-        self.mp_cost = mp_cost             # 魔法值消耗
-        self.compass_points = compass_points # 罗盘推进点数
-        self.effect = effect_func          # 卡牌效果函数
-        self.description = description      # 卡牌描述
-        self.is_direct_damage = is_direct_damage  # 是否为直接伤害卡牌
+from core.effects import (
+    instruction, make_effect, AMOUNT, RESULT, TARGET,
+    ADD_ATK, ARMOR, HEAL, DAMAGE, LOSE_HP, SKIP_TURN, HALVE_ATK
+)
+from core.zobrist import card_key
+
+
+class CardTemplate:
+    """卡牌模板（享元）
+    
+    每种卡牌只有一个不可变实例，登记在 CARD_LIBRARY 中；牌库、手牌、弃牌堆只保存
+    模板的整数编号，同一种卡牌的多张副本共享同一个模板。
+    """
+    
+    __slots__ = ('id', 'name', 'type', 'mp_cost', 'compass_points', 'effect', 'program',
+                 'description', 'is_direct_damage', 'hash_key')
+    
+    def __init__(self, card_id, name, card_type, mp_cost, compass_points, effect, description, is_direct_damage=False):
+        """初始化卡牌模板（创建后不可修改）
         
+        effect 为操作码程序（见 core.effects）时编译为效果函数并保存在 program 中；
+        也可以直接传入手写的效果函数（program 为None）。
+        """
+        effect_func, program = make_effect(effect)
+        init = object.__setattr__
+        init(self, 'id', card_id)
+        init(self, 'name', name)                        # 卡牌名称
+        init(self, 'type', card_type)                   # 卡牌类型：'attack', 'defense', 'heal', 'buff', 'negative'
+        init(self, 'mp_cost', mp_cost)                  # 魔法值消耗
+        init(self, 'compass_points', compass_points)    # 罗盘推进点数
+        init(self, 'effect', effect_func)               # 卡牌效果函数
+        init(self, 'program', program)                  # 效果的操作码程序
+        init(self, 'description', description)          # 卡牌描述
+        init(self, 'is_direct_damage', is_direct_damage)  # 是否为直接伤害卡牌
+        init(self, 'hash_key', card_key(card_id))       # 牌堆增量哈希中的卡牌键
+        
+    def __setattr__(self, name, value):
+        raise AttributeError(f"卡牌模板不可修改: {self.id}.{name}")
+        
+    def __delattr__(self, name):
+        raise AttributeError(f"卡牌模板不可修改: {self.id}.{name}")
+        
+    def __repr__(self):
+        return f"CardTemplate({self.id!r})"
+    
     def can_play(self, player):
         """检查是否可以使用（MP是否足够）"""
         return player.mp >= self.mp_cost
@@ -29,6 +60,7 @@ class Card:
     def get_display_info(self):
         """获取显示信息"""
         return {
+            'id': self.id,
             'name': self.name,
             'type': self.type,
             'mp_cost': self.mp_cost,
@@ -38,135 +70,220 @@ class Card:
         }
 
 
-# ============ 直接伤害卡牌效果函数 ============
-
-def fireball_effect(battle_context):
-    """火球效果：直接造成15点伤害"""
-    base_damage = 15
-    final_damage = battle_context.enemy.take_damage(base_damage)
-    battle_context.log(f"Fireball直接造成 {final_damage} 点伤害给 {battle_context.enemy.name}")
+# ============ 直接伤害卡牌效果 ============
 
+# 火球：直接造成15点伤害
+FIREBALL_EFFECT = (
+    instruction(DAMAGE, 15, ('fireball_damage', RESULT, TARGET)),
+)
 
-# ============ 攻击力累加卡牌效果函数 ============
 
-def strike_effect(battle_context):
-    """攻击效果：增加6点攻击力"""
-    atk_bonus = 6
-    battle_context.player.atk += atk_bonus
-    battle_context.log(f"Strike增加 {atk_bonus} 点攻击力（当前攻击力: {battle_context.player.atk}）")
+# ============ 攻击力累加卡牌效果 ============
 
+# 攻击：增加6点攻击力
+STRIKE_EFFECT = (
+    instruction(ADD_ATK, 6, ('strike_atk', AMOUNT, RESULT)),
+)
 
-def heavy_blow_effect(battle_context):
-    """重击效果：增加12点攻击力"""
-    atk_bonus = 12
-    battle_context.player.atk += atk_bonus
-    battle_context.log(f"Heavy Blow增加 {atk_bonus} 点攻击力（当前攻击力: {battle_context.player.atk}）")
+# 重击：增加12点攻击力
+HEAVY_BLOW_EFFECT = (
+    instruction(ADD_ATK, 12, ('heavy_blow_atk', AMOUNT, RESULT)),
+)
 
 
-# ============ 防御类卡牌效果函数 ============
+# ============ 防御类卡牌效果 ============
 
-def block_effect(battle_context):
-    """防御效果：获得8点护甲"""
-    armor_amount = 8
-    battle_context.player.add_armor(armor_amount)
-    battle_context.log(f"Block获得 {armor_amount} 点护甲")
+# 防御：获得8点护甲
+BLOCK_EFFECT = (
+    instruction(ARMOR, 8, ('block_armor', AMOUNT)),
+)
 
+# 钢铁意志：获得15点护甲
+IRON_WILL_EFFECT = (
+    instruction(ARMOR, 15, ('iron_will_armor', AMOUNT)),
+)
 
-def iron_will_effect(battle_context):
-    """钢铁意志效果：获得15点护甲"""
-    armor_amount = 15
-    battle_context.player.add_armor(armor_amount)
-    battle_context.log(f"Iron Will获得 {armor_amount} 点护甲")
 
+# ============ 治疗类卡牌效果 ============
 
-# ============ 治疗类卡牌效果函数 ============
+# 治疗：恢复12点HP
+HEAL_EFFECT = (
+    instruction(HEAL, 12, ('heal_hp', RESULT)),
+)
 
-def heal_effect(battle_context):
-    """治疗效果：恢复12点HP"""
-    heal_amount = 12
-    actual_heal = battle_context.player.heal(heal_amount)
-    battle_context.log(f"Heal恢复 {actual_heal} 点HP")
-
-
-def greater_heal_effect(battle_context):
-    """强效治疗效果：恢复20点HP"""
-    heal_amount = 20
-    actual_heal = battle_context.player.heal(heal_amount)
-    battle_context.log(f"Greater Heal恢复 {actual_heal} 点HP")
+# 强效治疗：恢复20点HP
+GREATER_HEAL_EFFECT = (
+    instruction(HEAL, 20, ('greater_heal_hp', RESULT)),
+)
 
 
 # ============ 负面卡牌效果（由罗盘事件插入）============
 
-def curse_effect(battle_context):
-    """诅咒效果：跳过下一个出牌阶段"""
-    battle_context.skip_next_turn = True
-    battle_context.log("Curse：下一回合跳过出牌阶段！")
-
+# 诅咒：跳过下一个出牌阶段
+CURSE_EFFECT = (
+    instruction(SKIP_TURN, 0, ('curse_skip',)),
+)
 
-def drain_effect(battle_context):
-    """吸取效果：失去5点HP"""
-    damage = 5
-    actual_damage = battle_context.player.take_damage(damage)
-    battle_context.log(f"Drain：失去 {actual_damage} 点HP")
+# 吸取：失去5点HP
+DRAIN_EFFECT = (
+    instruction(LOSE_HP, 5, ('drain_hp', RESULT)),
+)
 
-
-def weakness_effect(battle_context):
-    """虚弱效果：本回合攻击力减半"""
-    if battle_context.player.atk > 1:
-        reduced_atk = max(1, battle_context.player.atk // 2)
-        battle_context.player.atk = reduced_atk
-        battle_context.log(f"Weakness：攻击力减半至 {reduced_atk}")
-    else:
-        battle_context.log("Weakness：攻击力已是最低值")
+# 虚弱：本回合攻击力减半
+WEAKNESS_EFFECT = (
+    instruction(HALVE_ATK, 0, ('weakness_atk', RESULT), ('weakness_min',)),
+)
 
 
 # ============ 基础卡牌库定义 ============
 
 BASIC_CARDS = [
     # 攻击累加类卡牌
-    Card("strike", "Strike", "attack", 0, 1, strike_effect, "增加6点攻击力", False),
-    Card("heavy_blow", "Heavy Blow", "attack", 2, 2, heavy_blow_effect, "增加12点攻击力", False),
+    CardTemplate("strike", "Strike", "attack", 0, 1, STRIKE_EFFECT, "增加6点攻击力", False),
+    CardTemplate("heavy_blow", "Heavy Blow", "attack", 2, 2, HEAVY_BLOW_EFFECT, "增加12点攻击力", False),
     
     # 直接伤害类卡牌
-    Card("fireball", "Fireball", "attack", 3, 3, fireball_effect, "直接造成15点伤害", True),
+    CardTemplate("fireball", "Fireball", "attack", 3, 3, FIREBALL_EFFECT, "直接造成15点伤害", True),
     
     # 防御类卡牌
-    Card("block", "Block", "defense", 1, 1, block_effect, "获得8点护甲"),
-    Card("iron_will", "Iron Will", "defense", 2, 1, iron_will_effect, "获得15点护甲"),
+    CardTemplate("block", "Block", "defense", 1, 1, BLOCK_EFFECT, "获得8点护甲"),
+    CardTemplate("iron_will", "Iron Will", "defense", 2, 1, IRON_WILL_EFFECT, "获得15点护甲"),
     
     # 治疗类卡牌
-    Card("heal", "Heal", "heal", 2, 1, heal_effect, "恢复12点HP"),
-    Card("greater_heal", "Greater Heal", "heal", 4, 2, greater_heal_effect, "恢复20点HP"),
+    CardTemplate("heal", "Heal", "heal", 2, 1, HEAL_EFFECT, "恢复12点HP"),
+    CardTemplate("greater_heal", "Greater Heal", "heal", 4, 2, GREATER_HEAL_EFFECT, "恢复20点HP"),
 ]
 
 # 负面卡牌库（由罗盘事件插入）
 NEGATIVE_CARDS = [
-    Card("curse", "Curse", "negative", 0, 0, curse_effect, "跳过下一回合"),
-    Card("drain", "Drain", "negative", 0, 0, drain_effect, "失去5点HP"),
-    Card("weakness", "Weakness", "negative", 0, 0, weakness_effect, "攻击力减半"),
+    CardTemplate("curse", "Curse", "negative", 0, 0, CURSE_EFFECT, "跳过下一回合"),
+    CardTemplate("drain", "Drain", "negative", 0, 0, DRAIN_EFFECT, "失去5点HP"),
+    CardTemplate("weakness", "Weakness", "negative", 0, 0, WEAKNESS_EFFECT, "攻击力减半"),
 ]
 
+# 兼容旧代码中的类名
+Card = CardTemplate
 
-def create_starting_deck():
-    """创建起始牌库"""
-    # 每种基础卡牌3份
-    starting_deck = []
-    for card in BASIC_CARDS:
-        for _ in range(3):
-            # 创建卡牌副本，避免引用同一对象
-            new_card = Card(
-                card.id, card.name, card.type, card.mp_cost, 
-                card.compass_points, card.effect, card.description, card.is_direct_damage
-            )
-            starting_deck.append(new_card)
+
+# ============ 卡牌注册表 ============
+
+class CardRegistry:
+    """卡牌注册表：按ID的哈希索引，以及按类型、MP消耗、罗盘点数、直接伤害的二级索引
+    
+    卡牌的整数编号是登记顺序（牌堆中保存的就是这个编号），登记后不会改变；
+    索引中的编号按登记顺序排列，因此查询结果的顺序是确定的。
+    """
+    
+    def __init__(self, cards=()):
+        """初始化注册表并依次登记卡牌"""
+        self.cards = []          # 编号 -> 卡牌模板
+        self.index = {}          # 卡牌ID -> 编号
+        self.by_type = {}        # 类型 -> 编号列表
+        self.by_cost = {}        # MP消耗 -> 编号列表
+        self.by_compass_points = {}  # 罗盘点数 -> 编号列表
+        self.direct_damage = []  # 直接伤害卡牌的编号列表
+        self._query_cache = {}
+        for card in cards:
+            self.register(card)
+    
+    def register(self, card):
+        """登记一张卡牌模板，返回它的编号"""
+        if card.id in self.index:
+            raise ValueError(f"卡牌ID重复: {card.id}")
+        number = len(self.cards)
+        self.cards.append(card)
+        self.index[card.id] = number
+        self.by_type.setdefault(card.type, []).append(number)
+        self.by_cost.setdefault(card.mp_cost, []).append(number)
+        self.by_compass_points.setdefault(card.compass_points, []).append(number)
+        if card.is_direct_damage:
+            self.direct_damage.append(number)
+        self._query_cache.clear()
+        return number
     
-    return starting_deck
+    def __len__(self):
+        return len(self.cards)
+    
+    def __iter__(self):
+        return iter(self.cards)
+    
+    def __contains__(self, card_id):
+        return card_id in self.index
+    
+    def __getitem__(self, number):
+        """按编号获取卡牌模板"""
+        return self.cards[number]
+    
+    def get(self, card_id, default=None):
+        """按ID获取卡牌模板，不存在时返回 default"""
+        number = self.index.get(card_id)
+        return self.cards[number] if number is not None else default
+    
+    def number_of(self, card_id):
+        """卡牌ID对应的编号（不存在时抛出 KeyError）"""
+        return self.index[card_id]
+    
+    def find_numbers(self, card_type=None, mp_cost=None, compass_points=None, is_direct_damage=None):
+        """按属性查询卡牌编号（为None的条件不参与过滤），返回按编号排序的元组
+        
+        从最小的候选索引出发，再用其余索引过滤；相同查询的结果会被缓存。
+        """
+        query = (card_type, mp_cost, compass_points, is_direct_damage)
+        result = self._query_cache.get(query)
+        if result is not None:
+            return result
+        
+        candidates = []
+        if card_type is not None:
+            candidates.append(self.by_type.get(card_type, ()))
+        if mp_cost is not None:
+            candidates.append(self.by_cost.get(mp_cost, ()))
+        if compass_points is not None:
+            candidates.append(self.by_compass_points.get(compass_points, ()))
+        if is_direct_damage:
+            candidates.append(self.direct_damage)
+        
+        if candidates:
+            candidates.sort(key=len)
+            filters = [set(numbers) for numbers in candidates[1:]]
+            numbers = [number for number in candidates[0]
+                       if all(number in numbers_set for numbers_set in filters)]
+        else:
+            numbers = range(len(self.cards))
+        if is_direct_damage is False:
+            direct = set(self.direct_damage)
+            numbers = [number for number in numbers if number not in direct]
+        
+        result = tuple(numbers)
+        self._query_cache[query] = result
+        return result
+    
+    def find(self, card_type=None, mp_cost=None, compass_points=None, is_direct_damage=None):
+        """按属性查询卡牌模板，返回按编号排序的元组"""
+        cards = self.cards
+        return tuple(cards[number] for number in
+                     self.find_numbers(card_type, mp_cost, compass_points, is_direct_damage))
+
+
+# 全部卡牌模板在导入时登记一次
+CARD_REGISTRY = CardRegistry(BASIC_CARDS + NEGATIVE_CARDS)
+
+# 编号 -> 模板 的列表和 ID -> 编号 的字典（注册表内部的索引本身）
+CARD_LIBRARY = CARD_REGISTRY.cards
+CARD_INDEX = CARD_REGISTRY.index
+
+
+def create_starting_deck():
+    """创建起始牌库（每种基础卡牌3份，同种卡牌共享同一个模板）"""
+    return [card for card in BASIC_CARDS for _ in range(3)]
+
+
+def create_starting_numbers():
+    """创建起始牌库的卡牌编号列表（与 create_starting_deck 顺序一致）"""
+    number_of = CARD_REGISTRY.number_of
+    return [number_of(card.id) for card in BASIC_CARDS for _ in range(3)]
 
 
 def get_card_by_id(card_id):
-    """根据ID获取卡牌模板"""
-    all_cards = BASIC_CARDS + NEGATIVE_CARDS
-    for card in all_cards:
-        if card.id == card_id:
-            return card
-    return None 
\ No newline at end of file
+    """根据ID获取卡牌模板（哈希索引，O(1)）"""
+    return CARD_REGISTRY.get(card_id)
@@ -4,156 +4,125 @@ Compass Event System - Negative and Lucky Event Definitions
 """
 
 import random
-from data.cards import NEGATIVE_CARDS, Card
+from core.effects import (
+    instruction, make_effect, AMOUNT, RESULT,
+    ADD_CURSE, LOSE_HP, SKIP_TURN, LOSE_MP, WEAKEN_ATK, DISCARD_RANDOM,
+    HEAL, RESTORE_MP, DOUBLE_ATTACK, ARMOR, DRAW, ADD_ATK
+)
 
 
 class CompassEvent:
     """罗盘事件基础类"""
     
-    def __init__(self, name, description, effect_func):
-        """初始化事件"""
+    def __init__(self, name, description, effect):
+        """初始化事件（effect 为操作码程序或手写的效果函数，与 CardTemplate 相同）"""
         self.name = name
         self.description = description
-        self.effect = effect_func
+        self.effect, self.program = make_effect(effect)
         
     def trigger(self, battle_context):
         """触发事件效果"""
-        battle_context.log(f"罗盘事件: {self.name}!")
-        battle_context.log(f"效果: {self.description}")
+        battle_context.log('compass_event', self.name)
+        battle_context.log('compass_event_effect', self.description)
         if self.effect:
             self.effect(battle_context)
 
 
-# ============ 负面事件效果函数 ============
+# ============ 负面事件效果 ============
 
-def add_curse_card_event(battle_context):
-    """添加诅咒卡牌到牌库"""
-    # 随机选择一张负面卡牌
-    negative_card = random.choice(NEGATIVE_CARDS)
-    # 创建卡牌副本
-    curse_card = Card(
-        negative_card.id, negative_card.name, negative_card.type, 
-        negative_card.mp_cost, negative_card.compass_points, 
-        negative_card.effect, negative_card.description
-    )
-    
-    # 添加到牌库顶部
-    battle_context.card_system.add_negative_card(curse_card)
-    battle_context.log(f"一张 {curse_card.name} 被添加到你的牌库中")
-
-
-def lose_hp_event(battle_context):
-    """立即失去HP"""
-    damage = 3
-    actual_damage = battle_context.player.take_damage(damage)
-    battle_context.log(f"你失去了 {actual_damage} 点HP")
-
-
-def skip_turn_event(battle_context):
-    """跳过下一个出牌阶段"""
-    battle_context.skip_next_turn = True
-    battle_context.log("你将跳过下一个出牌阶段")
-
-
-def lose_mp_event(battle_context):
-    """失去MP"""
-    mp_loss = 2
-    actual_loss = min(battle_context.player.mp, mp_loss)
-    battle_context.player.mp -= actual_loss
-    battle_context.log(f"你失去了 {actual_loss} 点MP")
-
-
-def weaken_attack_event(battle_context):
-    """降低攻击力"""
-    atk_reduction = 2
-    battle_context.player.atk = max(0, battle_context.player.atk - atk_reduction)
-    battle_context.log(f"你的攻击力降低了 {atk_reduction} 点")
-
-
-def discard_card_event(battle_context):
-    """随机弃置一张手牌"""
-    if len(battle_context.card_system.hand) > 0:
-        card_index = random.randrange(len(battle_context.card_system.hand))
-        discarded_card = battle_context.card_system.remove_card_from_hand(card_index)
-        if discarded_card:
-            battle_context.log(f"你弃置了 {discarded_card.name}")
-    else:
-        battle_context.log("手牌为空，无法弃置")
+# 随机一张负面卡牌添加到牌库顶部
+ADD_CURSE_CARD_EFFECT = (
+    instruction(ADD_CURSE, 0, ('curse_added', RESULT)),
+)
 
+# 立即失去HP
+LOSE_HP_EFFECT = (
+    instruction(LOSE_HP, 3, ('event_lose_hp', RESULT)),
+)
 
-# ============ 幸运事件效果函数 ============
+# 跳过下一个出牌阶段
+SKIP_TURN_EFFECT = (
+    instruction(SKIP_TURN, 0, ('event_skip_turn',)),
+)
 
-def heal_bonus_event(battle_context):
-    """立即恢复HP"""
-    heal_amount = 15
-    actual_heal = battle_context.player.heal(heal_amount)
-    battle_context.log(f"你恢复了 {actual_heal} 点HP")
+# 失去MP
+LOSE_MP_EFFECT = (
+    instruction(LOSE_MP, 2, ('event_lose_mp', RESULT)),
+)
 
+# 降低攻击力
+WEAKEN_ATTACK_EFFECT = (
+    instruction(WEAKEN_ATK, 2, ('event_weaken', AMOUNT)),
+)
 
-def mp_bonus_event(battle_context):
-    """获得额外MP"""
-    mp_bonus = 3
-    actual_restore = battle_context.player.restore_mp(mp_bonus)
-    battle_context.log(f"你获得了 {actual_restore} 点MP")
+# 随机弃置一张手牌
+DISCARD_CARD_EFFECT = (
+    instruction(DISCARD_RANDOM, 0, ('event_discard', RESULT), ('event_discard_empty',)),
+)
 
 
-def double_attack_event(battle_context):
-    """下次攻击伤害翻倍"""
-    # 这个效果需要在战斗管理器中实现状态跟踪
-    battle_context.double_next_attack = True
-    battle_context.log("你的下次攻击伤害将翻倍！")
+# ============ 幸运事件效果 ============
 
+# 立即恢复HP
+HEAL_BONUS_EFFECT = (
+    instruction(HEAL, 15, ('event_heal', RESULT)),
+)
 
-def armor_bonus_event(battle_context):
-    """立即获得护甲"""
-    armor_amount = 10
-    battle_context.player.add_armor(armor_amount)
-    battle_context.log(f"你获得了 {armor_amount} 点护甲")
+# 获得额外MP
+MP_BONUS_EFFECT = (
+    instruction(RESTORE_MP, 3, ('event_mp_bonus', RESULT)),
+)
 
+# 下次攻击伤害翻倍（翻倍在 BattleManager 的结算阶段生效）
+DOUBLE_ATTACK_EFFECT = (
+    instruction(DOUBLE_ATTACK, 0, ('event_double_attack',)),
+)
 
-def draw_bonus_event(battle_context):
-    """抽取额外卡牌"""
-    draw_count = 2
-    battle_context.card_system.draw_cards(draw_count)
-    battle_context.log(f"你抽取了 {draw_count} 张卡牌")
+# 立即获得护甲
+ARMOR_BONUS_EFFECT = (
+    instruction(ARMOR, 10, ('event_armor', AMOUNT)),
+)
 
+# 抽取额外卡牌
+DRAW_BONUS_EFFECT = (
+    instruction(DRAW, 2, ('event_draw', AMOUNT)),
+)
 
-def strengthen_event(battle_context):
-    """永久增加攻击力"""
-    atk_bonus = 1
-    battle_context.player.atk += atk_bonus
-    battle_context.log(f"你的攻击力永久增加了 {atk_bonus} 点")
+# 永久增加攻击力
+STRENGTHEN_EFFECT = (
+    instruction(ADD_ATK, 1, ('event_strengthen', AMOUNT)),
+)
 
 
 # ============ 事件库定义 ============
 
 NEGATIVE_EVENTS = [
-    CompassEvent("诅咒侵蚀", "一张诅咒卡牌被添加到你的牌库", add_curse_card_event),
-    CompassEvent("黑暗能量", "你立即失去3点HP", lose_hp_event),
-    CompassEvent("精神涣散", "跳过下一个出牌阶段", skip_turn_event),
-    CompassEvent("魔力燃烧", "你失去2点MP", lose_mp_event),
-    CompassEvent("力量衰退", "你的攻击力降低2点", weaken_attack_event),
-    CompassEvent("心神不宁", "随机弃置一张手牌", discard_card_event),
+    CompassEvent("诅咒侵蚀", "一张诅咒卡牌被添加到你的牌库", ADD_CURSE_CARD_EFFECT),
+    CompassEvent("黑暗能量", "你立即失去3点HP", LOSE_HP_EFFECT),
+    CompassEvent("精神涣散", "跳过下一个出牌阶段", SKIP_TURN_EFFECT),
+    CompassEvent("魔力燃烧", "你失去2点MP", LOSE_MP_EFFECT),
+    CompassEvent("力量衰退", "你的攻击力降低2点", WEAKEN_ATTACK_EFFECT),
+    CompassEvent("心神不宁", "随机弃置一张手牌", DISCARD_CARD_EFFECT),
 ]
 
 LUCKY_EVENTS = [
-    CompassEvent("神圣祝福", "立即恢复15点HP", heal_bonus_event),
-    CompassEvent("魔力涌动", "获得3点额外MP", mp_bonus_event),
-    CompassEvent("战斗狂热", "下次攻击伤害翻倍", double_attack_event),
-    CompassEvent("完美防御", "立即获得10点护甲", armor_bonus_event),
-    CompassEvent("灵感迸发", "抽取2张额外卡牌", draw_bonus_event),
-    CompassEvent("力量觉醒", "攻击力永久增加1点", strengthen_event),
+    CompassEvent("神圣祝福", "立即恢复15点HP", HEAL_BONUS_EFFECT),
+    CompassEvent("魔力涌动", "获得3点额外MP", MP_BONUS_EFFECT),
+    CompassEvent("战斗狂热", "下次攻击伤害翻倍", DOUBLE_ATTACK_EFFECT),
+    CompassEvent("完美防御", "立即获得10点护甲", ARMOR_BONUS_EFFECT),
+    CompassEvent("灵感迸发", "抽取2张额外卡牌", DRAW_BONUS_EFFECT),
+    CompassEvent("力量觉醒", "攻击力永久增加1点", STRENGTHEN_EFFECT),
 ]
 
 
-def get_random_negative_event():
-    """获取随机负面事件"""
-    return random.choice(NEGATIVE_EVENTS)
+def get_random_negative_event(rng=None):
+    """获取随机负面事件（rng通常为战斗私有的随机数生成器）"""
+    return (rng or random).choice(NEGATIVE_EVENTS)
 
 
-def get_random_lucky_event():
-    """获取随机幸运事件"""
-    return random.choice(LUCKY_EVENTS)
+def get_random_lucky_event(rng=None):
+    """获取随机幸运事件（rng通常为战斗私有的随机数生成器）"""
+    return (rng or random).choice(LUCKY_EVENTS)
 
 
 def trigger_compass_event(event_type, battle_context):
@@ -161,18 +130,18 @@ def trigger_compass_event(event_type, battle_context):
     from core.compass_system import CompassPosition
     
     if event_type == CompassPosition.NORMAL:
-        battle_context.log("罗盘静静地转动...")
+        battle_context.log('compass_normal')
         
     elif event_type == CompassPosition.NEGATIVE:
-        event = get_random_negative_event()
+        event = get_random_negative_event(battle_context.rng)
         event.trigger(battle_context)
         
     elif event_type == CompassPosition.LUCKY:
-        event = get_random_lucky_event()
+        event = get_random_lucky_event(battle_context.rng)
         event.trigger(battle_context)
         
     else:
-        battle_context.log("罗盘发出了奇怪的声音...")
+        battle_context.log('compass_unknown')
 
 
 def get_event_statistics():
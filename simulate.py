@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回合制卡牌战斗游戏 - 无界面批量模拟入口
+Card Battle Game - Headless Simulation Entry Point
+"""
+
+import argparse
+import random
+import time
+
+from core.parallel_simulator import derive_seeds, run_parallel_simulation
+from core.replay import load_replays, save_replays, verify_replays
+from core.simulator import BattleSimulator, STRATEGIES
+
+
+def main():
+    """模拟主函数"""
+    parser = argparse.ArgumentParser(description="无界面批量运行卡牌战斗")
+    parser.add_argument('-n', '--battles', type=int, default=10000, help="模拟的战斗场数")
+    parser.add_argument('-s', '--strategy', choices=sorted(STRATEGIES), default='greedy',
+                        help="出牌策略")
+    parser.add_argument('--max-turns', type=int, default=200, help="单场战斗最大回合数")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="工作进程数（0表示使用全部CPU核心）")
+    parser.add_argument('--seed', type=int, default=None, help="主随机种子，指定后结果可复现")
+    parser.add_argument('--battle-seed', type=int, default=None,
+                        help="按统计中记录的战斗种子逐位复现单场战斗并输出日志")
+    parser.add_argument('--numpy', action='store_true', help="使用NumPy批量引擎（仅支持贪心策略）")
+    parser.add_argument('--journal', default=None,
+                        help="二进制战斗日志路径（多批次时每批写入 <路径>.<序号>）")
+    parser.add_argument('--record', default=None,
+                        help="单进程模拟并把每场战斗的回放（种子+操作流）写入该文件")
+    parser.add_argument('--replay', default=None, help="全速重放回放文件中的全部战斗并校验终局状态")
+    parser.add_argument('--view-replay', default=None, help="在游戏界面中逐步播放回放文件中的一场战斗")
+    parser.add_argument('--replay-index', type=int, default=0, help="--view-replay 播放的回放序号")
+    parser.add_argument('--check-equivalence', action='store_true',
+                        help="对比NumPy批量引擎与参考引擎的统计结果")
+    args = parser.parse_args()
+
+    if args.battle_seed is not None:
+        with STRATEGIES[args.strategy]() as strategy:
+            simulator = BattleSimulator(strategy, max_turns=args.max_turns, verbose=True)
+            print_report("单场战斗", simulator.run_battle(args.battle_seed))
+        return
+
+    if args.replay:
+        replays = load_replays(args.replay)
+        start_time = time.perf_counter()
+        failed = verify_replays(replays)
+        elapsed = time.perf_counter() - start_time
+        print_report("回放校验", {
+            'replays': len(replays),
+            'actions': sum(len(replay) for replay in replays),
+            'failed': len(failed),
+            'failed_indices': failed[:20],
+            'elapsed_seconds': elapsed,
+            'replays_per_second': len(replays) / elapsed if elapsed > 0 else 0
+        })
+        return
+
+    if args.view_replay:
+        from ui.replay_viewer import view_replay
+        view_replay(load_replays(args.view_replay)[args.replay_index])
+        return
+
+    if args.record:
+        # 战斗种子和策略的随机流由主种子分别派生，互不相关
+        battle_seed, strategy_seed = derive_seeds(args.seed, 2)
+        strategy = STRATEGIES[args.strategy]()
+        if strategy.uses_battle_rng():
+            # 录制时策略使用独立的随机流，回放只需重现战斗自身的随机流
+            strategy.rng = random.Random(strategy_seed)
+        simulator = BattleSimulator(strategy, max_turns=args.max_turns,
+                                    rng=random.Random(battle_seed), record=True)
+        report = simulator.run(args.battles)
+        save_replays(args.record, simulator.replays)
+        print_report("模拟结果", report)
+        return
+
+    if args.check_equivalence:
+        from core.batch_simulator import compare_with_reference
+        result = compare_with_reference(args.battles, max(1000, args.battles // 20),
+                                        seed=args.seed or 0, max_turns=args.max_turns)
+        print_report("NumPy批量引擎", result['batch'])
+        print_report("参考引擎", result['reference'])
+        print(f"胜率 z = {result['win_rate_z']:.3f}, 平均回合 z = {result['average_turns_z']:.3f}")
+        print("统计等价" if result['equivalent'] else "统计不等价！")
+        return
+
+    if args.numpy:
+        from core.batch_simulator import BatchBattleSimulator
+        report = BatchBattleSimulator(args.battles, seed=args.seed, max_turns=args.max_turns).run()
+    else:
+        report = run_parallel_simulation(
+            args.battles, args.strategy,
+            workers=args.workers or None,
+            master_seed=args.seed,
+            max_turns=args.max_turns,
+            journal_path=args.journal
+        )
+
+    print_report("模拟结果", report)
+
+
+def print_report(title, report):
+    """输出模拟报告"""
+    print(f"=== {title} ===")
+    for key, value in report.items():
+        if key == 'turn_distribution':
+            value = ", ".join(f"{turns}:{count}" for turns, count in value.items())
+        elif isinstance(value, float):
+            value = f"{value:.4f}"
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+测试配置 - 把项目根目录加入导入路径
+Test Configuration - Put the Project Root on the Import Path
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,211 @@
+"""
+批量引擎一致性测试 - NumPy批量引擎与参考引擎 BattleManager 的逐步比较和统计等价检验
+Batch Engine Consistency Tests - Step-by-Step Comparison and Statistical Equivalence with BattleManager
+
+两个引擎的随机流不同（NumPy 的向量随机流由全部战斗共用，参考引擎每场战斗有私有的
+random.Random），同一种子无法整场重现。逐步比较时让两个引擎从同一局面出发各走一步：
+参考引擎这一步没有消耗随机数（没有触发罗盘事件、没有重新洗牌）时，结果完全确定，
+批量引擎必须得到逐字段相同的局面；消耗了随机数的步骤只同步局面、不比较。
+"""
+
+import random
+
+import numpy as np
+
+from core.battle_manager import BattleManager
+from core.effects import ADD_CURSE
+from core.batch_simulator import (
+    BatchBattleSimulator, EMPTY, compare_with_reference,
+    CARD_OPCODES, CARD_AMOUNTS, NEGATIVE_EVENT_OPCODES, NEGATIVE_EVENT_AMOUNTS,
+    LUCKY_EVENT_OPCODES, LUCKY_EVENT_AMOUNTS
+)
+from core.simulator import ACTION_PLAY_CARD, GreedyStrategy
+from data.cards import CARD_LIBRARY
+from data.events import NEGATIVE_EVENTS, LUCKY_EVENTS
+
+
+def load_row(simulator, row, battle_manager):
+    """把参考引擎的局面写入批量模拟器的第 row 场战斗"""
+    player = battle_manager.player
+    context = battle_manager.battle_context
+    card_system = battle_manager.card_system
+
+    simulator.player_hp[row] = player.hp
+    simulator.player_mp[row] = player.mp
+    simulator.player_atk[row] = player.atk
+    simulator.player_armor[row] = player.armor
+    simulator.enemy_hp[row] = battle_manager.enemy.hp
+    simulator.compass_position[row] = battle_manager.compass.current_position
+    simulator.skip_next_turn[row] = context.skip_next_turn
+    simulator.double_next_attack[row] = context.double_next_attack
+    simulator.turn_count[row] = battle_manager.turn_count
+    simulator.battle_ended[row] = battle_manager.battle_ended
+    simulator.victory[row] = battle_manager.victory
+
+    for name, pile in (('deck', card_system.deck), ('hand', card_system.hand),
+                       ('played', card_system.played_cards)):
+        matrix = getattr(simulator, name)
+        assert len(pile) <= matrix.shape[1], f"{name} 超出批量模拟器的容量"
+        matrix[row] = EMPTY
+        matrix[row, :len(pile)] = list(pile)
+        getattr(simulator, name + '_size')[row] = len(pile)
+
+
+def row_state(simulator, row):
+    """批量模拟器第 row 场战斗的局面摘要"""
+    def pile(name):
+        return list(getattr(simulator, name)[row, :getattr(simulator, name + '_size')[row]])
+
+    return {
+        'player': [int(simulator.player_hp[row]), int(simulator.player_mp[row]),
+                   int(simulator.player_atk[row]), int(simulator.player_armor[row])],
+        'enemy_hp': int(simulator.enemy_hp[row]),
+        'compass': int(simulator.compass_position[row]),
+        'flags': [bool(simulator.skip_next_turn[row]), bool(simulator.double_next_attack[row])],
+        'turn': int(simulator.turn_count[row]),
+        'result': [bool(simulator.battle_ended[row]), bool(simulator.victory[row])],
+        'deck': pile('deck'),
+        'hand': pile('hand'),
+        'played': pile('played'),
+    }
+
+
+def reference_state(battle_manager):
+    """参考引擎的局面摘要（字段与 row_state 一致）"""
+    player = battle_manager.player
+    context = battle_manager.battle_context
+    card_system = battle_manager.card_system
+    return {
+        'player': [player.hp, player.mp, player.atk, player.armor],
+        'enemy_hp': battle_manager.enemy.hp,
+        'compass': battle_manager.compass.current_position,
+        'flags': [context.skip_next_turn, context.double_next_attack],
+        'turn': battle_manager.turn_count,
+        'result': [battle_manager.battle_ended, battle_manager.victory],
+        'deck': list(card_system.deck),
+        'hand': list(card_system.hand),
+        'played': list(card_system.played_cards),
+    }
+
+
+def reference_step(battle_manager, strategy):
+    """参考引擎按贪心策略走一步（与 BattleSimulator.run_battle 的一次循环一致）"""
+    action_type, action_data = strategy.choose_action(battle_manager)
+    if action_type == ACTION_PLAY_CARD:
+        success, _ = battle_manager.play_card(action_data)
+        if success:
+            return
+    battle_manager.start_settlement_phase()
+
+
+def start_battles(battle_count, seed):
+    """按种子开始 battle_count 场参考引擎的战斗"""
+    seeds = random.Random(seed)
+    battles = []
+    for _ in range(battle_count):
+        battle_manager = BattleManager(log_sink=None, seed=seeds.getrandbits(64))
+        battle_manager.start_battle()
+        battles.append(battle_manager)
+    return battles
+
+
+def collect_positions(battle_count, seed):
+    """按贪心策略运行参考引擎的战斗，收集途中每个出牌阶段的局面副本"""
+    strategy = GreedyStrategy()
+    positions = []
+    for battle_manager in start_battles(battle_count, seed):
+        while not battle_manager.battle_ended:
+            positions.append(battle_manager.clone())
+            reference_step(battle_manager, strategy)
+    return positions
+
+
+def program_cases():
+    """全部 (用例名, 参考引擎的执行函数, 批量引擎的执行函数, 操作码)：每张卡牌的效果和每个事件的触发"""
+    def play(opcodes, amounts):
+        def execute(simulator, rows):
+            simulator._execute_programs(rows, np.tile(opcodes, (rows.size, 1)),
+                                        np.tile(amounts, (rows.size, 1)))
+        return execute
+
+    def trigger(opcodes, amounts):
+        # 只有一个事件的事件表：经过 _trigger_events 且一定抽中该事件
+        def execute(simulator, rows):
+            simulator._trigger_events(rows, opcodes[None, :], amounts[None, :])
+        return execute
+
+    cases = [(f"card/{card.id}", card.execute_effect,
+              play(CARD_OPCODES[number], CARD_AMOUNTS[number]), CARD_OPCODES[number])
+             for number, card in enumerate(CARD_LIBRARY)]
+    for kind, events, opcodes, amounts in (('negative', NEGATIVE_EVENTS, NEGATIVE_EVENT_OPCODES,
+                                            NEGATIVE_EVENT_AMOUNTS),
+                                           ('lucky', LUCKY_EVENTS, LUCKY_EVENT_OPCODES,
+                                            LUCKY_EVENT_AMOUNTS)):
+        cases.extend((f"{kind}/{index}", event.trigger,
+                      trigger(opcodes[index], amounts[index]), opcodes[index])
+                     for index, event in enumerate(events))
+    return cases
+
+
+# ============ 测试 ============
+
+def test_deterministic_steps_match_reference():
+    """从同一局面出发，不消耗随机数的每一步两个引擎的结果逐字段相同"""
+    battle_count = 300
+    battles = start_battles(battle_count, 2024)
+    strategy = GreedyStrategy()
+    simulator = BatchBattleSimulator(battle_count, seed=0, max_turns=10 ** 6, pile_capacity=128)
+    compared = {'play': 0, 'settle': 0}
+    while True:
+        rows = [row for row, battle_manager in enumerate(battles) if not battle_manager.battle_ended]
+        if not rows:
+            break
+        for row, battle_manager in enumerate(battles):
+            load_row(simulator, row, battle_manager)
+        plays = simulator._choose_actions(np.array(rows)) >= 0
+        simulator.step()
+
+        for row, play in zip(rows, plays):
+            battle_manager = battles[row]
+            rng_state = battle_manager.rng.getstate()
+            reference_step(battle_manager, strategy)
+            if battle_manager.rng.getstate() != rng_state:
+                continue
+            assert row_state(simulator, row) == reference_state(battle_manager), \
+                f"第 {row} 场战斗（种子 {battle_manager.seed}）在第 {battle_manager.turn_count} 回合不一致"
+            compared['play' if play else 'settle'] += 1
+
+    # 确认比较覆盖了足够多的出牌和结算步骤
+    assert compared['play'] > 1000 and compared['settle'] > 1000, compared
+
+
+def test_programs_match_reference():
+    """每张卡牌和每个事件的程序在批量引擎中的执行结果与参考引擎相同（不消耗随机数时）
+
+    逐步比较跳过了触发罗盘事件的步骤，这里在大量实战局面上单独比较每个事件的程序。
+    """
+    positions = collect_positions(40, 7)
+    rows = np.arange(len(positions))
+    for name, run, execute, opcodes in program_cases():
+        simulator = BatchBattleSimulator(len(positions), seed=0, pile_capacity=128)
+        for row, position in enumerate(positions):
+            load_row(simulator, row, position)
+        execute(simulator, rows)
+
+        compared = 0
+        for row, position in enumerate(positions):
+            state = position.clone()
+            run(state.battle_context)
+            if state.rng.getstate() != position.rng.getstate():
+                continue
+            assert row_state(simulator, row) == reference_state(state), f"{name} 在第 {row} 个局面不一致"
+            compared += 1
+
+        # 每个程序都应在部分局面上得到比较（加入诅咒牌的程序总会消耗随机数，除外）
+        assert compared > 0 or ADD_CURSE in opcodes, name
+
+
+def test_statistically_equivalent_to_reference():
+    """固定种子下胜率和平均回合数在 z < 3 的阈值内与参考引擎一致"""
+    result = compare_with_reference(200000, 20000, seed=0, z_threshold=3.0)
+    assert result['equivalent'], (result['win_rate_z'], result['average_turns_z'])
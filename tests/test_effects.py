@@ -0,0 +1,151 @@
+"""
+效果回归测试 - 全部卡牌和罗盘事件的执行结果与改为操作码程序之前完全一致
+Effect Regression Tests - Every Card and Compass Event Matches the Pre-Opcode Golden Results
+
+tests/golden/effects.json 是在改为操作码程序之前的版本（6e60195，效果为手写函数）上
+运行本文件生成的：对每个局面和每张卡牌/每个事件，记录执行后的玩家、敌人、上下文标记、
+三个牌堆、新增的日志记录和随机流的下一个值（检查随机数消耗）。
+
+重新生成（只应在旧版本上运行）:
+    python tests/test_effects.py --write tests/golden/effects.json
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.battle_manager import BattleManager
+from data.cards import CARD_LIBRARY
+from data.events import NEGATIVE_EVENTS, LUCKY_EVENTS
+
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden', 'effects.json')
+
+# 局面: (名称, 种子, 修改局面的属性)
+SCENARIOS = (
+    ('opening', 1, {}),
+    ('opening_seed7', 7, {}),
+    ('wounded', 2, {'hp': 9, 'mp': 0, 'atk': 9, 'armor': 4}),
+    ('full_hp_min_atk', 3, {'atk': 1, 'mp': 10}),
+    ('zero_atk', 4, {'atk': 0, 'armor': 20}),
+    ('enemy_low', 5, {'enemy_hp': 7}),
+    ('empty_hand', 6, {'hand': ()}),
+    ('empty_deck', 8, {'deck': ()}),
+)
+
+
+def make_battle(seed, changes):
+    """构造局面：开始战斗后按 changes 修改属性"""
+    battle_manager = BattleManager(log_sink=None, seed=seed)
+    battle_manager.start_battle()
+    player = battle_manager.player
+    for field in ('hp', 'mp', 'atk', 'armor'):
+        if field in changes:
+            setattr(player, field, changes[field])
+    player.compute_zobrist()
+    if 'enemy_hp' in changes:
+        battle_manager.enemy.hp = changes['enemy_hp']
+        battle_manager.enemy.compute_zobrist()
+    card_system = battle_manager.card_system
+    if 'hand' in changes:
+        card_system.played_cards.extend(card_system.hand)
+        card_system.hand = bytearray(changes['hand'])
+    if 'deck' in changes:
+        card_system.played_cards.extend(card_system.deck)
+        card_system.deck = bytearray(changes['deck'])
+    card_system.compute_zobrist()
+    return battle_manager
+
+
+def capture(battle_manager, run):
+    """在局面的副本上执行 run(battle_context)，返回执行结果的摘要"""
+    state = battle_manager.clone()
+    log_records = state.battle_context.battle_log.records
+    log_start = len(log_records)
+    run(state.battle_context)
+
+    player = state.player
+    context = state.battle_context
+    card_system = state.card_system
+    return {
+        'player': [player.max_hp, player.hp, player.max_mp, player.mp,
+                   player.base_atk, player.atk, player.armor],
+        'enemy_hp': state.enemy.hp,
+        'flags': [context.skip_next_turn, context.double_next_attack],
+        'hand': list(card_system.hand),
+        'deck_order': list(card_system.get_deck_order()),
+        'played': list(card_system.played_cards),
+        'logs': [[code, list(args)] for code, args in list(log_records)[log_start:]],
+        'next_random': state.rng.getrandbits(32),
+    }
+
+
+def effect_cases():
+    """全部 (用例名, 执行函数)：每个局面 x（每张卡牌的效果 + 每个事件的触发）"""
+    cases = []
+    for scenario, seed, changes in SCENARIOS:
+        for card in CARD_LIBRARY:
+            cases.append((f"{scenario}/card/{card.id}", seed, changes, card.execute_effect))
+        for kind, events in (('negative', NEGATIVE_EVENTS), ('lucky', LUCKY_EVENTS)):
+            for index, event in enumerate(events):
+                cases.append((f"{scenario}/{kind}/{index}", seed, changes, event.trigger))
+    return cases
+
+
+def generate():
+    """生成全部用例的摘要 {用例名: 摘要}"""
+    return {name: capture(make_battle(seed, changes), run)
+            for name, seed, changes, run in effect_cases()}
+
+
+def load_golden():
+    """读取基准结果"""
+    with open(GOLDEN_PATH, encoding='utf-8') as golden_file:
+        return json.load(golden_file)
+
+
+# ============ 测试 ============
+
+CASES = effect_cases()
+
+
+def test_golden_covers_every_card_and_event():
+    """基准结果覆盖当前的全部卡牌和事件"""
+    assert set(load_golden()) == {name for name, _, _, _ in CASES}
+
+
+@pytest.mark.parametrize('name, seed, changes, run', CASES, ids=[case[0] for case in CASES])
+def test_compiled_program_matches_golden(name, seed, changes, run):
+    """编译后的效果函数（卡牌和事件实际使用的路径）与基准结果一致"""
+    assert capture(make_battle(seed, changes), run) == load_golden()[name]
+
+
+@pytest.mark.parametrize('name, seed, changes, run', CASES, ids=[case[0] for case in CASES])
+def test_interpreted_program_matches_golden(name, seed, changes, run):
+    """解释器逐条执行程序的结果与基准结果一致"""
+    from core.effects import run_program
+
+    owner = run.__self__
+    program = owner.program
+    assert program is not None, f"{name} 没有操作码程序"
+    if name.split('/')[1] == 'card':
+        result = capture(make_battle(seed, changes), lambda context: run_program(program, context))
+    else:
+        def trigger(context):
+            context.log('compass_event', owner.name)
+            context.log('compass_event_effect', owner.description)
+            run_program(program, context)
+        result = capture(make_battle(seed, changes), trigger)
+    assert result == load_golden()[name]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != '--write':
+        sys.exit("用法: python tests/test_effects.py --write <输出路径>")
+    with open(sys.argv[2], 'w', encoding='utf-8') as output:
+        json.dump(generate(), output, ensure_ascii=False, indent=1, sort_keys=True)
+        output.write('\n')
@@ -0,0 +1,71 @@
+"""
+期望最大化求解器测试 - 临近终局局面的精确胜率
+Expectimax Solver Tests - Exact Win Probabilities of Near-Terminal Positions
+"""
+
+from fractions import Fraction
+
+import pytest
+
+from core.battle_manager import BattleManager
+from core.compass_system import COMPASS_LAYOUT, CompassPosition
+from core.expectimax import ExpectimaxSolver
+from core.mcts import SETTLEMENT_ACTION, evaluate_battle
+from core.simulator import ACTION_PLAY_CARD
+from data.cards import CARD_REGISTRY
+from data.events import NEGATIVE_EVENTS
+
+
+def make_position(hand, player_hp, enemy_hp, compass_position, atk=1):
+    """构造一个出牌阶段的局面（直接设置属性后重新计算增量哈希）"""
+    battle_manager = BattleManager(log_sink=None, seed=1)
+    battle_manager.start_battle()
+    player = battle_manager.player
+    player.hp = player_hp
+    player.atk = atk
+    player.armor = 0
+    player.compute_zobrist()
+    battle_manager.enemy.hp = enemy_hp
+    battle_manager.enemy.compute_zobrist()
+    battle_manager.compass.current_position = compass_position
+    battle_manager.compass.compute_zobrist()
+    card_system = battle_manager.card_system
+    card_system.hand = bytearray(CARD_REGISTRY.number_of(card_id) for card_id in hand)
+    card_system.compute_zobrist()
+    return battle_manager
+
+
+def test_attack_that_kills_is_certain_win():
+    """出击即可击败敌人：胜率为1，其余行动不会更好"""
+    battle_manager = make_position(['strike'], player_hp=5, enemy_hp=1, compass_position=0, atk=2)
+    solver = ExpectimaxSolver()
+    assert solver.solve(battle_manager) == 1.0
+    assert solver.analyze(battle_manager)[SETTLEMENT_ACTION] == 1.0
+
+
+def test_negative_event_win_probability_is_exact():
+    """Strike 推进到负面事件位置：只有“力量衰退”（攻击力-2）会让这次攻击不足以击败敌人
+
+    攻击力1 + Strike 6 = 7，造成6点伤害，敌人HP为6；攻击力降低2点后只造成4点伤害，
+    敌人反击（12点）击败HP为5的玩家。其余负面事件（包括失去3点HP）都不影响结果，
+    精确胜率为 5/6；不出牌直接出击的胜率为0。
+    """
+    position = COMPASS_LAYOUT.index(CompassPosition.NEGATIVE) - 1
+    assert COMPASS_LAYOUT[position + CARD_REGISTRY.get('strike').compass_points] == CompassPosition.NEGATIVE
+    battle_manager = make_position(['strike'], player_hp=5, enemy_hp=6, compass_position=position)
+
+    solver = ExpectimaxSolver()
+    analysis = solver.analyze(battle_manager)
+    expected = float(Fraction(len(NEGATIVE_EVENTS) - 1, len(NEGATIVE_EVENTS)))
+    assert analysis[(ACTION_PLAY_CARD, 0)] == pytest.approx(expected)
+    assert analysis[SETTLEMENT_ACTION] == 0.0
+    assert solver.solve(battle_manager) == pytest.approx(expected)
+    assert solver.score_action(battle_manager, SETTLEMENT_ACTION) == (0.0, pytest.approx(expected))
+
+
+def test_evaluate_scores_leaves_with_heuristic():
+    """传入 evaluate 时叶子按评估函数打分，胜利的叶子不再是1"""
+    battle_manager = make_position(['strike'], player_hp=5, enemy_hp=1, compass_position=0, atk=2)
+    solver = ExpectimaxSolver(evaluate=evaluate_battle)
+    value = solver.solve(battle_manager)
+    assert 0.5 < value < 1.0
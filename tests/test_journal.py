@@ -0,0 +1,33 @@
+"""
+战斗日志归档测试 - 参数的编码和读取
+Battle Journal Tests - Argument Encoding and Reading
+"""
+
+from core.journal import BattleJournal, read_journal
+
+
+def write_records(path, records):
+    """写入 (事件代码, 参数元组) 列表后读回全部 (事件代码, 参数元组)"""
+    with BattleJournal(str(path)) as journal:
+        for code, args in records:
+            journal.write(code, *args)
+    return [(code, args) for _, code, args in read_journal(str(path))]
+
+
+def test_arguments_round_trip(tmp_path):
+    """各类型参数（含超出int64的战斗种子）读回后不变"""
+    records = [
+        ('battle_seed', ((1 << 64) - 1,)),
+        ('enemy_appears', ("森林哥布林", 80, -12)),
+        ('game_event', (None, 1.5, "")),
+    ]
+    assert write_records(tmp_path / 'battle.cbj', records) == records
+
+
+def test_long_string_truncated_on_character_boundary(tmp_path):
+    """超长字符串截断到65535字节以内时不切开多字节字符，文件仍可读取"""
+    text = 'ab' + '战' * 30000
+    (code, (value,)), = write_records(tmp_path / 'battle.cbj', [('text', (text,))])
+    assert code == 'text'
+    assert text.startswith(value)
+    assert len(value.encode('utf-8')) == 0xFFFF - 1
@@ -0,0 +1,44 @@
+"""
+蒙特卡洛树搜索测试 - 机会节点子节点的区分
+MCTS Tests - Keeping Chance Node Children Apart
+"""
+
+import random
+
+from core.battle_manager import BattleManager
+from core.mcts import ChanceNode, MCTSSearch, get_legal_actions, outcome_key
+
+
+def test_hand_order_keeps_decision_nodes_apart():
+    """手牌顺序不同、局面哈希相同的两个局面对应不同的决策节点"""
+    battle_manager = BattleManager(log_sink=None, seed=3)
+    battle_manager.start_battle()
+    reversed_hand = battle_manager.clone()
+    reversed_hand.card_system.hand.reverse()
+
+    # 前提：哈希相同，但合法行动（手牌下标）不同
+    assert battle_manager.get_state_hash() == reversed_hand.get_state_hash()
+    assert get_legal_actions(battle_manager) != get_legal_actions(reversed_hand)
+    assert outcome_key(battle_manager) != outcome_key(reversed_hand)
+
+    edge = ChanceNode()
+    first, first_expanded = MCTSSearch._child(edge, battle_manager)
+    second, second_expanded = MCTSSearch._child(edge, reversed_hand)
+    assert first_expanded and second_expanded
+    assert first is not second
+    assert first.untried == get_legal_actions(battle_manager)
+    assert second.untried == get_legal_actions(reversed_hand)
+
+    # 相同局面仍然共用节点
+    again, again_expanded = MCTSSearch._child(edge, battle_manager.clone())
+    assert again is first and not again_expanded
+
+
+def test_search_only_returns_legal_actions():
+    """搜索结果中的行动都是根局面的合法行动"""
+    battle_manager = BattleManager(log_sink=None, seed=3)
+    battle_manager.start_battle()
+    search = MCTSSearch(rng=random.Random(1))
+    results = search.search(battle_manager, max_iterations=200)
+    assert set(results) <= set(get_legal_actions(battle_manager))
+    assert sum(visits for visits, _ in results.values()) == 200
@@ -0,0 +1,41 @@
+"""
+多进程模拟测试 - 同一主种子的结果与工作进程数无关
+Multiprocess Simulation Tests - Results for One Master Seed Do Not Depend on the Worker Count
+"""
+
+import pytest
+
+from core.parallel_simulator import battle_seed, run_parallel_simulation
+
+
+def comparable(report):
+    """去掉与运行环境有关的字段（用时、速度、进程数），HP均值按近似比较"""
+    report = {key: value for key, value in report.items()
+              if key not in ('elapsed_seconds', 'battles_per_second', 'workers')}
+    for key in ('player_hp_percentage', 'enemy_hp_percentage'):
+        report[key] = dict(report[key], mean=pytest.approx(report[key]['mean'], rel=1e-12))
+    return report
+
+
+def test_battle_seed_depends_only_on_master_seed_and_index():
+    """战斗种子是64位无符号整数，不同场次和不同主种子得到不同的种子"""
+    seeds = {battle_seed(master_seed, index) for master_seed in (0, 1, 42) for index in range(100)}
+    assert len(seeds) == 300
+    assert all(0 <= seed < (1 << 64) for seed in seeds)
+    assert battle_seed(42, 7) == battle_seed(42, 7)
+
+
+@pytest.mark.parametrize('strategy_name', ['greedy', 'random'])
+def test_worker_count_does_not_change_results(strategy_name):
+    """-w 1 与 -w 3 在同一 --seed 下合并得到相同的统计结果"""
+    single = run_parallel_simulation(150, strategy_name, workers=1, master_seed=42)
+    multiple = run_parallel_simulation(150, strategy_name, workers=3, master_seed=42)
+    assert multiple['workers'] == 3
+    assert comparable(multiple) == comparable(single)
+
+
+def test_different_master_seeds_give_different_results():
+    """不同主种子的战斗不同"""
+    first = run_parallel_simulation(150, 'random', workers=1, master_seed=1)
+    second = run_parallel_simulation(150, 'random', workers=1, master_seed=2)
+    assert first['turn_distribution'] != second['turn_distribution']
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字形图集生成工具 - 收集界面可能显示的全部字符，按界面字号预先光栅化为图集文件
+Glyph Atlas Builder - Collect Every Character the UI Can Show and Pre-Rasterize It at the UI Font Sizes
+"""
+
+import argparse
+import ast
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+from config.settings import GLYPH_ATLAS_PATH
+from ui.game_ui import FONT_SIZE_LARGE, FONT_SIZE_MEDIUM, FONT_SIZE_SMALL, resolve_font_path
+from ui.glyph_atlas import (
+    ATLAS_MAGIC, ATLAS_VERSION, ATLAS_HEADER, ATLAS_FACE, ATLAS_GLYPH, load_glyph_atlas
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 界面文字的来源：卡牌、事件、战斗日志模板和战斗管理器的消息、界面本身和格式化函数
+SOURCE_FILES = (
+    'data/cards.py',
+    'data/events.py',
+    'core/battle_log.py',
+    'core/battle_manager.py',
+    'core/compass_system.py',
+    'core/entities.py',
+    'ui/game_ui.py',
+    'utils/helpers.py',
+)
+
+ATLAS_SIZES = (FONT_SIZE_LARGE, FONT_SIZE_MEDIUM, FONT_SIZE_SMALL)
+
+# 运行时格式化的数字、英文名称等总是需要的字符
+ASCII_CHARSET = ''.join(chr(code) for code in range(0x20, 0x7F))
+
+
+# ============ 收集字符 ============
+
+def collect_charset(source_files=SOURCE_FILES):
+    """收集源文件中全部字符串常量（包括 f-string 的常量部分）用到的字符，按码位排序"""
+    chars = set(ASCII_CHARSET)
+    for relative_path in source_files:
+        with open(os.path.join(ROOT, relative_path), encoding='utf-8') as source_file:
+            tree = ast.parse(source_file.read(), relative_path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                chars.update(char for char in node.value if char.isprintable())
+    return ''.join(sorted(chars))
+
+
+def charset_digest(charset):
+    """字符集摘要（写入图集头部，用于判断图集是否需要重新生成）"""
+    return hashlib.blake2b(charset.encode('utf-8'), digest_size=8).digest()
+
+
+def font_digest(font_path):
+    """字体文件内容的摘要（写入图集头部，换用或更新字体后需要重新生成）"""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(font_path, 'rb') as font_file:
+        for chunk in iter(lambda: font_file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+# ============ 光栅化 ============
+
+def rasterize_face(font, charset):
+    """把字符集光栅化为一条字形条带，返回 (行高, 基线, 字形表, 条带字节, 条带宽度)"""
+    height = font.get_height()
+    glyph_surfaces = []
+    strip_width = 0
+    for char in charset:
+        surface = font.render(char, True, (255, 255, 255))
+        # 拼接时按步进宽度排列（与 font.size 一致），超出步进的倾斜部分不使用
+        metrics = font.metrics(char)[0]
+        advance = metrics[4] if metrics else surface.get_width()
+        glyph_surfaces.append((ord(char), strip_width, min(advance, surface.get_width()), surface))
+        strip_width += surface.get_width()
+
+    strip = pygame.Surface((max(strip_width, 1), height), pygame.SRCALPHA)
+    strip.fill((255, 255, 255, 0))
+    glyphs = []
+    for codepoint, x, advance, surface in glyph_surfaces:
+        strip.blit(surface, (x, 0))
+        glyphs.append((codepoint, x, advance))
+
+    # 按行取出 alpha 通道
+    alpha = pygame.surfarray.array_alpha(strip).T[:, :strip_width]
+    return height, font.get_ascent(), glyphs, alpha.tobytes(), strip_width
+
+
+def build_atlas(font_path, output_path, charset):
+    """生成图集文件，返回文件大小"""
+    pygame.font.init()
+    faces = []
+    for size in ATLAS_SIZES:
+        font = pygame.font.Font(font_path, size)
+        faces.append((size,) + rasterize_face(font, charset))
+
+    # 依次排列：头部、字号表、各字号的字形表和条带
+    offset = ATLAS_HEADER.size + ATLAS_FACE.size * len(faces)
+    face_records = []
+    blocks = []
+    for size, height, ascent, glyphs, strip_bytes, strip_width in faces:
+        glyph_table = b''.join(ATLAS_GLYPH.pack(*glyph) for glyph in glyphs)
+        glyph_offset = offset
+        strip_offset = glyph_offset + len(glyph_table)
+        offset = strip_offset + len(strip_bytes)
+        face_records.append(ATLAS_FACE.pack(size, height, ascent, len(glyphs), strip_width,
+                                            glyph_offset, strip_offset))
+        blocks.extend((glyph_table, strip_bytes))
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, 'wb') as atlas_file:
+        atlas_file.write(ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, len(faces),
+                                           charset_digest(charset), font_digest(font_path)))
+        atlas_file.write(b''.join(face_records))
+        for block in blocks:
+            atlas_file.write(block)
+    return offset
+
+
+def check_atlas(path, charset, font_path=None):
+    """检查图集是否与当前的字符集、字号和字体一致，返回问题列表（为空表示无需重新生成）
+
+    Args:
+        path: 图集文件路径
+        charset: 当前源文件用到的字符集
+        font_path: 当前使用的字体文件，为None时不检查字体
+    """
+    atlas = load_glyph_atlas(path)
+    if atlas is None:
+        return [f"图集不存在或格式无效: {path}"]
+
+    problems = []
+    if atlas.charset_digest != charset_digest(charset):
+        problems.append("字符集摘要不一致（源文件中的文字已改变）")
+    if sorted(atlas.faces) != sorted(ATLAS_SIZES):
+        problems.append(f"字号不一致: 图集 {sorted(atlas.faces)}，界面 {sorted(ATLAS_SIZES)}")
+    if font_path is not None and atlas.font_digest != font_digest(font_path):
+        problems.append(f"字体摘要不一致（图集不是用 {font_path} 生成的）")
+
+    missing = set()
+    for size in ATLAS_SIZES:
+        face = atlas.get_face(size)
+        missing.update(char for char in charset if face is None or ord(char) not in face.glyphs)
+    if missing:
+        problems.append(f"缺少 {len(missing)} 个字符: {''.join(sorted(missing))[:40]}")
+    return problems
+
+
+def main():
+    """工具主函数"""
+    parser = argparse.ArgumentParser(description="生成界面使用的中文字形图集")
+    parser.add_argument('--font', help="用于光栅化的中文字体文件，默认查找系统中文字体")
+    parser.add_argument('-o', '--output', default=GLYPH_ATLAS_PATH, help="图集文件路径")
+    parser.add_argument('--check', action='store_true',
+                        help="只检查现有图集的字符集、字号和字体是否与当前一致（不一致时以非零状态退出）")
+    args = parser.parse_args()
+
+    charset = collect_charset()
+    font_path = args.font or resolve_font_path()
+    if args.check:
+        problems = check_atlas(args.output, charset, font_path)
+        if problems:
+            print("图集需要重新生成:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        if font_path is None:
+            print("未找到中文字体，跳过字体检查")
+        print(f"图集是最新的（{len(charset)} 个字符）")
+        return
+
+    if font_path is None:
+        print("未找到中文字体，请用 --font 指定字体文件")
+        sys.exit(1)
+
+    start_time = time.perf_counter()
+    atlas_size = build_atlas(font_path, args.output, charset)
+    elapsed = time.perf_counter() - start_time
+    print(f"字体: {font_path}")
+    print(f"字符: {len(charset)} 个，字号: {', '.join(str(size) for size in ATLAS_SIZES)}")
+    print(f"图集: {args.output}（{atlas_size / 1024:.1f} KB，用时 {elapsed:.2f} 秒）")
+
+
+if __name__ == "__main__":
+    main()
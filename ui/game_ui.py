@@ -5,12 +5,77 @@ Game UI Management - Complete UI Rendering and Interaction Handling
 
 import pygame
 import os
+import sys
+from config.settings import GLYPH_ATLAS_PATH
+from core.compass_system import EVENT_SYMBOLS
+from data import cards as card_data
+from ui.text_cache import TextSurfaceCache
 from utils.helpers import (
     format_hp_display, format_mp_display, get_health_color, 
     get_mp_color, get_compass_symbol_color, get_turn_phase_name
 )
 
 
+# 界面使用的三种字号（字形图集按这三种字号生成）
+FONT_SIZE_LARGE = 36
+FONT_SIZE_MEDIUM = 28
+FONT_SIZE_SMALL = 22
+
+# 各平台的系统中文字体（只检查当前平台的路径）
+CHINESE_FONT_CANDIDATES = {
+    'win32': (
+        "C:/Windows/Fonts/msyh.ttc",      # 微软雅黑
+        "C:/Windows/Fonts/simhei.ttf",    # 黑体
+        "C:/Windows/Fonts/simsun.ttc",    # 宋体
+    ),
+    'darwin': (
+        "/System/Library/Fonts/PingFang.ttc",
+        "/System/Library/Fonts/STHeiti Medium.ttc",
+    ),
+    'linux': (
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+        "/usr/share/fonts/wenquanyi/wqy-microhei/wqy-microhei.ttc",
+    ),
+}
+
+_font_path_resolved = False
+_font_path = None
+
+
+def resolve_font_path():
+    """查找系统中文字体路径（每个进程只查找一次），找不到时返回None（使用默认字体）"""
+    global _font_path_resolved, _font_path
+    if not _font_path_resolved:
+        platform = 'linux' if sys.platform.startswith('linux') else sys.platform
+        for font_path in CHINESE_FONT_CANDIDATES.get(platform, ()):
+            if os.path.exists(font_path):
+                _font_path = font_path
+                print(f"使用中文字体: {font_path}")
+                break
+        else:
+            print("未找到中文字体，使用默认字体（可能无法正确显示中文）")
+        _font_path_resolved = True
+    return _font_path
+
+
+def load_system_font(size):
+    """加载指定字号的系统中文字体，找不到时使用pygame默认字体"""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    try:
+        return pygame.font.Font(resolve_font_path(), size)
+    except (OSError, pygame.error):
+        return pygame.font.Font(None, size)
+
+
+def init_display():
+    """只初始化界面用到的SDL模块（显示；字体在第一次使用时初始化），
+    不初始化音频、手柄等 pygame.init() 会全部打开的子系统"""
+    pygame.display.init()
+
+
 class GameUI:
     """游戏界面管理类"""
     
@@ -19,6 +84,9 @@ class GameUI:
         self.screen = screen
         self.battle_manager = battle_manager
         
+        # 文字表面缓存 - 大部分文字很少变化，避免每帧重新光栅化
+        self.text_cache = TextSurfaceCache()
+        
         # 字体设置 - 使用支持中文的字体
         self._init_fonts()
         
@@ -48,71 +116,254 @@ class GameUI:
             'status_area': (820, 490, 204, 278)
         }
         
+        # 区域渲染方法 - 每个布局区域只在自身对应的状态变化时重绘
+        self.region_renderers = {
+            'turn_area': self.render_turn_counter,
+            'battle_area': self.render_battle_area,
+            'hand_area': self.render_hand_area,
+            'button_area': self.render_button_area,
+            'log_area': self.render_log_area,
+            'status_area': self.render_status_area
+        }
+        
+        # 脏矩形状态 - 记录上次绘制各区域时使用的状态键
+        self.region_keys = {}
+        self.result_key = None
+        self.full_redraw = True
+        
+        # 预合成的静态图层 - 只在布局或字体变化时重建
+        self.static_layer_key = None
+        self.background_layer = None
+        self.tips_layer = None
+        self.result_overlay = None
+        self.result_panels = {}
+        
+        # 卡牌牌面缓存 - (卡牌ID, 是否可用) -> 表面，依赖卡牌注册表和字体
+        self.card_faces = {}
+        self.card_registry = None
+        
+        # 操作提示（整块预先渲染，只随特殊状态数量上下移动）
+        self.tips = [
+            "操作提示:",
+            "- 点击卡牌使用",
+            "- 点击结束回合",
+            "- ESC键退出"
+        ]
+        
         # 交互元素
         self.card_rects = []
         self.button_rects = {}
         
     def _init_fonts(self):
-        """初始化字体，优先使用系统中文字体"""
-        # 尝试使用Windows系统字体
-        chinese_fonts = [
-            "C:/Windows/Fonts/msyh.ttc",      # 微软雅黑
-            "C:/Windows/Fonts/simhei.ttf",   # 黑体
-            "C:/Windows/Fonts/simsun.ttc",   # 宋体
-        ]
+        """重置字体：字体在第一次使用时才加载（创建界面时不读取字体文件）"""
+        self._fonts = {}
+        
+        # 字体变化后旧的文字表面全部失效，整个界面需要重绘
+        self.text_cache.clear()
+        self.invalidate()
+        
+    def get_font(self, size):
+        """获取指定字号的字体（第一次使用时加载）
+        
+        有字形图集时使用图集字体（不读取系统字体文件），图集中没有的文字才回退到系统字体。
+        """
+        font = self._fonts.get(size)
+        if font is None:
+            face = None
+            if os.path.exists(GLYPH_ATLAS_PATH):
+                # 图集模块依赖numpy，没有图集时不导入
+                from ui.glyph_atlas import load_glyph_atlas
+                atlas = load_glyph_atlas(GLYPH_ATLAS_PATH)
+                face = atlas.get_face(size) if atlas is not None else None
+            if face is not None:
+                from ui.glyph_atlas import AtlasFont
+                font = AtlasFont(face, lambda: load_system_font(size))
+            else:
+                font = load_system_font(size)
+            self._fonts[size] = font
+        return font
+        
+    @property
+    def font_large(self):
+        """大号字体"""
+        return self.get_font(FONT_SIZE_LARGE)
+        
+    @property
+    def font_medium(self):
+        """中号字体"""
+        return self.get_font(FONT_SIZE_MEDIUM)
+        
+    @property
+    def font_small(self):
+        """小号字体"""
+        return self.get_font(FONT_SIZE_SMALL)
+        
+    def render_text(self, font, text, color):
+        """渲染文字（经过LRU缓存）"""
+        return self.text_cache.render(font, text, color)
+        
+    def invalidate(self, region=None):
+        """标记区域需要重绘
+        
+        Args:
+            region: 布局区域名，为None时整个界面下一帧全部重绘
+        """
+        if region is None:
+            self.full_redraw = True
+        else:
+            self.region_keys.pop(region, None)
+            
+    def _build_static_layers(self):
+        """预先合成战斗中不会变化的界面元素
         
-        # 增大字体尺寸
-        font_found = False
-        for font_path in chinese_fonts:
-            if os.path.exists(font_path):
-                try:
-                    self.font_large = pygame.font.Font(font_path, 36)    # 从32增加到36
-                    self.font_medium = pygame.font.Font(font_path, 28)   # 从24增加到28
-                    self.font_small = pygame.font.Font(font_path, 22)    # 从18增加到22
-                    font_found = True
-                    print(f"使用中文字体: {font_path}")
-                    break
-                except:
-                    continue
-        
-        # 如果没找到中文字体，使用默认字体但增大尺寸
-        if not font_found:
-            print("未找到中文字体，使用默认字体（可能无法正确显示中文）")
-            self.font_large = pygame.font.Font(None, 36)
-            self.font_medium = pygame.font.Font(None, 28)
-            self.font_small = pygame.font.Font(None, 22)
+        背景图层包含区域背景、边框、固定标题和罗盘图例；操作提示、结果遮罩和
+        结果面板各自是独立的表面，每帧只需一次 blit。
+        """
+        screen_size = self.screen.get_size()
+        
+        # 背景图层
+        layer = pygame.Surface(screen_size, 0, self.screen)
+        layer.fill(self.colors['background'])
+        
+        x, y, w, h = self.layout['turn_area']
+        pygame.draw.rect(layer, self.colors['dark_gray'], (x, y, w, h))
+        
+        for name in ('hand_area', 'log_area', 'status_area'):
+            pygame.draw.rect(layer, self.colors['dark_gray'], self.layout[name], 2)
+        
+        x, y, w, h = self.layout['log_area']
+        layer.blit(self.render_text(self.font_medium, "战斗日志:", self.colors['white']), (x + 10, y + 10))
+        
+        x, y, w, h = self.layout['status_area']
+        layer.blit(self.render_text(self.font_medium, "状态信息", self.colors['white']), (x + 10, y + 10))
+        
+        # 罗盘说明
+        x, y, w, h = self.layout['battle_area']
+        legend_text = "■=正常  □=负面  ★=幸运  [ ]=当前位置"
+        legend_surface = self.render_text(self.font_small, legend_text, self.colors['gray'])
+        layer.blit(legend_surface, (x + 600, y + 20 + 65))
+        self.background_layer = layer
+        
+        # 操作提示块（宽度不超过状态区域边框）
+        x, y, w, h = self.layout['status_area']
+        tips_layer = pygame.Surface((w - 20, len(self.tips) * 22), 0, self.screen)
+        tips_layer.fill(self.colors['background'])
+        for i, tip in enumerate(self.tips):
+            tips_layer.blit(self.render_text(self.font_small, tip, self.colors['gray']), (0, i * 22))
+        self.tips_layer = tips_layer
+        
+        # 半透明遮罩
+        overlay = pygame.Surface(screen_size)
+        overlay.set_alpha(128)
+        overlay.fill((0, 0, 0))
+        self.result_overlay = overlay
+        
+        # 胜利/失败结果面板
+        self.result_panels = {
+            True: self._build_result_panel("胜利！", self.colors['green']),
+            False: self._build_result_panel("失败...", self.colors['red'])
+        }
+        
+    def _build_result_panel(self, result_text, text_color):
+        """渲染结果窗口表面"""
+        result_width = 450
+        result_height = 220
+        panel = pygame.Surface((result_width, result_height), 0, self.screen)
+        panel.fill(self.colors['card_bg'])
+        pygame.draw.rect(panel, self.colors['white'], (0, 0, result_width, result_height), 3)
+        
+        # 结果文字
+        result_surface = self.render_text(self.font_large, result_text, text_color)
+        panel.blit(result_surface, (result_width // 2 - result_surface.get_width() // 2, 60))
+        
+        # 提示文字
+        tip_text = "点击重新开始按钮继续游戏"
+        tip_surface = self.render_text(self.font_small, tip_text, self.colors['white'])
+        panel.blit(tip_surface, (result_width // 2 - tip_surface.get_width() // 2, 140))
+        return panel
+        
+    def _ensure_static_layers(self):
+        """布局或字体变化时重建静态图层，并要求整屏重绘"""
+        static_layer_key = (tuple(self.layout.values()), self.screen.get_size(),
+                            self.font_large, self.font_medium, self.font_small)
+        if static_layer_key != self.static_layer_key:
+            self._build_static_layers()
+            self.static_layer_key = static_layer_key
+            self.full_redraw = True
+            self.card_faces.clear()
+        
+    def get_region_keys(self, game_state):
+        """获取各区域依赖的状态键
+        
+        game_state 中未变化的部分是同一个缓存对象，比较时直接按身份命中，开销很小。
+        """
+        return {
+            'turn_area': (game_state['turn_count'], game_state['phase']),
+            'battle_area': (game_state['enemy'], game_state['player'],
+                            game_state['compass_stats'], game_state['compass_visual']),
+            'hand_area': (game_state['hand'], game_state['deck_count']),
+            'button_area': (game_state['phase'], game_state['battle_ended']),
+            'log_area': (game_state['battle_log'],),
+            'status_area': (game_state['skip_next_turn'], game_state['double_next_attack'])
+        }
         
     def render(self, screen, game_state):
-        """渲染完整界面"""
-        # 清屏
-        screen.fill(self.colors['background'])
-        
-        # 渲染各个区域
-        self.render_turn_counter(game_state)
-        self.render_battle_area(game_state)
-        self.render_hand_area(game_state)
-        self.render_button_area(game_state)
-        self.render_log_area(game_state)
-        self.render_status_area(game_state)
+        """渲染界面，只重绘状态发生变化的区域
+        
+        不负责刷新窗口，返回需要传给 pygame.display.update 的脏矩形列表；
+        界面没有变化时返回空列表。
+        """
+        self._ensure_static_layers()
+        region_keys = self.get_region_keys(game_state)
+        result_key = (game_state['battle_ended'], game_state['victory'])
+        
+        if self.full_redraw or result_key != self.result_key:
+            dirty_regions = list(self.layout)
+        else:
+            dirty_regions = [name for name, key in region_keys.items()
+                             if self.region_keys.get(name) != key]
+            if not dirty_regions:
+                return []
+            # 结果遮罩覆盖整个屏幕，任何区域变化都需要重新叠加
+            if game_state['battle_ended']:
+                dirty_regions = list(self.layout)
+        
+        full_redraw = len(dirty_regions) == len(self.layout)
+        if full_redraw:
+            # 一次 blit 铺满整个静态背景，各区域无需再单独清空
+            self.screen.blit(self.background_layer, (0, 0))
+        for name in dirty_regions:
+            self.render_region(name, game_state, restore_background=not full_redraw)
+        
+        self.region_keys = region_keys
+        self.result_key = result_key
         
         # 如果战斗结束，显示结果
         if game_state['battle_ended']:
             self.render_battle_result(game_state)
         
-        # 更新显示
-        pygame.display.flip()
+        if full_redraw:
+            self.full_redraw = False
+            return [self.screen.get_rect()]
+        return [pygame.Rect(self.layout[name]) for name in dirty_regions]
+        
+    def render_region(self, name, game_state, restore_background=True):
+        """用静态背景覆盖并重绘单个布局区域（绘制范围限制在区域内）"""
+        region_rect = pygame.Rect(self.layout[name])
+        self.screen.set_clip(region_rect)
+        if restore_background:
+            self.screen.blit(self.background_layer, region_rect, region_rect)
+        self.region_renderers[name](game_state)
+        self.screen.set_clip(None)
         
     def render_turn_counter(self, game_state):
         """渲染回合数和阶段信息"""
         x, y, w, h = self.layout['turn_area']
         
-        # 背景
-        pygame.draw.rect(self.screen, self.colors['dark_gray'], (x, y, w, h))
-        
         # 回合信息
         phase_name = "出牌阶段" if game_state['phase'] == 'CARD_PHASE' else "结算阶段"
         turn_text = f"回合 {game_state['turn_count']} - {phase_name}"
-        text_surface = self.font_medium.render(turn_text, True, self.colors['white'])
+        text_surface = self.render_text(self.font_medium, turn_text, self.colors['white'])
         text_x = x + w // 2 - text_surface.get_width() // 2
         self.screen.blit(text_surface, (text_x, y + 12))
         
@@ -135,7 +386,7 @@ class GameUI:
         
         # 敌人名称
         name_text = f"敌人: {enemy['name']}"
-        name_surface = self.font_medium.render(name_text, True, self.colors['red'])
+        name_surface = self.render_text(self.font_medium, name_text, self.colors['red'])
         self.screen.blit(name_surface, (x, y))
         
         # 敌人状态
@@ -143,8 +394,8 @@ class GameUI:
         atk_text = f"ATK: {enemy['atk']}"
         
         hp_color = self.colors['red'] if enemy['hp'] < enemy['max_hp'] * 0.3 else self.colors['white']
-        hp_surface = self.font_small.render(hp_text, True, hp_color)
-        atk_surface = self.font_small.render(atk_text, True, self.colors['white'])
+        hp_surface = self.render_text(self.font_small, hp_text, hp_color)
+        atk_surface = self.render_text(self.font_small, atk_text, self.colors['white'])
         
         self.screen.blit(hp_surface, (x, y + 35))
         self.screen.blit(atk_surface, (x + 200, y + 35))
@@ -155,7 +406,7 @@ class GameUI:
         
         # 玩家名称
         name_text = "玩家: 英雄"
-        name_surface = self.font_medium.render(name_text, True, self.colors['green'])
+        name_surface = self.render_text(self.font_medium, name_text, self.colors['green'])
         self.screen.blit(name_surface, (x, y))
         
         # 玩家状态
@@ -167,10 +418,10 @@ class GameUI:
         hp_color = self.colors['red'] if player['hp'] < player['max_hp'] * 0.3 else self.colors['white']
         mp_color = self.colors['blue'] if player['mp'] > player['max_mp'] * 0.5 else self.colors['yellow']
         
-        hp_surface = self.font_small.render(hp_text, True, hp_color)
-        mp_surface = self.font_small.render(mp_text, True, mp_color)
-        atk_surface = self.font_small.render(atk_text, True, self.colors['white'])
-        armor_surface = self.font_small.render(armor_text, True, self.colors['blue'])
+        hp_surface = self.render_text(self.font_small, hp_text, hp_color)
+        mp_surface = self.render_text(self.font_small, mp_text, mp_color)
+        atk_surface = self.render_text(self.font_small, atk_text, self.colors['white'])
+        armor_surface = self.render_text(self.font_small, armor_text, self.colors['blue'])
         
         self.screen.blit(hp_surface, (x, y + 35))
         self.screen.blit(mp_surface, (x + 150, y + 35))
@@ -184,18 +435,15 @@ class GameUI:
         
         # 罗盘标题
         title_text = f"罗盘 ({compass_stats['current_position']}/11):"
-        title_surface = self.font_medium.render(title_text, True, self.colors['yellow'])
+        title_surface = self.render_text(self.font_medium, title_text, self.colors['yellow'])
         self.screen.blit(title_surface, (x, y))
         
         # 罗盘可视化 (简化为一行显示)
         visual_text = " ".join(compass_visual)
-        visual_surface = self.font_small.render(visual_text, True, self.colors['yellow'])
+        visual_surface = self.render_text(self.font_small, visual_text, self.colors['yellow'])
         self.screen.blit(visual_surface, (x, y + 35))
         
-        # 罗盘说明
-        legend_text = "■=正常  □=负面  ★=幸运  [ ]=当前位置"
-        legend_surface = self.font_small.render(legend_text, True, self.colors['gray'])
-        self.screen.blit(legend_surface, (x, y + 65))
+        # 罗盘说明在静态背景图层中
         
     def render_hand_area(self, game_state):
         """渲染手牌区域"""
@@ -204,20 +452,17 @@ class GameUI:
         # 清空卡牌矩形列表
         self.card_rects.clear()
         
-        # 背景
-        pygame.draw.rect(self.screen, self.colors['dark_gray'], (x, y, w, h), 2)
-        
         # 手牌标题
         hand_count = len(game_state['hand'])
         deck_count = game_state['deck_count']
         title_text = f"手牌 ({hand_count}/5) | 牌库: {deck_count}"
-        title_surface = self.font_medium.render(title_text, True, self.colors['white'])
+        title_surface = self.render_text(self.font_medium, title_text, self.colors['white'])
         self.screen.blit(title_surface, (x + 10, y + 10))
         
         # 渲染每张手牌 - 调整卡牌大小以适应更大字体
         card_width = 155
         card_height = 140
-        card_spacing = 8
+        card_spacing = 6   # 5张卡牌正好放进手牌区域宽度（20 + 4*161 + 155 < 820）
         start_x = x + 20
         start_y = y + 55
         
@@ -233,7 +478,34 @@ class GameUI:
             self.render_single_card(card_info, card_x, card_y, card_width, card_height)
             
     def render_single_card(self, card_info, x, y, width, height):
-        """渲染单张卡牌"""
+        """渲染单张卡牌（牌面按卡牌ID、可用性和罗盘预览缓存）"""
+        # 卡牌数据重新加载后模板表是新对象，旧牌面全部失效
+        if card_data.CARD_REGISTRY is not self.card_registry:
+            self.card_faces.clear()
+            self.card_registry = card_data.CARD_REGISTRY
+        
+        # 不在卡牌库中的卡牌无法保证牌面只取决于ID，直接绘制
+        card_id = card_info.get('id')
+        if card_id not in card_data.CARD_REGISTRY:
+            self.screen.blit(self.build_card_face(card_info, width, height), (x, y))
+            return
+        
+        face_key = (card_id, card_info['playable'], card_info.get('compass_outcome'), width, height)
+        face = self.card_faces.get(face_key)
+        if face is None:
+            face = self.build_card_face(card_info, width, height)
+            self.card_faces[face_key] = face
+        self.screen.blit(face, (x, y))
+        
+    def invalidate_card_faces(self):
+        """清空牌面缓存（卡牌数据变化时调用）"""
+        self.card_faces.clear()
+        self.invalidate('hand_area')
+        
+    def build_card_face(self, card_info, width, height):
+        """绘制卡牌牌面表面"""
+        face = pygame.Surface((width, height), 0, self.screen)
+        
         # 背景颜色（根据可用性）
         if card_info['playable']:
             bg_color = self.colors['card_bg']
@@ -243,34 +515,42 @@ class GameUI:
             border_color = self.colors['dark_gray']
             
         # 卡牌背景
-        pygame.draw.rect(self.screen, bg_color, (x, y, width, height))
-        pygame.draw.rect(self.screen, border_color, (x, y, width, height), 2)
+        face.fill(bg_color)
+        pygame.draw.rect(face, border_color, (0, 0, width, height), 2)
         
         # 卡牌名称
-        name_surface = self.font_small.render(card_info['name'], True, self.colors['white'])
-        name_x = x + width // 2 - name_surface.get_width() // 2
-        self.screen.blit(name_surface, (name_x, y + 5))
+        name_surface = self.render_text(self.font_small, card_info['name'], self.colors['white'])
+        name_x = width // 2 - name_surface.get_width() // 2
+        face.blit(name_surface, (name_x, 5))
         
         # 卡牌类型
-        type_surface = self.font_small.render(f"[{card_info['type']}]", True, self.colors['yellow'])
-        type_x = x + width // 2 - type_surface.get_width() // 2
-        self.screen.blit(type_surface, (type_x, y + 30))
+        type_surface = self.render_text(self.font_small, f"[{card_info['type']}]", self.colors['yellow'])
+        type_x = width // 2 - type_surface.get_width() // 2
+        face.blit(type_surface, (type_x, 30))
         
         # MP消耗
         mp_text = f"MP: {card_info['mp_cost']}"
-        mp_surface = self.font_small.render(mp_text, True, self.colors['blue'])
-        self.screen.blit(mp_surface, (x + 5, y + 60))
+        mp_surface = self.render_text(self.font_small, mp_text, self.colors['blue'])
+        face.blit(mp_surface, (5, 60))
         
         # 罗盘点数
         compass_text = f"罗盘: {card_info['compass_points']}"
-        compass_surface = self.font_small.render(compass_text, True, self.colors['yellow'])
-        self.screen.blit(compass_surface, (x + 5, y + 85))
+        compass_surface = self.render_text(self.font_small, compass_text, self.colors['yellow'])
+        face.blit(compass_surface, (5, 85))
+        
+        # 打出后落在的罗盘位置类型
+        outcome = card_info.get('compass_outcome')
+        if outcome is not None:
+            outcome_surface = self.render_text(self.font_small, f"→{EVENT_SYMBOLS[outcome]}",
+                                               get_compass_symbol_color(outcome))
+            face.blit(outcome_surface, (5 + compass_surface.get_width() + 4, 85))
         
         # 卡牌描述
         desc_lines = self.wrap_text(card_info['description'], width - 10, self.font_small)
         for i, line in enumerate(desc_lines[:2]):  # 最多显示2行
-            line_surface = self.font_small.render(line, True, self.colors['white'])
-            self.screen.blit(line_surface, (x + 5, y + 110 + i * 20))
+            line_surface = self.render_text(self.font_small, line, self.colors['white'])
+            face.blit(line_surface, (5, 110 + i * 20))
+        return face
             
     def render_button_area(self, game_state):
         """渲染按钮区域"""
@@ -302,7 +582,7 @@ class GameUI:
         pygame.draw.rect(self.screen, self.colors['white'], button_rect, 2)
         
         # 按钮文字
-        text_surface = self.font_medium.render(button_text, True, text_color)
+        text_surface = self.render_text(self.font_medium, button_text, text_color)
         text_x = button_rect.centerx - text_surface.get_width() // 2
         text_y = button_rect.centery - text_surface.get_height() // 2
         self.screen.blit(text_surface, (text_x, text_y))
@@ -315,7 +595,7 @@ class GameUI:
             pygame.draw.rect(self.screen, self.colors['green'], restart_rect)
             pygame.draw.rect(self.screen, self.colors['white'], restart_rect, 2)
             
-            restart_text = self.font_medium.render("重新开始", True, self.colors['white'])
+            restart_text = self.render_text(self.font_medium, "重新开始", self.colors['white'])
             text_x = restart_rect.centerx - restart_text.get_width() // 2
             text_y = restart_rect.centery - restart_text.get_height() // 2
             self.screen.blit(restart_text, (text_x, text_y))
@@ -324,94 +604,48 @@ class GameUI:
         """渲染战斗日志区域"""
         x, y, w, h = self.layout['log_area']
         
-        # 背景
-        pygame.draw.rect(self.screen, self.colors['dark_gray'], (x, y, w, h), 2)
-        
-        # 标题
-        title_surface = self.font_medium.render("战斗日志:", True, self.colors['white'])
-        self.screen.blit(title_surface, (x + 10, y + 10))
+        # 背景、边框和标题在静态背景图层中
         
         # 日志内容
         logs = game_state['battle_log']
         log_y = y + 45
         
         for i, log_msg in enumerate(logs[-12:]):  # 显示最近12条，因为字体更大了
-            log_surface = self.font_small.render(f"> {log_msg}", True, self.colors['white'])
+            log_surface = self.render_text(self.font_small, f"> {log_msg}", self.colors['white'])
             self.screen.blit(log_surface, (x + 10, log_y + i * 22))
             
     def render_status_area(self, game_state):
         """渲染状态信息区域"""
         x, y, w, h = self.layout['status_area']
         
-        # 背景
-        pygame.draw.rect(self.screen, self.colors['dark_gray'], (x, y, w, h), 2)
-        
-        # 标题
-        title_surface = self.font_medium.render("状态信息", True, self.colors['white'])
-        self.screen.blit(title_surface, (x + 10, y + 10))
+        # 背景、边框和标题在静态背景图层中
         
         # 特殊状态
         status_y = y + 45
         if game_state['skip_next_turn']:
-            skip_surface = self.font_small.render("跳过下回合", True, self.colors['red'])
+            skip_surface = self.render_text(self.font_small, "跳过下回合", self.colors['red'])
             self.screen.blit(skip_surface, (x + 10, status_y))
             status_y += 25
             
         if game_state['double_next_attack']:
-            double_surface = self.font_small.render("下次攻击翻倍", True, self.colors['green'])
+            double_surface = self.render_text(self.font_small, "下次攻击翻倍", self.colors['green'])
             self.screen.blit(double_surface, (x + 10, status_y))
             status_y += 25
             
-        # 操作提示
+        # 操作提示（预渲染的整块表面）
         status_y += 10
-        tips = [
-            "操作提示:",
-            "- 点击卡牌使用",
-            "- 点击结束回合",
-            "- ESC键退出"
-        ]
-        
-        for tip in tips:
-            tip_surface = self.font_small.render(tip, True, self.colors['gray'])
-            self.screen.blit(tip_surface, (x + 10, status_y))
-            status_y += 22
+        self.screen.blit(self.tips_layer, (x + 10, status_y))
             
     def render_battle_result(self, game_state):
-        """渲染战斗结果"""
-        # 半透明遮罩
-        overlay = pygame.Surface((1024, 768))
-        overlay.set_alpha(128)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        """渲染战斗结果（遮罩和结果面板均为预渲染表面）"""
+        self.screen.blit(self.result_overlay, (0, 0))
         
         # 结果窗口
-        result_width = 450
-        result_height = 220
-        result_x = 512 - result_width // 2
-        result_y = 384 - result_height // 2
-        
-        pygame.draw.rect(self.screen, self.colors['card_bg'], 
-                        (result_x, result_y, result_width, result_height))
-        pygame.draw.rect(self.screen, self.colors['white'], 
-                        (result_x, result_y, result_width, result_height), 3)
-        
-        # 结果文字
-        if game_state['victory']:
-            result_text = "胜利！"
-            text_color = self.colors['green']
-        else:
-            result_text = "失败..."
-            text_color = self.colors['red']
-            
-        result_surface = self.font_large.render(result_text, True, text_color)
-        text_x = result_x + result_width // 2 - result_surface.get_width() // 2
-        self.screen.blit(result_surface, (text_x, result_y + 60))
-        
-        # 提示文字
-        tip_text = "点击重新开始按钮继续游戏"
-        tip_surface = self.font_small.render(tip_text, True, self.colors['white'])
-        tip_x = result_x + result_width // 2 - tip_surface.get_width() // 2
-        self.screen.blit(tip_surface, (tip_x, result_y + 140))
+        panel = self.result_panels[bool(game_state['victory'])]
+        screen_width, screen_height = self.screen.get_size()
+        result_x = screen_width // 2 - panel.get_width() // 2
+        result_y = screen_height // 2 - panel.get_height() // 2
+        self.screen.blit(panel, (result_x, result_y))
         
     def handle_click(self, pos, game_state):
         """处理鼠标点击事件"""
@@ -0,0 +1,202 @@
+"""
+字形图集 - 预先光栅化的中文字形图集（内存映射加载），文字渲染变为字形拼接
+Glyph Atlas - Pre-Rasterized CJK Glyphs Loaded via mmap, Turning Text Rendering into Glyph Copies
+
+图集由 tools/build_glyph_atlas.py 生成，包含界面可能显示的全部字符在各字号下的
+灰度（alpha）字形。每个字号的字形横向排成一条高度为行高的条带，渲染文字时按字符
+取出条带中的列拼成一行，再作为 alpha 通道写入纯色表面（从缓存的同色表面复制，
+不逐次填充）；图集中没有的字符回退到字体渲染。
+"""
+
+import mmap
+import struct
+
+import numpy as np
+import pygame
+
+
+# ============ 图集文件格式 ============
+# 头部: MAGIC(4) + 格式版本(uint8) + 字号数(uint8) + 字符集摘要(8字节) + 字体文件摘要(8字节)
+# 字号表: 每个字号 (字号 uint16, 行高 uint16, 基线 uint16, 字形数 uint32, 条带宽度 uint32,
+#          字形表偏移 uint32, 条带偏移 uint32)
+# 字形表: 每个字形 (码位 uint32, 条带中的x uint32, 宽度 uint16)
+# 条带: 行高 x 条带宽度 的 alpha 字节（按行存放）
+
+ATLAS_MAGIC = b'CBGA'
+ATLAS_VERSION = 2
+ATLAS_HEADER = struct.Struct('<4sBB8s8s')
+ATLAS_FACE = struct.Struct('<HHHIIII')
+ATLAS_GLYPH = struct.Struct('<IIH')
+
+# 每个字号缓存列下标的文字数量上限（超过时清空重建）
+TEXT_CACHE_SIZE = 1024
+
+
+class AtlasFace:
+    """图集中一个字号的全部字形"""
+
+    def __init__(self, size, height, ascent, glyphs, strip):
+        """初始化字号
+
+        Args:
+            size: 字号
+            height: 行高（条带高度）
+            ascent: 基线以上的高度
+            glyphs: {码位: (x, 宽度)}
+            strip: 形状为 (行高, 条带宽度) 的 uint8 数组（映射文件的视图，不复制）
+        """
+        self.size = size
+        self.height = height
+        self.ascent = ascent
+        self.glyphs = glyphs
+        self.strip = strip
+        self._columns = {}
+        self._text_columns = {}
+
+    def has_text(self, text):
+        """文字的全部字符是否都在图集中"""
+        glyphs = self.glyphs
+        return all(ord(char) in glyphs for char in text)
+
+    def measure(self, text):
+        """文字宽度（调用前需确认 has_text）"""
+        glyphs = self.glyphs
+        return sum(glyphs[ord(char)][1] for char in text)
+
+    def render_alpha(self, text):
+        """拼出文字的 alpha 数组，形状为 (行高, 宽度)"""
+        indices = self._text_columns.get(text)
+        if indices is None:
+            indices = self._build_columns(text)
+        return self.strip.take(indices, axis=1)
+
+    def _build_columns(self, text):
+        """文字在条带中的列下标（界面每帧重复绘制相同的文字，按文字缓存）"""
+        columns = self._columns
+        parts = []
+        for char in text:
+            column = columns.get(char)
+            if column is None:
+                x, width = self.glyphs[ord(char)]
+                column = np.arange(x, x + width, dtype=np.intp)
+                columns[char] = column
+            parts.append(column)
+        indices = np.concatenate(parts) if parts else np.zeros(0, dtype=np.intp)
+        if len(self._text_columns) >= TEXT_CACHE_SIZE:
+            self._text_columns.clear()
+        self._text_columns[text] = indices
+        return indices
+
+
+class GlyphAtlas:
+    """内存映射的字形图集文件"""
+
+    def __init__(self, path):
+        """打开图集文件并解析字号表和字形表（条带数据不读入内存）"""
+        with open(path, 'rb') as atlas_file:
+            self._map = mmap.mmap(atlas_file.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._map
+
+        (magic, version, face_count,
+         self.charset_digest, self.font_digest) = ATLAS_HEADER.unpack_from(data, 0)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            raise ValueError(f"无效的字形图集文件: {path}")
+
+        self.faces = {}
+        offset = ATLAS_HEADER.size
+        for _ in range(face_count):
+            (size, height, ascent, glyph_count, strip_width,
+             glyph_offset, strip_offset) = ATLAS_FACE.unpack_from(data, offset)
+            offset += ATLAS_FACE.size
+
+            glyph_end = glyph_offset + glyph_count * ATLAS_GLYPH.size
+            glyphs = {codepoint: (x, width) for codepoint, x, width
+                      in ATLAS_GLYPH.iter_unpack(data[glyph_offset:glyph_end])}
+            strip = np.frombuffer(data, dtype=np.uint8, count=height * strip_width,
+                                  offset=strip_offset).reshape(height, strip_width)
+            self.faces[size] = AtlasFace(size, height, ascent, glyphs, strip)
+
+    def get_face(self, size):
+        """获取指定字号，图集中没有时返回None"""
+        return self.faces.get(size)
+
+
+class AtlasFont:
+    """以图集字形渲染文字的字体（接口与 pygame.font.Font 的 render/size 一致）
+
+    文字中有图集没有的字符时，整段文字改用回退字体渲染（回退字体在第一次需要时才加载）。
+    """
+
+    def __init__(self, face, load_fallback):
+        """初始化字体
+
+        Args:
+            face: AtlasFace
+            load_fallback: 返回回退用 pygame.font.Font 的函数
+        """
+        self.face = face
+        self._load_fallback = load_fallback
+        self._fallback = None
+        self._solid = {}
+
+    @property
+    def fallback(self):
+        """回退字体"""
+        if self._fallback is None:
+            self._fallback = self._load_fallback()
+        return self._fallback
+
+    def render(self, text, antialias, color, background=None):
+        """渲染文字，返回带 alpha 通道的表面"""
+        face = self.face
+        if background is not None or not face.has_text(text):
+            return self.fallback.render(text, antialias, color, background)
+
+        alpha = face.render_alpha(text)
+        width = alpha.shape[1]
+        surface = self._solid_surface(color, width).subsurface((0, 0, width, face.height)).copy()
+        pygame.surfarray.pixels_alpha(surface)[...] = alpha.T
+        return surface
+
+    def _solid_surface(self, color, width):
+        """缓存的纯色表面（宽度不够时加倍重建）"""
+        key = tuple(color)
+        solid = self._solid.get(key)
+        if solid is None or solid.get_width() < width:
+            solid_width = max(width, 2 * solid.get_width() if solid else 256)
+            solid = pygame.Surface((solid_width, self.face.height), pygame.SRCALPHA)
+            solid.fill(color)
+            self._solid[key] = solid
+        return solid
+
+    def size(self, text):
+        """文字渲染后的 (宽度, 高度)"""
+        face = self.face
+        if not face.has_text(text):
+            return self.fallback.size(text)
+        return (face.measure(text), face.height)
+
+    def get_height(self):
+        """行高"""
+        return self.face.height
+
+    def get_linesize(self):
+        """推荐的行距"""
+        return self.face.height
+
+    def get_ascent(self):
+        """基线以上的高度"""
+        return self.face.ascent
+
+
+_atlas_cache = {}
+
+
+def load_glyph_atlas(path):
+    """加载字形图集（每个进程每个文件只加载一次），文件不存在或无效时返回None"""
+    if path not in _atlas_cache:
+        try:
+            _atlas_cache[path] = GlyphAtlas(path)
+        except (OSError, ValueError, struct.error):
+            _atlas_cache[path] = None
+    return _atlas_cache[path]
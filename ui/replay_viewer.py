@@ -0,0 +1,67 @@
+"""
+回放查看器 - 在游戏界面中逐步播放战斗回放，用于可视化调试
+Replay Viewer - Step Through a Battle Replay in the Game UI for Visual Debugging
+"""
+
+import pygame
+
+from config.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from core.battle_log import console_sink
+from core.replay import BattleReplayer, compute_state_hash
+from ui.game_ui import GameUI, init_display
+
+
+def view_replay(replay, step_interval=500, verbose=True):
+    """在游戏界面中播放回放
+
+    空格键暂停/继续，右方向键在暂停时单步执行，ESC退出；播放完后停留在终局画面。
+
+    Args:
+        replay: core.replay.Replay
+        step_interval: 自动播放时两个操作之间的间隔（毫秒）
+        verbose: 是否把战斗日志输出到控制台
+
+    Returns:
+        回放是否完整执行且终局状态哈希与录制时一致（中途退出时为None）
+    """
+    init_display()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(f"Card Battle Replay - seed {replay.seed}")
+
+    replayer = BattleReplayer(replay, log_sink=console_sink if verbose else None)
+    ui = GameUI(screen, replayer.battle_manager)
+
+    paused = False
+    running = True
+    verified = None
+    next_step_time = pygame.time.get_ticks() + step_interval
+
+    while running:
+        step_now = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT and paused:
+                    step_now = True
+
+        if not paused and pygame.time.get_ticks() >= next_step_time:
+            step_now = True
+        if step_now and not replayer.is_finished():
+            replayer.step()
+            next_step_time = pygame.time.get_ticks() + step_interval
+            if replayer.is_finished():
+                verified = compute_state_hash(replayer.battle_manager) == replay.final_hash
+                print("回放校验通过" if verified else "回放校验失败：终局状态与录制时不一致")
+
+        dirty_rects = ui.render(screen, replayer.battle_manager.get_game_state())
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
+        pygame.time.wait(10)
+
+    pygame.quit()
+    return verified
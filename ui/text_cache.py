@@ -0,0 +1,60 @@
+"""
+文字表面缓存 - 有界LRU缓存，避免每帧重复光栅化相同文字
+Text Surface Cache - Bounded LRU Cache to Avoid Re-rasterizing Text Every Frame
+"""
+
+from collections import OrderedDict
+
+
+class TextSurfaceCache:
+    """按 (字体, 文字, 颜色) 缓存 font.render 结果的LRU缓存"""
+
+    def __init__(self, max_entries=512):
+        """初始化缓存
+
+        Args:
+            max_entries: 最多缓存的文字表面数量，超出时淘汰最久未使用的条目
+        """
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        """获取文字表面，未命中时调用 font.render 并缓存结果
+
+        返回的表面被缓存共享，调用方只能读取或 blit，不能修改。
+        """
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """清空缓存（字体重新加载时调用）"""
+        self._surfaces.clear()
+
+    def reset_statistics(self):
+        """清零命中统计"""
+        self.hits = 0
+        self.misses = 0
+
+    def get_statistics(self):
+        """获取缓存统计信息"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._surfaces),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0
+        }
@@ -91,22 +91,79 @@ def calculate_card_efficiency(card, player_atk):
         return 1
 
 
-def shuffle_list(items):
-    """洗牌函数，返回洗牌后的新列表"""
+class NumpyRandomAdapter:
+    """将 numpy.random.Generator 包装为游戏逻辑使用的 random.Random 接口子集"""
+    
+    def __init__(self, generator):
+        """包装NumPy随机数生成器"""
+        self.generator = generator
+        
+    def random(self):
+        """返回 [0, 1) 区间的随机浮点数"""
+        return float(self.generator.random())
+        
+    def randrange(self, stop):
+        """返回 [0, stop) 区间的随机整数"""
+        return int(self.generator.integers(stop))
+        
+    def choice(self, items):
+        """从序列中随机选择一个元素"""
+        return items[int(self.generator.integers(len(items)))]
+        
+    def choices(self, items, weights=None, k=1):
+        """带权重的有放回随机选择"""
+        if weights is None:
+            return [self.choice(items) for _ in range(k)]
+        total = sum(weights)
+        indices = self.generator.choice(len(items), size=k, p=[w / total for w in weights])
+        return [items[int(i)] for i in indices]
+        
+    def shuffle(self, items):
+        """原地洗牌"""
+        self.generator.shuffle(items)
+
+
+def make_battle_rng(rng=None, seed=None):
+    """创建战斗私有的随机数生成器
+    
+    Args:
+        rng: random.Random、numpy.random.Generator 或 None
+        seed: rng为空时用于创建 random.Random 的种子（None表示随机种子）
+    """
+    if rng is None:
+        return random.Random(seed)
+    if hasattr(rng, 'bit_generator'):
+        # numpy.random.Generator
+        return NumpyRandomAdapter(rng)
+    return rng
+
+
+def new_battle_seed():
+    """生成一个新的随机战斗种子（64位），记录下来即可复现整场战斗"""
+    return random.SystemRandom().getrandbits(64)
+
+
+def shuffle_list(items, rng=None):
+    """洗牌函数，返回洗牌后的新列表（rng为空时使用全局random）"""
+    if rng is None:
+        rng = random
     shuffled = items.copy()
-    random.shuffle(shuffled)
+    rng.shuffle(shuffled)
     return shuffled
 
 
-def get_random_choice(items, weights=None):
-    """带权重的随机选择"""
+def get_random_choice(items, weights=None, rng=None):
+    """带权重的随机选择（rng为空时使用全局random）"""
     if not items:
         return None
     
+    if rng is None:
+        rng = random
+    
     if weights:
-        return random.choices(items, weights=weights, k=1)[0]
+        return rng.choices(items, weights=weights, k=1)[0]
     else:
-        return random.choice(items)
+        return rng.choice(items)
 
 
 def format_number_with_sign(number):
@@ -208,8 +265,17 @@ def create_safe_filename(filename):
     return safe_name
 
 
-def log_game_event(event_type, message, additional_data=None):
-    """记录游戏事件（用于调试和统计）"""
+def log_game_event(event_type, message, additional_data=None, journal=None):
+    """记录游戏事件（用于调试和统计）
+    
+    Args:
+        journal: 日志输出端（如 core.journal.BattleJournal），提供时写入该日志而不打印
+    """
+    if journal is not None:
+        data_text = f" | Data: {additional_data}" if additional_data else ""
+        journal('game_event', (event_type, message, data_text))
+        return f"{event_type}: {message}{data_text}"
+    
     import datetime
     
     timestamp = datetime.datetime.now().strftime("%H:%M:%S")